@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict
+
+COMPLETE = float("inf")  # Coverage of a filter whose last page was reached
+
+
+class AccountDirectory:
+    """
+    Client-side cache of LIST_ACCOUNTS results, keyed by filter text.
+
+    The server lists the accounts whose username contains the filter, by increasing account ID.
+    For each filter the directory keeps the matching accounts it has seen and the account ID up
+    to which that list is known to be complete (its coverage). A filter that extends a cached
+    one (e.g. "ali" after "al") is seeded from it: every account containing "ali" also contains
+    "al", so filtering the cached accounts locally gives a list with the same coverage. Pages
+    are then served locally, and only the accounts after the coverage are fetched.
+    Entries expire after `max_age` seconds so new and deleted accounts show up eventually.
+    """
+
+    def __init__(self, capacity=64, max_age=30.0):
+        """
+        :param capacity: Maximum number of filters to keep
+        :param max_age: Seconds a filter's results are reused
+        """
+        self.capacity = capacity
+        self.max_age = max_age
+        self.entries = OrderedDict()  # Filter -> [accounts, coverage, created_at], oldest first
+        self.lock = threading.Lock()
+        self.hits = 0  # Pages served without a request
+        self.misses = 0  # Pages that needed a request
+
+    def lookup(self, filter_text, after_id, count):
+        """
+        Get a page of accounts from the cache.
+
+        :param filter_text: Filter text
+        :param after_id: Only return accounts with a higher ID (ID of the last account shown)
+        :param count: Number of accounts on a page
+        :return: Tuple of the cached accounts and the offset ID to fetch the rest from
+            (None if the cache has the whole page)
+        """
+        with self.lock:
+            entry = self.entry(filter_text)
+            accounts, coverage, _ = entry
+            page = [account for account in accounts if account[0] > after_id][:count]
+            if len(page) == count or coverage == COMPLETE:
+                self.hits += 1
+                return page, None
+            self.misses += 1
+            return page, max(after_id, coverage)
+
+    def add(self, filter_text, offset_id, accounts, count):
+        """
+        Record a LIST_ACCOUNTS response.
+
+        :param filter_text: Filter text of the request
+        :param offset_id: Offset account ID of the request
+        :param accounts: List of (account ID, username) tuples returned
+        :param count: Maximum number of accounts requested
+        """
+        with self.lock:
+            entry = self.entry(filter_text)
+            cached, coverage, _ = entry
+            if offset_id > coverage:
+                # Accounts between the coverage and the offset are unknown, so the
+                # response cannot extend the list (the UI only fetches from the coverage)
+                return
+            known = {account[0] for account in cached}
+            cached.extend(account for account in accounts if account[0] not in known)
+            cached.sort()
+            if len(accounts) < count:
+                entry[1] = COMPLETE
+            elif accounts:
+                entry[1] = max(coverage, accounts[-1][0])
+
+    def entry(self, filter_text):
+        """
+        Get the entry of a filter, seeding it from the best cached filter it contains.
+        Called with the lock held.
+
+        :param filter_text: Filter text
+        :return: [accounts, coverage, created_at] list of the filter
+        """
+        now = time.monotonic()
+        for key in [key for key, entry in self.entries.items() if now - entry[2] >= self.max_age]:
+            del self.entries[key]
+
+        entry = self.entries.get(filter_text)
+        if entry is not None:
+            self.entries.move_to_end(filter_text)
+            return entry
+
+        # Seed from the cached filter contained in this one that covers the most accounts
+        best = None
+        for key, candidate in self.entries.items():
+            if key in filter_text and (best is None or candidate[1] > best[1]):
+                best = candidate
+        if best is None:
+            entry = [[], 0, now]
+        else:
+            entry = [[account for account in best[0] if filter_text in account[1]],
+                     best[1], best[2]]  # Expires with the list it was derived from
+        self.entries[filter_text] = entry
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """
+        Drop every cached filter.
+        """
+        with self.lock:
+            self.entries.clear()
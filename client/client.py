@@ -1,31 +1,67 @@
+import logging
 import config
 from ui import ChatUI
 import tkinter as tk
 from network.network_json import JSONChatClient
 from network.network_wire import WireChatClient
+from network.prefix_cache import PrefixCache
+from network.outbox import Outbox
+from network.reconnect import Backoff, ReconnectSupervisor
+from network.heartbeat import Heartbeat
+from message_store import MessageStore
+
+logger = logging.getLogger("chat")
 
 def main():
-    print("Starting client...")
     client_config = config.get_config()
+    logging.basicConfig(level=client_config["log_level"],
+                        format="%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    logger.info("Starting client...")
     host = client_config["host"]
     port = client_config["port"]
     max_msg = client_config["max_msg"]
     max_users = client_config["max_users"]
     use_json_protocol = client_config["use_json_protocol"]
+    prefix_cache_file = client_config["prefix_cache_file"]
+    message_store_file = client_config["message_store_file"]
+    outbox_file = client_config["outbox_file"]
 
-    # Set up a ChatClient instance and connect to the server
-    print(f"Configuration: \nhost={host}, \nport={port}, \nmax_msg={max_msg}, \nmax_users={max_users}, \nuse_json_protocol={use_json_protocol}")
+    # Set up a ChatClient instance (it connects once the UI has started, see below)
+    logger.info("Configuration: host=%s, port=%s, max_msg=%s, max_users=%s, use_json_protocol=%s, endpoints=%s",
+                host, port, max_msg, max_users, use_json_protocol, client_config["endpoints"])
     
-    # Create a client based on the protocol
+    # Remember bcrypt prefixes between sessions if a cache file is configured
+    prefix_cache = PrefixCache(prefix_cache_file) if prefix_cache_file else None
+
+    # Messages sent while disconnected are kept here and sent after the next login
+    outbox = Outbox(outbox_file)
+
+    # Create a client based on the protocol; it connects in the background once the UI is up
+    # (racing every configured server and failing over between them)
+    connect_timeout = client_config["connect_timeout"]
+    endpoints = client_config["endpoints"]
     if use_json_protocol: 
-        client = JSONChatClient(host, port, max_msg, max_users)
+        client = JSONChatClient(host, port, max_msg, max_users, prefix_cache=prefix_cache, outbox=outbox,
+                                connect_timeout=connect_timeout, defer_connect=True, endpoints=endpoints)
     else:
-        client = WireChatClient(host, port, max_msg, max_users)
+        client = WireChatClient(host, port, max_msg, max_users, prefix_cache=prefix_cache, outbox=outbox,
+                                connect_timeout=connect_timeout, defer_connect=True, endpoints=endpoints)
+
+    # Re-establish lost connections and log in again without restarting the UI
+    if client_config["reconnect"]:
+        ReconnectSupervisor(client, Backoff(max_delay=client_config["reconnect_max_delay"]))
+
+    # Detect half-open connections and keep an RTT estimate
+    if client_config["heartbeat_interval"]:
+        Heartbeat(client, client_config["heartbeat_interval"], client_config["heartbeat_max_missed"]).start()
 
     # Start the user interface, passing in existing client
     root = tk.Tk()
-    ChatUI(root, client)
+    message_store = MessageStore(message_store_file)  # Received messages survive restarts
+    ChatUI(root, client, message_store)
     root.mainloop()
+    message_store.close()
+    outbox.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
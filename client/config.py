@@ -7,17 +7,61 @@ def get_config():
     Load the configuration from the config file.
 
     Returns:
-        dict: The configuration values (host, port, max_msg)
+        dict: The configuration values (host, port, max_msg, max_users, use_json_protocol, prefix_cache_file, log_level, message_store_file, outbox_file,
+            reconnect, reconnect_max_delay, heartbeat_interval, heartbeat_max_missed, connect_timeout,
+            endpoints)
     """
     with open(CONFIG_FILE, "r") as f:
         config = json.load(f)
 
     host = config["SERVER_HOST"]
     port = config["SERVER_PORT"]
+    # Optional: servers to race and fail over between, as "host:port" strings or
+    # {"host": ..., "port": ...} objects (defaults to SERVER_HOST:SERVER_PORT alone)
+    endpoints = [parse_endpoint(server) for server in config.get("SERVERS", [])] or [(host, port)]
     max_msg = config["MAX_MSG_TO_DISPLAY"]
     max_users = config["MAX_USERS_TO_DISPLAY"]
     use_json_protocol = config["USE_JSON_PROTOCOL"]
+    # Optional: file to cache bcrypt prefixes in (skips LOOKUP_USER for known accounts)
+    prefix_cache_file = config.get("PREFIX_CACHE_FILE")
+    # Optional: SQLite file keeping received messages (defaults to messages.db)
+    message_store_file = config.get("MESSAGE_STORE_FILE", "messages.db")
+    # Optional: SQLite file queueing messages sent while disconnected (defaults to outbox.db)
+    outbox_file = config.get("OUTBOX_FILE", "outbox.db")
+    # Optional: seconds to wait for the server to accept the connection (defaults to 5)
+    connect_timeout = config.get("CONNECT_TIMEOUT", 5.0)
+    # Optional: reconnect automatically after losing the connection (defaults to true),
+    # waiting at most RECONNECT_MAX_DELAY seconds (defaults to 30) between attempts
+    reconnect = config.get("RECONNECT", True)
+    reconnect_max_delay = config.get("RECONNECT_MAX_DELAY", 30.0)
+    # Optional: seconds between heartbeats (defaults to 15; 0 disables them) and the number of
+    # consecutive unanswered heartbeats after which the connection is considered dead (defaults to 3)
+    heartbeat_interval = config.get("HEARTBEAT_INTERVAL", 15.0)
+    heartbeat_max_missed = config.get("HEARTBEAT_MAX_MISSED", 3)
+    # Optional: logging level name (e.g. "DEBUG" to log every request and message)
+    log_level = config.get("LOG_LEVEL", "INFO").upper()
 
-    return {"host": host, "port": port, "max_msg": max_msg, "max_users": max_users, "use_json_protocol": use_json_protocol}
+    return {"host": host, "port": port, "max_msg": max_msg, "max_users": max_users, "use_json_protocol": use_json_protocol,
+            "prefix_cache_file": prefix_cache_file, "log_level": log_level,
+            "message_store_file": message_store_file, "outbox_file": outbox_file,
+            "reconnect": reconnect, "reconnect_max_delay": reconnect_max_delay,
+            "heartbeat_interval": heartbeat_interval, "heartbeat_max_missed": heartbeat_max_missed,
+            "connect_timeout": connect_timeout, "endpoints": endpoints}
+
+
+def parse_endpoint(server):
+    """
+    Parse a server entry of the SERVERS list.
+
+    Args:
+        server (str | dict): "host:port" or {"host": ..., "port": ...}
+
+    Returns:
+        tuple: (host, port)
+    """
+    if isinstance(server, dict):
+        return server["host"], int(server["port"])
+    host, _, port = server.rpartition(":")
+    return host, int(port)
 
 
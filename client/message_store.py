@@ -0,0 +1,128 @@
+import sqlite3
+import threading
+import time
+
+
+class MessageStore:
+    """
+    Local, persistent store of every message the client has received.
+
+    The server marks messages as read once it delivers them and cannot send them again,
+    so the client keeps its own copy in SQLite. Messages are kept per account and
+    returned in the order they were received, which lets the UI page through history
+    without any network round trip.
+
+    Every read and write happens on the Tkinter thread, through MessageListModel: the
+    network threads only post events to the UpdateQueue. The lock is a safeguard, not a
+    contract, and WAL mode is there for durability of the file, not for concurrent writers.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            account TEXT NOT NULL,
+            message_id INTEGER NOT NULL,
+            sender TEXT NOT NULL,
+            message TEXT NOT NULL,
+            received_at REAL NOT NULL,
+            UNIQUE (account, message_id)
+        )
+    """
+    # Pages are read in received order: index it so a page does not sort the whole account
+    INDEX = "CREATE INDEX IF NOT EXISTS messages_by_account ON messages (account, seq)"
+
+    def __init__(self, path=":memory:"):
+        """
+        Open (or create) the store.
+
+        :param path: SQLite database file (":memory:" for a store that is not persisted)
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # Only the Tkinter thread uses the store; the lock guards against misuse
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self.connection:
+            self.connection.execute(self.SCHEMA)
+            self.connection.execute(self.INDEX)
+
+    @staticmethod
+    def account_key(host, port, username):
+        """
+        :return: Key identifying an account on a server
+        """
+        return f"{host}:{port}:{username}"
+
+    def add_messages(self, account, messages):
+        """
+        Store received messages, ignoring ones that are already stored.
+
+        :param account: Account key
+        :param messages: List of (message ID, sender, message) tuples
+        :return: Number of messages that were new
+        """
+        if not messages:
+            return 0
+        now = time.time()
+        with self.lock, self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO messages (account, message_id, sender, message, received_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(account, message_id, sender, message, now)
+                 for message_id, sender, message in messages])
+            return self.connection.total_changes - before
+
+    def page(self, account, offset, limit):
+        """
+        Get a page of messages in the order they were received.
+
+        :param account: Account key
+        :param offset: Number of messages to skip
+        :param limit: Maximum number of messages to return
+        :return: List of (message ID, sender, message) tuples
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT message_id, sender, message FROM messages WHERE account = ? "
+                "ORDER BY seq LIMIT ? OFFSET ?", (account, limit, offset)).fetchall()
+
+    def count(self, account):
+        """
+        :param account: Account key
+        :return: Number of stored messages for the account
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM messages WHERE account = ?", (account,)).fetchone()[0]
+
+    def delete(self, account, message_ids):
+        """
+        Remove messages (e.g. after they were deleted on the server).
+
+        :param account: Account key
+        :param message_ids: List of message IDs
+        """
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "DELETE FROM messages WHERE account = ? AND message_id = ?",
+                [(account, message_id) for message_id in message_ids])
+
+    def delete_account(self, account):
+        """
+        Remove every message of an account (e.g. after the account was deleted).
+
+        :param account: Account key
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM messages WHERE account = ?", (account,))
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self.lock:
+            self.connection.close()
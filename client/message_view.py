@@ -0,0 +1,179 @@
+import tkinter as tk
+
+WRAP_BUCKET = 40  # Wrap lengths are rounded down to a multiple of this many pixels
+MIN_WRAP_LENGTH = 200  # Narrowest wrap length in pixels
+
+
+def wrap_bucket(width, bucket=WRAP_BUCKET, minimum=MIN_WRAP_LENGTH):
+    """
+    Round a wrap length down to its width bucket.
+
+    :param width: Available width in pixels
+    :param bucket: Bucket size in pixels
+    :param minimum: Smallest wrap length returned
+    :return: Wrap length to use
+    """
+    return max(minimum, width - width % bucket)
+
+
+class MessageRow:
+    """
+    Widgets showing one message: a frame with a selection checkbox and a label.
+    Rows are created once and rebound to other messages instead of being rebuilt.
+    """
+
+    def __init__(self, parent, on_toggle, on_open):
+        """
+        Create the (hidden) row widgets.
+
+        :param parent: Widget to pack the row into
+        :param on_toggle: Function called with (row, selected) when the user clicks the checkbox
+        :param on_open: Function called with the row when the user double-clicks the message
+        """
+        self.frame = tk.Frame(parent)
+        self.var = tk.BooleanVar()
+        # command only fires on clicks, so setting the variable while rebinding is silent
+        self.checkbutton = tk.Checkbutton(
+            self.frame, variable=self.var, command=lambda: on_toggle(self, self.var.get()))
+        self.checkbutton.pack(side=tk.LEFT)
+        self.label = tk.Label(self.frame, anchor="w", justify="left")
+        self.label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.label.bind("<Double-1>", lambda event: on_open(self))
+
+        self.message = None  # (message ID, sender, message) shown, None while hidden
+        self.selected = False
+        self.wraplength = None
+        self.visible = False
+
+    def bind(self, message, selected, wraplength):
+        """
+        Show a message in this row, reconfiguring only what changed.
+
+        :param message: (message ID, sender, message) tuple
+        :param selected: Whether the message is selected
+        :param wraplength: Label wrap length in pixels
+        :return: True if the row shows a different message than before
+        """
+        changed = message != self.message
+        if changed:
+            _, sender, text = message
+            self.label.config(text=f"{sender}: {text}")
+            self.message = message
+        self.set_wraplength(wraplength)
+        if selected != self.selected:
+            self.var.set(selected)
+            self.selected = selected
+        if not self.visible:
+            # Hidden rows always follow the shown ones, so packing appends in order
+            self.frame.pack(fill=tk.X, padx=5, pady=2)
+            self.visible = True
+        return changed
+
+    def set_wraplength(self, wraplength):
+        """
+        :param wraplength: Label wrap length in pixels
+        """
+        if wraplength != self.wraplength:
+            self.label.config(wraplength=wraplength)
+            self.wraplength = wraplength
+
+    def hide(self):
+        """
+        Hide the row (it keeps its widgets for later use).
+        """
+        if self.visible:
+            self.frame.pack_forget()
+            self.visible = False
+        self.message = None
+
+
+class MessageView:
+    """
+    Virtualized message list.
+
+    Keeps a fixed pool of rows (one per message on a page) and rebinds them to the messages
+    of the current page, so a refresh only reconfigures the rows whose message changed and
+    never creates or destroys widgets. Its cost is O(visible rows), however many messages
+    were shown during the session. The selection is owned by the caller (the view-model)
+    and passed in by message ID, so a refresh keeps the checkboxes of messages still on the page.
+
+    Wrap lengths are bucketed (see wrap_bucket): a label keeps its wrapped layout until
+    the width moves to another bucket, and only the shown rows are rewrapped then. Hidden
+    rows pick up the current wrap length when they are bound again.
+    """
+
+    def __init__(self, parent, size, wraplength, on_select=None, on_open=None, row_factory=MessageRow):
+        """
+        Create the row pool.
+
+        :param parent: Widget holding the rows
+        :param size: Number of rows (messages per page)
+        :param wraplength: Initial available width for the labels in pixels
+        :param on_select: Function called with (message ID, selected) when the user clicks a checkbox
+        :param on_open: Function called with the sender when a message is double-clicked
+        :param row_factory: Class creating a row (takes parent, on_toggle, on_open)
+        """
+        self.rows = [row_factory(parent, self.toggle, self.open)
+                     for _ in range(size)]
+        self.wraplength = wrap_bucket(wraplength)
+        self.on_select = on_select
+        self.on_open = on_open
+        self.rebound = 0  # Rows bound to a different message, over the session
+        self.rewrapped = 0  # Rows whose wrap length was changed by set_wraplength, over the session
+
+    def show(self, messages, selected=()):
+        """
+        Show a page of messages.
+
+        :param messages: List of (message ID, sender, message) tuples, at most one per row
+        :param selected: IDs of the selected messages
+        """
+        messages = messages[:len(self.rows)]
+        for index, row in enumerate(self.rows):
+            if index < len(messages):
+                message = messages[index]
+                if row.bind(message, message[0] in selected, self.wraplength):
+                    self.rebound += 1
+            else:
+                row.hide()
+
+    def set_wraplength(self, width):
+        """
+        Change the wrap length of the message labels if the width moved to another bucket.
+
+        :param width: Available width for the labels in pixels
+        :return: Number of rows rewrapped
+        """
+        wraplength = wrap_bucket(width)
+        if wraplength == self.wraplength:
+            return 0
+        self.wraplength = wraplength
+        rewrapped = 0
+        for row in self.rows:
+            if row.visible:
+                row.set_wraplength(wraplength)
+                rewrapped += 1
+        self.rewrapped += rewrapped
+        return rewrapped
+
+    def toggle(self, row, selected):
+        """
+        Record a click on a row's checkbox.
+
+        :param row: Row that was clicked
+        :param selected: New state of the checkbox
+        """
+        if row.message is None:
+            return
+        row.selected = selected
+        if self.on_select:
+            self.on_select(row.message[0], selected)
+
+    def open(self, row):
+        """
+        Handle a double click on a row's message.
+
+        :param row: Row that was double-clicked
+        """
+        if row.message is not None and self.on_open:
+            self.on_open(row.message[1])
@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+
+logger = logging.getLogger("chat.network.dispatcher")
+
+_STOP = object()  # Sentinel telling a worker to exit
+
+
+class Dispatcher:
+    """
+    Runs response handlers on a fixed pool of worker threads fed by bounded queues.
+
+    Every task is submitted with a key (e.g. the client it belongs to). Tasks with the
+    same key always go to the same worker, so they run one at a time and in the order
+    they were submitted. When a worker's queue is full, `submit` blocks until there is
+    room again, which stops the caller (the socket listener) from reading more data
+    and pushes back on the server instead of buffering without bound.
+    """
+
+    def __init__(self, workers=1, max_queue=1024):
+        """
+        Initialize the dispatcher. Worker threads are started on first use.
+
+        :param workers: Number of worker threads
+        :param max_queue: Maximum number of queued tasks per worker
+        """
+        if workers < 1:
+            raise ValueError("Dispatcher needs at least one worker")
+        self.queues = [queue.Queue(maxsize=max_queue) for _ in range(workers)]
+        self.threads = []
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0  # Tasks accepted
+        self.completed = 0  # Tasks finished (including ones that raised)
+        self.failed = 0  # Tasks that raised an exception
+        self.blocked = 0  # Submits that had to wait for queue space
+        self.max_depth = 0  # Largest total queue depth seen
+
+    def submit(self, key, function, *args):
+        """
+        Queue a task, blocking while the target worker's queue is full.
+
+        :param key: Ordering key; tasks with equal keys run in submission order
+        :param function: Function to call
+        :param args: Arguments to pass to the function
+        """
+        self.start()
+        task_queue = self.queues[hash(key) % len(self.queues)]
+        item = (function, args)
+        try:
+            task_queue.put_nowait(item)
+        except queue.Full:
+            with self.lock:
+                self.blocked += 1
+            task_queue.put(item)  # Backpressure: wait for the consumer to catch up
+
+        depth = self.depth()
+        with self.lock:
+            self.submitted += 1
+            if depth > self.max_depth:
+                self.max_depth = depth
+
+    def start(self):
+        """
+        Start the worker threads if they are not running yet.
+        """
+        if self.threads:
+            return
+        with self.lock:
+            if self.threads:
+                return
+            for task_queue in self.queues:
+                thread = threading.Thread(
+                    target=self.run_worker, args=(task_queue,), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def run_worker(self, task_queue):
+        """
+        Worker loop: run queued tasks until told to stop.
+
+        :param task_queue: Queue this worker consumes
+        """
+        while True:
+            item = task_queue.get()
+            try:
+                if item is _STOP:
+                    return
+                function, args = item
+                try:
+                    function(*args)
+                except Exception:
+                    with self.lock:
+                        self.failed += 1
+                    logger.exception("Dispatched task failed")
+                with self.lock:
+                    self.completed += 1
+            finally:
+                task_queue.task_done()
+
+    def depth(self):
+        """
+        :return: Number of tasks currently queued across all workers
+        """
+        return sum(task_queue.qsize() for task_queue in self.queues)
+
+    def join(self):
+        """
+        Block until every queued task has run.
+        """
+        for task_queue in self.queues:
+            task_queue.join()
+
+    def shutdown(self, wait=True):
+        """
+        Stop the workers once they have finished the tasks already queued.
+
+        :param wait: Whether to wait for the workers to exit
+        """
+        with self.lock:
+            threads, self.threads = self.threads, []
+        for task_queue in self.queues[:len(threads)]:
+            task_queue.put(_STOP)
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def stats(self):
+        """
+        :return: Dictionary of queue depth and throughput metrics
+        """
+        with self.lock:
+            return {
+                "workers": len(self.queues),
+                "depth": self.depth(),
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "blocked": self.blocked,
+            }
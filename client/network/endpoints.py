@@ -0,0 +1,160 @@
+import logging
+import queue
+import socket
+import threading
+import time
+
+logger = logging.getLogger("chat.network.endpoints")
+
+
+def staggered_connect(endpoints, timeout=None, stagger=0.25):
+    """
+    Race TCP connections to several endpoints, Happy Eyeballs style (RFC 8305): start with the
+    first endpoint, start the next one whenever the previous attempt failed or `stagger` seconds
+    passed without a result, and keep the first connection to succeed. Connections that
+    succeed later are closed.
+
+    :param endpoints: List of (host, port) tuples, in order of preference
+    :param timeout: Seconds each attempt may take (None for the OS default)
+    :param stagger: Seconds to wait for an attempt before starting the next one
+    :return: Tuple of the connected socket (blocking) and its endpoint
+    :raises OSError: The error of the last attempt if every attempt failed
+    """
+    if not endpoints:
+        raise OSError("No endpoints to connect to")
+    results = queue.Queue()  # (socket or None, endpoint, error or None)
+
+    def attempt(endpoint):
+        try:
+            connection = socket.create_connection(endpoint, timeout)
+        except OSError as e:
+            results.put((None, endpoint, e))
+            return
+        results.put((connection, endpoint, None))
+
+    started = finished = 0
+    last_error = None
+    while finished < len(endpoints):
+        if started < len(endpoints):
+            if started > finished:
+                # Give the attempts in flight a head start before racing the next endpoint
+                try:
+                    result = results.get(timeout=stagger)
+                except queue.Empty:
+                    result = None
+            else:
+                result = None  # Nothing in flight (or the last attempt failed): go on right away
+            if result is None:
+                logger.debug("Connecting to %s:%s", *endpoints[started])
+                threading.Thread(target=attempt, args=(
+                    endpoints[started],), daemon=True).start()
+                started += 1
+                continue
+        else:
+            result = results.get()  # Every attempt started: wait for the remaining ones
+        connection, endpoint, error = result
+        finished += 1
+        if connection is None:
+            logger.debug("Could not connect to %s:%s - %s", *endpoint, error)
+            last_error = error
+            continue
+        if started > finished:
+            # Close the connections of the attempts still running once they finish
+            threading.Thread(target=close_late_connections, args=(
+                results, started - finished), daemon=True).start()
+        connection.settimeout(None)  # The listener blocks until data arrives
+        return connection, endpoint
+    raise last_error
+
+
+def close_late_connections(results, count):
+    """
+    Close the connections of attempts that lost the race.
+
+    :param results: Result queue of staggered_connect
+    :param count: Number of attempts still running
+    """
+    for _ in range(count):
+        connection, _, _ = results.get()
+        if connection is not None:
+            connection.close()
+
+
+class EndpointList:
+    """
+    Servers a client may connect to, in order of preference, with their health.
+
+    An endpoint is unhealthy for `quarantine` seconds after a connection to it failed or
+    dropped. Connects race the endpoints with staggered_connect, trying the healthy ones
+    first, starting after the endpoint that failed last (so a disconnect fails over to the
+    next server instead of hammering the one that just went away).
+    """
+
+    def __init__(self, endpoints, stagger=0.25, quarantine=30.0):
+        """
+        :param endpoints: List of (host, port) tuples
+        :param stagger: Seconds to wait for an attempt before starting the next one
+        :param quarantine: Seconds an endpoint stays unhealthy after a failure
+        """
+        self.endpoints = [tuple(endpoint) for endpoint in endpoints]
+        self.stagger = stagger
+        self.quarantine = quarantine
+        self.failed_at = {}  # Endpoint -> time.monotonic() of its last failure
+        self.next_index = 0  # Where the preference order starts
+        self.lock = threading.Lock()
+
+    def order(self):
+        """
+        :return: Endpoints in the order to try them: healthy ones first, from next_index on
+        """
+        now = time.monotonic()
+        with self.lock:
+            rotated = self.endpoints[self.next_index:] + \
+                self.endpoints[:self.next_index]
+            healthy = [endpoint for endpoint in rotated
+                       if now - self.failed_at.get(endpoint, -self.quarantine) >= self.quarantine]
+        return healthy + [endpoint for endpoint in rotated if endpoint not in healthy]
+
+    def mark_failed(self, endpoint):
+        """
+        :param endpoint: Endpoint whose connection failed or dropped
+        """
+        if endpoint is None:
+            return
+        with self.lock:
+            self.failed_at[endpoint] = time.monotonic()
+            if endpoint in self.endpoints:
+                # Fail over: prefer the endpoint after this one next time
+                self.next_index = (self.endpoints.index(
+                    endpoint) + 1) % len(self.endpoints)
+
+    def mark_connected(self, endpoint):
+        """
+        :param endpoint: Endpoint that accepted a connection
+        """
+        with self.lock:
+            self.failed_at.pop(endpoint, None)
+
+    def connect(self, timeout=None):
+        """
+        Connect to the best available endpoint.
+
+        :param timeout: Seconds each attempt may take (None for the OS default)
+        :return: Tuple of the connected socket and its endpoint
+        :raises OSError: If no endpoint accepted the connection
+        """
+        order = self.order()
+        try:
+            connection, endpoint = staggered_connect(
+                order, timeout, self.stagger)
+        except OSError:
+            now = time.monotonic()
+            with self.lock:
+                for endpoint in order:
+                    self.failed_at[endpoint] = now
+            raise
+        self.mark_connected(endpoint)
+        return connection, endpoint
+
+    def __str__(self):
+        return ", ".join(f"{host}:{port}" for host, port in self.endpoints)
@@ -0,0 +1,113 @@
+import json
+from dataclasses import dataclass
+
+# Typed events the ChatClient publishes to its subscribers once a response has been handled.
+# Subscribers receive the Python objects directly, so nothing is serialized on the way to the UI.
+# (Explicit __slots__ instead of dataclass(slots=True) to stay compatible with Python 3.9.)
+
+
+@dataclass
+class LookupResult:
+    """ Result of LOOKUP_USER (1). """
+    __slots__ = ("exists",)
+    exists: bool
+
+
+@dataclass
+class LoginResult:
+    """ Result of LOGIN (2). """
+    __slots__ = ("success", "unread_count")
+    success: bool
+    unread_count: int
+
+
+@dataclass
+class AccountCreated:
+    """ Result of CREATE_ACCOUNT (3). """
+    __slots__ = ("success",)
+    success: bool
+
+
+@dataclass
+class AccountsPage:
+    """ Result of LIST_ACCOUNTS (4): list of (account ID, username) tuples. """
+    __slots__ = ("accounts",)
+    accounts: list
+
+
+@dataclass
+class MessageSent:
+    """ Result of SEND_MESSAGE (5). """
+    __slots__ = ("success", "message_id")
+    success: bool
+    message_id: int
+
+
+@dataclass
+class MessagesReceived:
+    """ Result of REQUEST_MESSAGES (6), or messages pushed by the server: list of (message ID, sender, message) tuples. """
+    __slots__ = ("messages",)
+    messages: list
+
+
+@dataclass
+class MessagesDeleted:
+    """ Result of DELETE_MESSAGES (7). """
+    __slots__ = ("success",)
+    success: bool
+
+
+@dataclass
+class AccountDeleted:
+    """ Result of DELETE_ACCOUNT (8). """
+    __slots__ = ()
+
+
+@dataclass
+class Connected:
+    """ The connection started with ChatClient.start() is ready. """
+    __slots__ = ()
+
+
+@dataclass
+class ConnectionLost:
+    """ The connection dropped or could not be established (a ReconnectSupervisor, if any, keeps trying). """
+    __slots__ = ()
+
+
+@dataclass
+class Reconnected:
+    """ The connection was re-established after `attempts` tries; `resumed` tells whether the login was replayed. """
+    __slots__ = ("attempts", "resumed")
+    attempts: int
+    resumed: bool
+
+
+def to_legacy_message(event):
+    """
+    Convert an event into the "OPERATION:data" string the original message callbacks expect.
+    Only used to keep string callbacks (passed to start_listener) working.
+
+    :param event: Event object
+    :return: Callback string, e.g. "LOGIN:1:3" or "REQUEST_MESSAGES:[...]",
+        or None for connection events (which have no string form)
+    """
+    if isinstance(event, LookupResult):
+        return f"LOOKUP_USER:{int(event.exists)}"
+    elif isinstance(event, LoginResult):
+        return f"LOGIN:{int(event.success)}:{event.unread_count}"
+    elif isinstance(event, AccountCreated):
+        return f"CREATE_ACCOUNT:{int(event.success)}"
+    elif isinstance(event, AccountsPage):
+        return f"LIST_ACCOUNTS:{json.dumps(event.accounts)}"
+    elif isinstance(event, MessageSent):
+        return f"SEND_MESSAGE:{int(event.success)}"
+    elif isinstance(event, MessagesReceived):
+        return f"REQUEST_MESSAGES:{json.dumps(event.messages)}"
+    elif isinstance(event, MessagesDeleted):
+        return f"DELETE_MESSAGES:{int(event.success)}"
+    elif isinstance(event, AccountDeleted):
+        return f"DELETE_ACCOUNT:{1}"
+    elif isinstance(event, (Connected, ConnectionLost, Reconnected)):
+        return None
+    raise TypeError(f"Unknown event type: {type(event).__name__}")
@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt
+
+HASH_MODES = ("inline", "thread", "process")
+
+
+def hash_password(password, salt):
+    """
+    Hash a password with bcrypt. Module-level so it can be sent to worker processes.
+
+    :param password: Password (str)
+    :param salt: Bcrypt salt/prefix (bytes)
+    :return: Hashed password (bytes)
+    """
+    return bcrypt.hashpw(password.encode("utf-8"), salt)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing on an executor so that it does not occupy the thread sending requests.
+
+    Each hash costs ~250 ms of CPU at the default cost factor. In "process" mode hashes run
+    in a pool of worker processes, so N logins hash on N cores at once; "thread" mode uses
+    a thread pool (bcrypt releases the GIL while hashing) and "inline" hashes on the calling
+    thread, like the client originally did.
+    """
+
+    def __init__(self, mode="thread", workers=None):
+        """
+        Initialize the hasher. The executor is created on first use.
+
+        :param mode: "inline", "thread" or "process"
+        :param workers: Number of worker threads/processes (defaults to the number of CPUs)
+        """
+        if mode not in HASH_MODES:
+            raise ValueError(
+                f"Unknown hash mode {mode!r} (expected one of {', '.join(HASH_MODES)})")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        """
+        :return: The executor running the hashes (created if needed)
+        """
+        with self.lock:
+            if self.executor is None:
+                if self.mode == "process":
+                    self.executor = ProcessPoolExecutor(
+                        max_workers=self.workers)
+                else:
+                    self.executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="hasher")
+            return self.executor
+
+    def submit(self, password, salt):
+        """
+        Start hashing a password.
+
+        :param password: Password (str)
+        :param salt: Bcrypt salt/prefix (bytes)
+        :return: concurrent.futures.Future resolved with the hashed password
+        """
+        if self.mode == "inline":
+            future = Future()
+            try:
+                future.set_result(hash_password(password, salt))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self.get_executor().submit(hash_password, password, salt)
+
+    def hash(self, password, salt):
+        """
+        Hash a password, blocking until the result is ready.
+
+        :param password: Password (str)
+        :param salt: Bcrypt salt/prefix (bytes)
+        :return: Hashed password (bytes)
+        """
+        if self.mode == "inline":
+            return hash_password(password, salt)
+        return self.submit(password, salt).result()
+
+    async def hash_async(self, password, salt):
+        """
+        Hash a password without blocking the event loop.
+
+        :param password: Password (str)
+        :param salt: Bcrypt salt/prefix (bytes)
+        :return: Hashed password (bytes)
+        """
+        if self.mode == "inline":
+            return hash_password(password, salt)
+        return await asyncio.wrap_future(self.submit(password, salt))
+
+    def shutdown(self, wait=True):
+        """
+        Stop the executor. A later hash starts a new one.
+
+        :param wait: Whether to wait for running hashes to finish
+        """
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_default_hasher = None
+_default_hasher_lock = threading.Lock()
+
+
+def get_default_hasher():
+    """
+    :return: PasswordHasher shared by clients that are not given their own (thread mode)
+    """
+    global _default_hasher
+    with _default_hasher_lock:
+        if _default_hasher is None:
+            _default_hasher = PasswordHasher()
+        return _default_hasher
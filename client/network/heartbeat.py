@@ -0,0 +1,145 @@
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger("chat.network.heartbeat")
+
+
+class RttEstimator:
+    """
+    Smoothed round-trip time estimator, computed like TCP's retransmission timer (RFC 6298):
+    SRTT and RTTVAR are exponentially weighted averages of the samples and their deviation,
+    and the timeout is SRTT + 4 * RTTVAR, clamped to [min_rto, max_rto].
+    """
+
+    ALPHA = 1 / 8  # Weight of a new sample in SRTT
+    BETA = 1 / 4  # Weight of a new deviation in RTTVAR
+    K = 4  # Deviations added to SRTT for the timeout
+
+    def __init__(self, initial_rto=1.0, min_rto=1.0, max_rto=60.0):
+        """
+        :param initial_rto: Timeout in seconds until the first sample
+        :param min_rto: Smallest timeout in seconds
+        :param max_rto: Largest timeout in seconds
+        """
+        self.initial_rto = initial_rto
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.srtt = None  # Smoothed RTT in seconds (None until the first sample)
+        self.rttvar = None  # RTT variance estimate in seconds
+        self.samples = 0
+        self.lock = threading.Lock()
+
+    def observe(self, rtt):
+        """
+        :param rtt: Measured round-trip time in seconds
+        """
+        with self.lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + \
+                    self.BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+            self.samples += 1
+
+    @property
+    def rto(self):
+        """
+        :return: Seconds to wait for a response before considering it lost
+        """
+        with self.lock:
+            if self.srtt is None:
+                return self.initial_rto
+            return min(self.max_rto, max(self.min_rto, self.srtt + self.K * self.rttvar))
+
+    def snapshot(self):
+        """
+        :return: Dictionary with the SRTT, RTTVAR, timeout and number of samples
+        """
+        rto = self.rto
+        with self.lock:
+            return {"srtt": self.srtt, "rttvar": self.rttvar, "rto": rto, "samples": self.samples}
+
+
+class Heartbeat:
+    """
+    Periodically sends a cheap request and waits for its response, so a half-open
+    connection is noticed without waiting for the user's next action.
+
+    Neither protocol has a ping operation, so a heartbeat is a LOOKUP_USER whose response is
+    not handled like a lookup (see ChatClient.send_heartbeat). Each answered beat is an RTT
+    sample for the client's RttEstimator; a beat not answered within the estimator's timeout
+    is missed, and after max_missed consecutive misses the connection is closed so that a
+    ReconnectSupervisor (if any) can replace it.
+    """
+
+    def __init__(self, client, interval=15.0, max_missed=3):
+        """
+        Attach a heartbeat to a client (call start() to begin).
+
+        :param client: ChatClient to monitor
+        :param interval: Seconds between beats
+        :param max_missed: Consecutive missed beats after which the connection is declared dead
+        """
+        self.client = client
+        self.interval = interval
+        self.max_missed = max_missed
+        self.missed = 0  # Consecutive missed beats
+        self.stopped = threading.Event()
+        self.thread = None
+        client.heartbeat = self
+
+    def start(self):
+        """
+        Start sending beats on a background thread.
+        """
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop sending beats (called by the client's close()).
+        """
+        self.stopped.set()
+
+    def run(self):
+        """
+        Send a beat every interval until stopped.
+        """
+        while not self.stopped.wait(self.interval):
+            self.beat()
+
+    def beat(self):
+        """
+        Send one beat and wait for its response.
+
+        :return: True if it was answered, False if it was missed, None if the client is not connected
+        """
+        if not self.client.running or self.client.socket is None:
+            self.missed = 0  # Reconnecting: the new connection starts with a clean slate
+            return None
+        timeout = self.client.rtt.rto
+        started = time.perf_counter()
+        future = self.client.send_heartbeat()
+        if not future:
+            return None
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.missed += 1
+            logger.warning("Heartbeat not answered within %.2f s (%d/%d missed)",
+                           timeout, self.missed, self.max_missed)
+            if self.missed >= self.max_missed:
+                self.missed = 0
+                self.client.connection_dead()
+            return False
+        except Exception as e:
+            logger.debug("Heartbeat failed: %s", e)  # The connection closed meanwhile
+            return None
+
+        self.missed = 0
+        self.client.rtt.observe(time.perf_counter() - started)
+        return True
@@ -0,0 +1,131 @@
+import json
+from .wire_protocol import (LOOKUP_USER, LOGIN, CREATE_ACCOUNT, LIST_ACCOUNTS, SEND_MESSAGE, REQUEST_MESSAGES,
+                            DELETE_MESSAGES, DELETE_ACCOUNT, OPERATION_NAMES, LookupUserFrame, LoginFrame,
+                            CreateAccountFrame, ListAccountsFrame, SendMessageFrame, RequestMessagesFrame,
+                            DeleteMessagesFrame, DeleteAccountFrame, FailureFrame)
+
+# JSON operation names -> operation IDs shared with the wire protocol
+OPERATION_IDS = {name: op_id for op_id, name in OPERATION_NAMES.items()}
+
+
+class JSONProtocolError(ValueError):
+    """
+    Raised when a line received from the server is not a valid JSON protocol response.
+    """
+    pass
+
+
+class LineFramer:
+    """
+    Splits the received byte stream into newline-terminated messages in linear time.
+
+    Received chunks are appended to one bytearray. Only the bytes that arrived since the
+    last call are scanned for newlines, each complete line is decoded straight out of the
+    buffer through a memoryview (one copy per message), and consumed bytes are dropped
+    once per call instead of once per message.
+    """
+
+    def __init__(self, max_line_length=1 << 20):
+        """
+        Initialize the framer.
+
+        :param max_line_length: Longest message (in bytes, without the newline) that is accepted
+        """
+        self.max_line_length = max_line_length
+        self.buffer = bytearray()  # Received bytes that do not form a complete line yet
+        self.scan_offset = 0  # Bytes of the buffer already known to contain no newline
+
+    def feed(self, data):
+        """
+        Add received bytes to the framer.
+
+        :param data: Bytes-like chunk received from the server
+        :return: List of complete messages decoded as UTF-8 strings (possibly empty)
+        """
+        self.buffer += data
+        buffer = self.buffer
+        lines = []
+        start = 0
+        end = buffer.find(b"\n", self.scan_offset)
+        if end >= 0:
+            view = memoryview(buffer)
+            try:
+                while end >= 0:
+                    if end - start > self.max_line_length:
+                        raise JSONProtocolError(
+                            f"Message longer than {self.max_line_length} bytes")
+                    if end > start:  # Skip blank lines
+                        lines.append(str(view[start:end], "utf-8"))
+                    start = end + 1
+                    end = buffer.find(b"\n", start)
+            finally:
+                view.release()
+            del buffer[:start]
+
+        self.scan_offset = len(buffer)
+        if self.scan_offset > self.max_line_length:
+            raise JSONProtocolError(
+                f"Message longer than {self.max_line_length} bytes")
+        return lines
+
+    def pending_bytes(self):
+        """
+        :return: Number of buffered bytes belonging to an incomplete message
+        """
+        return len(self.buffer)
+
+
+def encode_request(operation, payload=None):
+    """
+    Encode a JSON protocol request.
+
+    :param operation: Operation name
+    :param payload: Payload data
+    :return: Newline-terminated request bytes
+    """
+    return (json.dumps({"operation": operation, "payload": payload or {}}) + '\n').encode("utf-8")
+
+
+def decode_response(line):
+    """
+    Decode one JSON protocol response into the same frame types the wire decoder produces,
+    so callers can handle both protocols the same way.
+
+    :param line: A single response line (without the trailing newline)
+    :return: The decoded frame
+    """
+    try:
+        parsed_message = json.loads(line)
+        operation = parsed_message.get("operation")
+    except (ValueError, AttributeError) as e:
+        raise JSONProtocolError(f"Invalid JSON response: {e}")
+
+    op_id = OPERATION_IDS.get(operation, 0)
+    success = parsed_message.get("success")
+    payload = parsed_message.get("payload") or {}
+
+    if parsed_message.get("unexpected_failure") or op_id == 0:
+        return FailureFrame(op_id, parsed_message.get("message", ""))
+
+    try:
+        if op_id == LOOKUP_USER:
+            exists = int(bool(payload.get("exists")))
+            prefix = payload["bcrypt_prefix"].encode("utf-8") if exists else None
+            return LookupUserFrame(exists, prefix)
+        elif op_id == LOGIN:
+            return LoginFrame(int(bool(success)), payload.get("unread_messages", 0) if success else 0)
+        elif op_id == CREATE_ACCOUNT:
+            return CreateAccountFrame(int(bool(success)))
+        elif op_id == LIST_ACCOUNTS:
+            return ListAccountsFrame([(account["id"], account["username"]) for account in payload["accounts"]])
+        elif op_id == SEND_MESSAGE:
+            return SendMessageFrame(int(bool(success)), payload.get("message_id", 0))
+        elif op_id == REQUEST_MESSAGES:
+            return RequestMessagesFrame([(message["id"], message["sender"], message["message"])
+                                         for message in payload["messages"]])
+        elif op_id == DELETE_MESSAGES:
+            return DeleteMessagesFrame(int(bool(success)))
+        else:  # DELETE_ACCOUNT
+            return DeleteAccountFrame()
+    except (KeyError, TypeError) as e:
+        raise JSONProtocolError(f"Invalid {operation} payload: {e}")
@@ -0,0 +1,329 @@
+import bisect
+import json
+import threading
+from .wire_protocol import OPERATION_NAMES
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = tuple(0.0001 * 2 ** i for i in range(20))  # 100 us .. ~52 s
+SIZE_BUCKETS = tuple(2 ** i for i in range(4, 25))  # 16 B .. 16 MB
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Observations are counted in the first bucket whose upper bound
+    is >= the value (plus an overflow bucket), so recording is O(log buckets) and memory
+    does not grow with the number of observations. Quantiles are estimated by linear
+    interpolation inside the bucket that contains them.
+    """
+
+    def __init__(self, bounds):
+        """
+        :param bounds: Sorted bucket upper bounds
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket: values above every bound
+        self.count = 0
+        self.sum = 0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        """
+        :param value: Value to record
+        """
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        Estimate a quantile of the recorded values.
+
+        :param q: Quantile between 0 and 1 (e.g. 0.95)
+        :return: Estimated value, or None if nothing was recorded
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = self.bounds[index - 1] if index > 0 else 0
+                upper = self.bounds[index] if index < len(
+                    self.bounds) else self.max
+                estimate = lower + (upper - lower) * \
+                    (rank - cumulative) / bucket_count
+                # Never report outside the observed range
+                return min(max(estimate, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def merge(self, other):
+        """
+        Add the observations of another histogram with the same buckets.
+
+        :param other: Histogram to add
+        """
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.count += other.count
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def summary(self):
+        """
+        :return: Dictionary with the count, sum, min, max and p50/p95/p99 estimates
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class OperationMetrics:
+    """
+    Metrics for a single operation.
+    """
+
+    def __init__(self):
+        self.requests = 0  # Requests sent
+        self.responses = 0  # Responses matched to a request
+        self.errors = 0  # Failed sends and failure responses
+        self.pushes = 0  # Frames the server sent without a request (e.g. new messages)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.latency = Histogram(LATENCY_BUCKETS)  # Seconds from send to response
+
+    def merge(self, other):
+        """
+        :param other: OperationMetrics to add to these
+        """
+        self.requests += other.requests
+        self.responses += other.responses
+        self.errors += other.errors
+        self.pushes += other.pushes
+        self.request_bytes.merge(other.request_bytes)
+        self.response_bytes.merge(other.response_bytes)
+        self.latency.merge(other.latency)
+
+
+class ReconnectMetrics:
+    """
+    Metrics for reconnects after a lost connection.
+    """
+
+    def __init__(self):
+        self.reconnects = 0  # Connections re-established
+        self.failures = 0  # Reconnect cycles that gave up
+        self.attempts = 0  # Connection attempts in every cycle
+        self.latency = Histogram(LATENCY_BUCKETS)  # Seconds from losing to re-establishing the connection
+
+    def merge(self, other):
+        """
+        :param other: ReconnectMetrics to add to these
+        """
+        self.reconnects += other.reconnects
+        self.failures += other.failures
+        self.attempts += other.attempts
+        self.latency.merge(other.latency)
+
+    def summary(self):
+        """
+        :return: Dictionary with the counters and the latency summary
+        """
+        return {
+            "reconnects": self.reconnects,
+            "failures": self.failures,
+            "attempts": self.attempts,
+            "latency_seconds": self.latency.summary(),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe per-operation metrics for a client (or several clients sharing it):
+    request/response sizes, round-trip latency, errors and server pushes, plus reconnects.
+    Snapshots can be exported as JSON or in the Prometheus text format.
+    """
+
+    def __init__(self, labels=None):
+        """
+        :param labels: Labels added to every exported metric (e.g. {"protocol": "wire"})
+        """
+        self.labels = dict(labels or {})
+        self.operations = {}  # Operation ID -> OperationMetrics
+        self.reconnect = ReconnectMetrics()
+        self.lock = threading.Lock()
+
+    def get_operation(self, op_id):
+        """
+        :param op_id: Operation ID
+        :return: OperationMetrics of the operation (created if needed); call with the lock held
+        """
+        metrics = self.operations.get(op_id)
+        if metrics is None:
+            metrics = self.operations[op_id] = OperationMetrics()
+        return metrics
+
+    def record_request(self, op_id, size):
+        """
+        :param op_id: Operation ID of the request sent
+        :param size: Encoded request size in bytes
+        """
+        with self.lock:
+            metrics = self.get_operation(op_id)
+            metrics.requests += 1
+            metrics.request_bytes.observe(size)
+
+    def record_response(self, op_id, size, latency=None, failed=False):
+        """
+        :param op_id: Operation ID the response belongs to
+        :param size: Encoded response size in bytes
+        :param latency: Seconds since the request was sent (None for server pushes)
+        :param failed: Whether the server reported a failure
+        """
+        with self.lock:
+            metrics = self.get_operation(op_id)
+            if latency is None:
+                metrics.pushes += 1
+            else:
+                metrics.responses += 1
+                metrics.latency.observe(latency)
+            if failed:
+                metrics.errors += 1
+            metrics.response_bytes.observe(size)
+
+    def record_error(self, op_id):
+        """
+        :param op_id: Operation ID of a request that could not be sent
+        """
+        with self.lock:
+            self.get_operation(op_id).errors += 1
+
+    def record_reconnect(self, attempts, latency, success):
+        """
+        :param attempts: Connection attempts made in the reconnect cycle
+        :param latency: Seconds from the start of the cycle until it ended
+        :param success: Whether the connection was re-established
+        """
+        with self.lock:
+            self.reconnect.attempts += attempts
+            if success:
+                self.reconnect.reconnects += 1
+                self.reconnect.latency.observe(latency)
+            else:
+                self.reconnect.failures += 1
+
+    def merge(self, other):
+        """
+        Add the metrics of another registry (e.g. to aggregate several clients).
+
+        :param other: MetricsRegistry to add
+        """
+        with other.lock:
+            operations = list(other.operations.items())
+            reconnect = ReconnectMetrics()
+            reconnect.merge(other.reconnect)
+        with self.lock:
+            for op_id, metrics in operations:
+                self.get_operation(op_id).merge(metrics)
+            self.reconnect.merge(reconnect)
+
+    def snapshot(self):
+        """
+        :return: Dictionary of operation name -> counters and histogram summaries
+        """
+        with self.lock:
+            return {
+                OPERATION_NAMES.get(op_id, str(op_id)): {
+                    "requests": metrics.requests,
+                    "responses": metrics.responses,
+                    "errors": metrics.errors,
+                    "pushes": metrics.pushes,
+                    "request_bytes": metrics.request_bytes.summary(),
+                    "response_bytes": metrics.response_bytes.summary(),
+                    "latency_seconds": metrics.latency.summary(),
+                }
+                for op_id, metrics in sorted(self.operations.items())
+            }
+
+    def to_json(self):
+        """
+        :return: JSON snapshot, including the registry labels
+        """
+        with self.lock:
+            reconnect = self.reconnect.summary()
+        return json.dumps({"labels": self.labels, "operations": self.snapshot(), "reconnect": reconnect})
+
+    def to_prometheus(self, prefix="chat_client"):
+        """
+        Export the metrics in the Prometheus text exposition format.
+
+        :param prefix: Prefix for every metric name
+        :return: Exposition text
+        """
+        lines = []
+        with self.lock:
+            operations = sorted(self.operations.items())
+            for name, attribute in (("requests", "requests"), ("responses", "responses"),
+                                    ("errors", "errors"), ("pushes", "pushes")):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for op_id, metrics in operations:
+                    lines.append(
+                        f"{metric}{{{self.format_labels(op_id)}}} {getattr(metrics, attribute)}")
+            for name, attribute in (("request_bytes", "request_bytes"), ("response_bytes", "response_bytes"),
+                                    ("latency_seconds", "latency")):
+                metric = f"{prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for op_id, metrics in operations:
+                    histogram = getattr(metrics, attribute)
+                    labels = self.format_labels(op_id)
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                        cumulative += bucket_count
+                        lines.append(
+                            f'{metric}_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                    lines.append(
+                        f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:g}")
+                    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+            labels = ",".join(f'{key}="{value}"' for key, value in self.labels.items())
+            for name, value in (("reconnects", self.reconnect.reconnects),
+                                ("reconnect_failures", self.reconnect.failures),
+                                ("reconnect_attempts", self.reconnect.attempts)):
+                metric = f"{prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{{{labels}}} {value}")
+            metric = f"{prefix}_reconnect_seconds"
+            histogram = self.reconnect.latency
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{labels}{"," if labels else ""}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:g}")
+            lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def format_labels(self, op_id):
+        """
+        :param op_id: Operation ID
+        :return: Prometheus label list (without braces) for an operation
+        """
+        labels = dict(self.labels, operation=OPERATION_NAMES.get(op_id, str(op_id)))
+        return ",".join(f'{key}="{value}"' for key, value in labels.items())
@@ -1,16 +1,35 @@
+import logging
 import socket
 import threading
+import time
 from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from functools import partial
 import bcrypt
+from .pending import PendingRequests
+from .dispatcher import Dispatcher
+from .events import Connected, ConnectionLost, to_legacy_message
+from .hashing import get_default_hasher
+from .metrics import MetricsRegistry
+from .outbox import Outbox
+from .heartbeat import RttEstimator
+from .endpoints import EndpointList
+from .writer import FrameWriter
+
+logger = logging.getLogger("chat.network")
 
 
 class ChatClient(ABC):
     """
     Base class to handles the client-side network communication for the chat application.
     """
+    protocol = "unknown"  # Protocol name used to label metrics (set by subclasses)
+
     ### GENERAL FUNCTIONS ###
 
-    def __init__(self, host, port, max_msg, max_users):
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, dispatcher=None, hasher=None,
+                 prefix_cache=None, metrics=None, outbox=None, connect_timeout=None, defer_connect=False,
+                 endpoints=None):
         """
         Initialize the client.
 
@@ -18,27 +37,67 @@ class ChatClient(ABC):
         :param port: Server port
         :param max_msg: Maximum number of messages to display
         :param max_users: Maximum number of users to display
+        :param recv_size: Maximum number of bytes to read from the socket at once
+        :param dispatcher: Dispatcher running response handlers (may be shared between clients)
+        :param hasher: PasswordHasher running bcrypt (defaults to a shared thread-pool hasher)
+        :param prefix_cache: Optional PrefixCache of known bcrypt prefixes (lets logins skip LOOKUP_USER)
+        :param metrics: MetricsRegistry to record per-operation metrics in (may be shared between clients)
+        :param outbox: Optional Outbox keeping messages sent while disconnected (otherwise they are dropped)
+        :param connect_timeout: Seconds to wait for the TCP connection (None for the OS default)
+        :param defer_connect: Do not connect here; start() then connects on a background thread
+        :param endpoints: Optional list of (host, port) servers to race and fail over between
+            (defaults to host/port alone; host/port still name the server in cache keys)
         """
         self.host = host  # Server host
         self.port = port  # Server port
-        self.socket = socket.socket(
-            socket.AF_INET, socket.SOCK_STREAM)  # Create a TCP socket
+        # Servers to connect to, raced Happy Eyeballs style, and the one currently connected
+        self.endpoints = EndpointList(endpoints or [(host, port)])
+        self.endpoint = None
+        self.socket = None  # TCP socket (created by connect)
         self.running = False  # Flag to indicate if the client is running
+        self.connect_timeout = connect_timeout  # Seconds allowed for connecting (None: OS default)
         self.thread = None  # Thread to listen for messages from the server
+        self.closing = False  # Set by close(); a lost connection is only reconnected otherwise
+        self.supervisor = None  # Optional ReconnectSupervisor (attaches itself)
+        self.heartbeat = None  # Optional Heartbeat (attaches itself)
+        self.rtt = RttEstimator()  # Smoothed round-trip time, sampled by the heartbeat
 
         self.max_msg = max_msg  # Maximum number of messages to display
         self.max_users = max_users  # Maximum number of users to display
+        self.recv_size = recv_size  # Size of each socket read
 
         self.last_offset_account_id = 0  # Offset ID for pagination of accounts
         self.bcrypt_prefix = None  # Bcrypt prefix for password hashing
         self.username = None  # Username of the client
-        self.message_callback = None  # Callback function to handle received messages
+        self.lookup_username = None  # Username of the last LOOKUP_USER request
+        self.session = None  # (username, hashed password) replayed after a reconnect
+        self.resuming = False  # Whether the next LOGIN response answers a replayed login
+        self.prefix_cache = prefix_cache  # Known bcrypt prefixes (None to always look up)
+        self.message_callback = None  # Legacy string callback to handle received messages
+        self.subscribers = {}  # Event type -> list of callbacks
+        self.pending = PendingRequests()  # Requests waiting for a response
+        # Single writer for the socket: keeps frames whole and in the order they were registered
+        self.writer = FrameWriter(self.send_buffers)
+        # Runs network actions submitted by the UI, one at a time on a single thread
+        self.actions = Dispatcher()
+        # Runs response handlers off the listener thread, in order
+        self.dispatcher = dispatcher or Dispatcher()
+        # Runs bcrypt off the calling thread (use process mode to hash on several cores)
+        self.hasher = hasher or get_default_hasher()
 
         self.bytes_sent = 0  # Number of bytes sent
         self.bytes_received = 0  # Number of bytes received
+        # Per-operation sizes, latencies, errors and pushes
+        self.metrics = metrics or MetricsRegistry({"protocol": self.protocol})
 
-        print("[INITIALIZED] Client initialized")
-        self.connect()
+        self.outbox = outbox  # Messages waiting for the next login (None to drop them)
+        self.outbox_futures = {}  # Entry ID -> Future returned by queue_message
+        self.outbox_in_flight = set()  # Entry IDs sent and waiting for a response
+        self.outbox_lock = threading.Lock()
+
+        logger.debug("Client initialized")
+        if not defer_connect:
+            self.connect()
 
     def connect(self):
         """ 
@@ -47,29 +106,169 @@ class ChatClient(ABC):
         :return: True if connection is successful, False otherwise
         """
         try:
-            self.socket.connect((self.host, self.port))
-            self.running = True
-            print(f"[CONNECTED] Connected to {self.host}:{self.port}")
+            connection, endpoint = self.endpoints.connect(self.connect_timeout)
         except Exception as e:
-            return self.log_error(f"Could not connect to {self.host}:{self.port} - {e}", False)
+            return self.log_error(f"Could not connect to {self.endpoints} - {e}", False)
+        if self.socket is not None:
+            self.socket.close()  # Socket of a previous (or never made) connection
+        self.socket = connection
+        self.endpoint = endpoint
+        self.running = True
+        logger.info("Connected to %s:%s", *endpoint)
         return True
 
-    def start_listener(self, callback):
+    def start_listener(self, callback=None):
         """
         Start a thread to listen for messages from the server.
 
-        :param callback: Callback function to handle received messages
+        :param callback: Optional legacy callback receiving every event as an "OPERATION:data" string
+            (prefer subscribe, which delivers typed events without serializing them)
         """
         self.message_callback = callback
         self.thread = threading.Thread(
-            target=self.listen_for_messages, daemon=True)
+            target=self.run_listener, daemon=True)
         self.thread.start()
 
+    def start(self, callback=None):
+        """
+        Start the client without blocking: if it is not connected yet, connect on a background
+        thread. Once connected, the listener is started and a Connected event is published.
+        If connecting fails, the supervisor (if any) takes over; otherwise ConnectionLost is published.
+
+        :param callback: Optional legacy string callback (see start_listener)
+        """
+        self.message_callback = callback
+        if self.running:
+            self.start_listener(callback)
+            self.emit(Connected())
+            return
+        threading.Thread(target=self.connect_in_background, daemon=True).start()
+
+    def connect_in_background(self):
+        """
+        Connect, then start the listener (runs on the thread started by start()).
+        """
+        if self.connect():
+            self.start_listener(self.message_callback)
+            self.emit(Connected())
+        elif self.closing:
+            return
+        elif self.supervisor is not None:
+            self.supervisor.connection_lost()
+        else:
+            self.emit(ConnectionLost())
+
+    def run_listener(self):
+        """
+        Run the listener and report a lost connection to the supervisor when it stops.
+        """
+        self.listen_for_messages()
+        if not self.closing and self.supervisor is not None:
+            self.endpoints.mark_failed(self.endpoint)  # Fail over to the next server
+            self.disconnect()
+            self.supervisor.connection_lost()
+
+    def reconnect(self):
+        """
+        Replace a lost connection with a new one and restart the listener
+        (keeping the subscribers and the legacy callback).
+
+        :return: True if the new connection is established, False otherwise
+        """
+        if self.closing:
+            return False
+        self.disconnect()
+        self.reset_connection_state()
+        if not self.connect():
+            return False
+        self.start_listener(self.message_callback)
+        return True
+
+    def reset_connection_state(self):
+        """
+        Discard per-connection protocol state before reconnecting (overridden by subclasses that keep any).
+        """
+
+    def resume_session(self):
+        """
+        Replay the login of the previous connection with the stored password hash.
+
+        :return: Future resolved with the LOGIN result, or None if there is no session to resume
+        """
+        if self.session is None:
+            return None
+        username, hashed_password = self.session
+        logger.info("Resuming session of %s", username)
+        self.resuming = True
+        future = self.send_hashed_login(username, hashed_password)
+        if not future:
+            self.resuming = False
+        return future
+
+    ### EVENTS ###
+    def subscribe(self, event_type, callback):
+        """
+        Call a function whenever an event of the given type is published.
+
+        :param event_type: Event class from events.py (e.g. MessagesReceived)
+        :param callback: Function taking the event object
+        """
+        # Copy on write so emit can iterate without a lock
+        self.subscribers[event_type] = self.subscribers.get(
+            event_type, []) + [callback]
+
+    def unsubscribe(self, event_type, callback):
+        """
+        Stop calling a function for an event type.
+
+        :param event_type: Event class the callback was subscribed to
+        :param callback: The subscribed function
+        """
+        callbacks = self.subscribers.get(event_type, [])
+        if callback in callbacks:
+            self.subscribers[event_type] = [
+                subscriber for subscriber in callbacks if subscriber != callback]
+
+    def emit(self, event):
+        """
+        Publish an event to its subscribers (and to the legacy string callback, if set).
+
+        :param event: Event object
+        """
+        for callback in self.subscribers.get(type(event), ()):
+            callback(event)
+        if self.message_callback:
+            message = to_legacy_message(event)
+            if message is not None:
+                self.message_callback(message)
+
     def close(self):
         """
-        Close the connection to the server.
+        Close the connection to the server for good (a supervisor does not reconnect it).
+        """
+        self.closing = True
+        if self.supervisor is not None:
+            self.supervisor.stop()
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
+        self.actions.shutdown(wait=False)
+        self.disconnect()
+
+    def connection_dead(self):
         """
-        print("CLOSING")
+        Tear down a connection that stopped answering heartbeats.
+        The listener then stops and reports the lost connection to the supervisor.
+        """
+        logger.warning("Connection to %s is not responding, closing it",
+                       self.endpoint)
+        self.endpoints.mark_failed(self.endpoint)
+        self.disconnect()
+
+    def disconnect(self):
+        """
+        Close the current connection and fail its pending requests.
+        """
+        logger.debug("Closing connection")
         if not self.running:
             return
         self.running = False
@@ -82,17 +281,134 @@ class ChatClient(ABC):
                 pass  # Ignore errors if the socket, is already closed
             self.socket = None
 
+        self.fail_pending_requests()
+
         # Don't try to join the thread if we're already in it
         if threading.current_thread() != self.thread and self.thread is not None:
             self.thread.join(timeout=1)
 
-        print("[DISCONNECTED] Disconnected from server")
+        logger.info("Disconnected from server")
+
+    ### REQUEST / RESPONSE CORRELATION ###
+    def new_request(self, op_id, heartbeat=False):
+        """
+        Register a request that is about to be sent.
+        Must be called before the request is written so the response cannot arrive first.
+
+        :param op_id: Operation ID of the request
+        :param heartbeat: Whether the request is a heartbeat (its response skips the handler)
+        :return: Future that resolves with the handler's result for the matching response
+        """
+        future = Future()
+        future.sent_at = time.perf_counter()  # For the round-trip latency
+        future.heartbeat = heartbeat
+        self.pending.push(op_id, future)
+        return future
+
+    def send_frame(self, buffers, requests=()):
+        """
+        Register requests and queue the frame carrying them on the writer.
+
+        :param buffers: List of bytes-like objects (one or more encoded requests)
+        :param requests: (operation ID, heartbeat) of each request in the frame that expects a response
+        :return: List of futures, one per entry of requests
+        :raises OSError: If the frame could not be written (its futures have been failed)
+        """
+        futures = []
+
+        def register():
+            for op_id, heartbeat in requests:
+                futures.append(self.new_request(op_id, heartbeat))
+
+        def fail(error):
+            for (op_id, _), future in zip(requests, futures):
+                self.abort_request(op_id, future, error)
+
+        self.writer.submit(buffers, register, fail)
+        return futures
+
+    def submit(self, function, *args):
+        """
+        Run a network action on the client's action thread without waiting for it.
+        Actions run one at a time, in the order they were submitted.
+
+        :param function: Function sending the request(s)
+        :param args: Arguments for the function
+        """
+        self.actions.submit(self, function, *args)
+
+    @abstractmethod
+    def send_buffers(self, buffers):
+        pass
+
+    def abort_request(self, op_id, future, error):
+        """
+        Withdraw a registered request that could not be sent.
+
+        :param op_id: Operation ID of the request
+        :param future: Future returned by new_request
+        :param error: Exception to fail the future with
+        """
+        self.pending.remove(op_id, future)
+        self.metrics.record_error(op_id)
+        if not future.done():
+            future.set_exception(error)
+
+    def complete_request(self, future, result):
+        """
+        Resolve the future of a request with its result.
+
+        :param future: Future of the request (None for server pushes)
+        :param result: Typed result returned by the response handler
+        """
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def record_response(self, op_id, future, size, failed=False):
+        """
+        Record the size and round-trip latency of a response in the metrics.
+
+        :param op_id: Operation ID the response belongs to
+        :param future: Future of the matching request (None for server pushes)
+        :param size: Size of the response in bytes
+        :param failed: Whether the server reported a failure
+        """
+        latency = None
+        if future is not None:
+            latency = time.perf_counter() - getattr(future, "sent_at", time.perf_counter())
+        self.metrics.record_response(op_id, size, latency, failed)
+
+    def fail_pending_requests(self):
+        """
+        Fail every request still waiting for a response (e.g. when the connection closes).
+        """
+        for future in self.pending.drain():
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+
+    @staticmethod
+    def is_heartbeat(future):
+        """
+        :param future: Future of the request a response belongs to (None for server pushes)
+        :return: Whether the response answers a heartbeat
+        """
+        return future is not None and getattr(future, "heartbeat", False)
+
+    def heartbeat_username(self):
+        """
+        :return: Username looked up by heartbeats (any name works; the answer is ignored)
+        """
+        return self.username or self.lookup_username or "heartbeat"
 
     ### TEMPLATE / ABSTRACT METHODS ###
     @abstractmethod
     def listen_for_messages(self):
         pass
 
+    @abstractmethod
+    def send_heartbeat(self):
+        pass
+
     # MAIN OPERATIONS
     # (1) LOOKUP
     @abstractmethod
@@ -108,6 +424,10 @@ class ChatClient(ABC):
     def send_login(self, username, password):
         pass
 
+    @abstractmethod
+    def send_hashed_login(self, username, hashed_password):
+        pass
+
     @abstractmethod
     def handle_login_response(self, payload=None, success=None):
         pass
@@ -123,7 +443,7 @@ class ChatClient(ABC):
 
     # (4) LIST ACCOUNTS
     @abstractmethod
-    def send_list_accounts(self, filter_text=""):
+    def send_list_accounts(self, filter_text="", offset_id=None):
         pass
 
     @abstractmethod
@@ -139,6 +459,10 @@ class ChatClient(ABC):
     def handle_send_message_response(self, payload=None):
         pass
 
+    @abstractmethod
+    def send_message_batch(self, messages):
+        pass
+
     # (6) REQUEST MESSAGES
     @abstractmethod
     def send_request_messages(self):
@@ -175,7 +499,7 @@ class ChatClient(ABC):
         :param return_value: Default return value
         :return: Default return value
         """
-        print(f"[ERROR] {message}")
+        logger.error("%s", message)
         return return_value
 
     def is_not_connected(self):
@@ -184,15 +508,128 @@ class ChatClient(ABC):
 
         :return: True if not connected, False otherwise
         """
-
-        print(f"Running: {self.running}, Socket: {self.socket}")
+        logger.debug("Running: %s, Socket: %s", self.running, self.socket)
 
         if not self.running or self.socket is None:
             self.log_error("Not connected to server")
-            self.close()
+            self.disconnect()
             return True
         return False
 
+    ### OFFLINE OUTBOX ###
+    def outbox_account(self):
+        """
+        :return: Outbox key of the logged-in account
+        """
+        return Outbox.account_key(self.host, self.port, self.username)
+
+    def queue_message(self, recipient, message):
+        """
+        Keep a message sent while disconnected in the outbox until the account logs in again.
+
+        :param recipient: Recipient of the message
+        :param message: Message to send
+        :return: Future resolved with the SEND_MESSAGE result once the message is flushed,
+            or None if there is no outbox (the message is dropped)
+        """
+        if self.outbox is None or not self.username:
+            return None
+        entry_id = self.outbox.add(self.outbox_account(), recipient, message)
+        future = Future()
+        with self.outbox_lock:
+            self.outbox_futures[entry_id] = future
+        logger.info("Queued message %d to %s until reconnected", entry_id, recipient)
+        return future
+
+    def send_or_queue_message(self, recipient, message, sent):
+        """
+        Keep a message in the outbox if sending it failed: when the write failed (the client had
+        not noticed the connection was gone yet) or the connection closed before the response.
+        In the second case the server may have stored it already, so it can be delivered twice.
+
+        :param recipient: Recipient of the message
+        :param message: Message sent
+        :param sent: Future of the SEND_MESSAGE request (False if it could not be written)
+        :return: Future resolved with the SEND_MESSAGE result (of the outbox flush if the
+            message was queued), or False if it was neither sent nor queued
+        """
+        if not sent:
+            return self.queue_message(recipient, message) or False
+
+        result = Future()
+
+        def chain(future):
+            if future.cancelled():
+                result.cancel()
+            elif future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result(future.result())
+
+        def done(future):
+            if future.cancelled() or not isinstance(future.exception(), ConnectionError):
+                chain(future)
+                return
+            queued = self.queue_message(recipient, message)
+            if queued is None:
+                chain(future)  # No outbox: the message is lost
+            else:
+                queued.add_done_callback(chain)
+
+        sent.add_done_callback(done)
+        return result
+
+    def flush_outbox(self):
+        """
+        Send every queued message of the logged-in account as one pipelined batch
+        (a single write, then the responses are matched in order).
+
+        :return: Number of messages sent
+        """
+        if self.outbox is None or not self.username or not self.running or self.socket is None:
+            return 0
+        with self.outbox_lock:
+            entries = [entry for entry in self.outbox.pending(self.outbox_account())
+                       if entry[0] not in self.outbox_in_flight]
+            self.outbox_in_flight.update(entry_id for entry_id, _, _ in entries)
+        if not entries:
+            return 0
+
+        logger.info("Flushing %d queued messages", len(entries))
+        futures = self.send_message_batch(
+            [(recipient, message) for _, recipient, message in entries])
+        if not futures:
+            # Nothing was sent: keep the entries for the next login
+            with self.outbox_lock:
+                self.outbox_in_flight.difference_update(
+                    entry_id for entry_id, _, _ in entries)
+            return 0
+        for (entry_id, _, _), future in zip(entries, futures):
+            future.add_done_callback(partial(self.complete_outbox_entry, entry_id))
+        return len(entries)
+
+    def complete_outbox_entry(self, entry_id, future):
+        """
+        Record the server's answer to a flushed outbox entry.
+
+        :param entry_id: Outbox entry ID
+        :param future: Future of the SEND_MESSAGE request
+        """
+        with self.outbox_lock:
+            self.outbox_in_flight.discard(entry_id)
+        if future.exception() is not None:
+            # The connection dropped before the response: send it again next time
+            return
+        result = future.result()
+        if result:
+            self.outbox.mark_sent(entry_id, result[1])
+        else:
+            self.outbox.mark_failed(entry_id)
+        with self.outbox_lock:
+            queued = self.outbox_futures.pop(entry_id, None)
+        if queued is not None and not queued.done():
+            queued.set_result(result)
+
     ### MISC HELPER FUNCTIONS ###
     def get_hashed_password_for_login(self, username, password):
         """
@@ -207,12 +644,17 @@ class ChatClient(ABC):
 
         # Lookup account
         salt = self.bcrypt_prefix
+        if username != self.lookup_username:
+            # Not looked up in this session: use the cached prefix if there is one
+            salt = self.cached_prefix(username) or salt
+            self.bcrypt_prefix = salt
         if salt is None:
             return self.log_error("Account does not exist")
 
         # Otherwise, account exists
         # Hash the password using the cost and salt
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
+        hashed_password = self.hasher.hash(password, salt)
+        self.session = (username, hashed_password)  # Replayed if the connection drops
         return hashed_password
 
     def generate_hashed_password_for_create(self, username, password):
@@ -225,10 +667,42 @@ class ChatClient(ABC):
         """
         # Generate a salt and hash the password
         salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), salt)
+        hashed_password = self.hasher.hash(password, salt)
         self.bcrypt_prefix = salt
 
         # store username
         self.username = username
+        self.session = (username, hashed_password)  # Replayed if the connection drops
 
         return hashed_password
+
+    ### BCRYPT PREFIX CACHE ###
+    def cached_prefix(self, username):
+        """
+        Get the cached bcrypt prefix of an account on this server.
+
+        :param username: Username
+        :return: Bcrypt prefix, or None if it is not cached (or there is no cache)
+        """
+        if self.prefix_cache is None or not username:
+            return None
+        return self.prefix_cache.get(self.host, self.port, username)
+
+    def remember_prefix(self, username, prefix):
+        """
+        Cache the bcrypt prefix of an account on this server.
+
+        :param username: Username
+        :param prefix: Bcrypt prefix
+        """
+        if self.prefix_cache is not None and username and prefix:
+            self.prefix_cache.put(self.host, self.port, username, prefix)
+
+    def forget_prefix(self, username):
+        """
+        Drop the cached bcrypt prefix of an account (e.g. after a failed login).
+
+        :param username: Username
+        """
+        if self.prefix_cache is not None and username:
+            self.prefix_cache.invalidate(self.host, self.port, username)
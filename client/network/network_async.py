@@ -0,0 +1,530 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+import bcrypt
+from .pending import PendingRequests
+from .hashing import get_default_hasher
+from .json_protocol import LineFramer, decode_response, encode_request
+from . import wire_protocol
+from .wire_protocol import (WireDecoder, LOOKUP_USER, LOGIN, CREATE_ACCOUNT, LIST_ACCOUNTS, SEND_MESSAGE,
+                            REQUEST_MESSAGES, DELETE_MESSAGES, FAILURE, OPERATION_NAMES)
+
+logger = logging.getLogger("chat.network.async")
+
+
+class AsyncChatClient(ABC):
+    """
+    asyncio-native counterpart of ChatClient.
+
+    Every operation is an `async def` that sends the request and returns the decoded response,
+    so a single event loop can drive many sessions without a thread per connection.
+    Responses are matched to requests through a per-connection FIFO of pending operations;
+    messages the server pushes on its own are handed to `push_callback`.
+    """
+    ### GENERAL FUNCTIONS ###
+
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, hasher=None):
+        """
+        Initialize the client. Call `connect()` before sending requests.
+
+        :param host: Server host
+        :param port: Server port
+        :param max_msg: Maximum number of messages to request at once
+        :param max_users: Maximum number of users to request at once
+        :param recv_size: Maximum number of bytes to read from the socket at once
+        :param hasher: PasswordHasher running bcrypt (share a process-mode hasher between many
+            clients to hash on several cores)
+        """
+        self.host = host  # Server host
+        self.port = port  # Server port
+        self.recv_size = recv_size  # Size of each socket read
+        self.reader = None  # asyncio.StreamReader for the connection
+        self.writer = None  # asyncio.StreamWriter for the connection
+        self.running = False  # Flag to indicate if the client is running
+        self.listener_task = None  # Task reading responses from the server
+
+        self.max_msg = max_msg  # Maximum number of messages to request
+        self.max_users = max_users  # Maximum number of users to request
+
+        self.last_offset_account_id = 0  # Offset ID for pagination of accounts
+        self.bcrypt_prefix = None  # Bcrypt prefix for password hashing
+        self.username = None  # Username of the client
+        self.push_callback = None  # Called with the list of messages the server pushes
+
+        self.pending = PendingRequests()  # Requests waiting for a response
+        self.hasher = hasher or get_default_hasher()  # Runs bcrypt off the event loop
+
+        self.bytes_sent = 0  # Number of bytes sent
+        self.bytes_received = 0  # Number of bytes received
+
+    async def connect(self):
+        """
+        Establish a connection to the server and start reading responses.
+
+        :return: True if connection is successful, False otherwise
+        """
+        try:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, limit=max(self.recv_size, 2 ** 16))
+        except OSError as e:
+            return self.log_error(f"Could not connect to {self.host}:{self.port} - {e}", False)
+        self.running = True
+        self.listener_task = asyncio.create_task(self.listen_for_messages())
+        return True
+
+    async def close(self):
+        """
+        Close the connection to the server. Requests still waiting for a response fail with ConnectionError.
+        """
+        self.running = False
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass  # Ignore errors if the socket is already closed
+            self.writer = None
+        if self.listener_task is not None and self.listener_task is not asyncio.current_task():
+            self.listener_task.cancel()
+            try:
+                await self.listener_task
+            except asyncio.CancelledError:
+                pass
+        self.listener_task = None
+        self.fail_pending()
+
+    async def listen_for_messages(self):
+        """
+        Read responses from the server and resolve the matching pending requests.
+        """
+        try:
+            while self.running:
+                frames = await self.read_frames()
+                if frames is None:  # Server closed the connection
+                    break
+                for frame in frames:
+                    self.handle_frame(frame)
+        except (OSError, ValueError) as e:
+            # Includes malformed or overlong responses: the stream cannot be resynchronized
+            self.log_error(f"Error receiving messages: {e}")
+            if self.writer is not None:
+                self.writer.close()
+        finally:
+            self.running = False
+            self.fail_pending()
+
+    def handle_frame(self, frame):
+        """
+        Resolve the pending request a frame answers, or pass a push on to `push_callback`.
+
+        :param frame: Decoded response frame
+        """
+        if frame.op_id == FAILURE:
+            future = self.pending.pop(frame.request_op_id) or self.pending.pop_oldest()
+            operation = OPERATION_NAMES.get(frame.request_op_id, "UNKNOWN")
+            self.log_error(f"Operation {operation} failed: {frame.message}")
+            if future is not None and not future.done():
+                future.set_result(False)
+            return
+
+        future = self.pending.pop(frame.op_id)
+        if future is None:
+            if frame.op_id == REQUEST_MESSAGES:
+                if self.push_callback:
+                    self.push_callback(frame.messages)
+            else:
+                self.log_error(
+                    f"Unexpected {OPERATION_NAMES.get(frame.op_id)} response")
+            return
+        if not future.done():
+            future.set_result(frame)
+
+    def fail_pending(self):
+        """
+        Fail every request still waiting for a response.
+        """
+        for future in self.pending.drain():
+            if not future.done():
+                future.set_exception(ConnectionError("Connection closed"))
+
+    async def request(self, op_id, data):
+        """
+        Send a request and wait for its response.
+
+        :param op_id: Operation ID of the request
+        :param data: Encoded request
+        :return: The response frame, or False if the server reported a failure
+        :raises OSError: If the request could not be written
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.push(op_id, future)
+        try:
+            await self.send(data)
+        except Exception:
+            # Withdraw the waiter, or the next response of this operation would resolve it
+            # instead of the request it answers (a cancelled send keeps it: its data was queued)
+            self.pending.remove(op_id, future)
+            future.cancel()
+            raise
+        return await future
+
+    async def send(self, data):
+        """
+        Write an encoded request to the server.
+
+        :param data: Encoded request
+        """
+        self.bytes_sent += len(data)
+        self.writer.write(data)
+        await self.writer.drain()
+
+    ### TEMPLATE / ABSTRACT METHODS ###
+    @abstractmethod
+    async def read_frames(self):
+        """
+        :return: List of frames decoded from the next read, or None once the server closes the connection
+        """
+        pass
+
+    @abstractmethod
+    def encode_lookup_account(self, username):
+        pass
+
+    @abstractmethod
+    def encode_login(self, username, hashed_password):
+        pass
+
+    @abstractmethod
+    def encode_create_account(self, username, hashed_password):
+        pass
+
+    @abstractmethod
+    def encode_list_accounts(self, filter_text, offset_id):
+        pass
+
+    @abstractmethod
+    def encode_message(self, recipient, message):
+        pass
+
+    @abstractmethod
+    def encode_request_messages(self):
+        pass
+
+    @abstractmethod
+    def encode_delete_message(self, message_ids):
+        pass
+
+    @abstractmethod
+    def encode_delete_account(self):
+        pass
+
+    ### MAIN OPERATIONS ###
+    # (1) LOOKUP
+    async def send_lookup_account(self, username):
+        """
+        OPERATION 1: Look up an account (LOOKUP_USER).
+
+        :param username: Username to lookup
+        :return: True if the account exists, False otherwise
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(username, str) or not username:
+            return self.log_error("Invalid username", False)
+
+        response = await self.request(LOOKUP_USER, self.encode_lookup_account(username))
+        if response is False:
+            return False
+        self.bcrypt_prefix = response.bcrypt_prefix if response.exists else None
+        return bool(response.exists)
+
+    # (2) LOGIN
+    async def send_login(self, username, password):
+        """
+        OPERATION 2: Log in (LOGIN).
+        Assumes LOOKUP_USER has been called and account exists.
+
+        :param username: Username to login
+        :param password: Password to login
+        :return: Tuple of success flag and unread message count, False if the request failed
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(username, str) or not username:
+            return self.log_error("Invalid username", False)
+
+        if not isinstance(password, str) or not password:
+            return self.log_error("Invalid password", False)
+
+        if self.bcrypt_prefix is None:
+            return self.log_error("Account does not exist", False)
+
+        self.username = username
+        hashed_password = await self.hash_password(password, self.bcrypt_prefix)
+        response = await self.request(LOGIN, self.encode_login(username, hashed_password))
+        if response is False:
+            return False
+        if not response.success:
+            self.log_error("Invalid credentials")
+        return response.success, response.unread_count
+
+    # (3) CREATE ACCOUNT
+    async def send_create_account(self, username, password):
+        """
+        OPERATION 3: Create a new account (CREATE_ACCOUNT).
+        Assumes LOOKUP_USER has been called and account does not exist.
+
+        :param username: Username to create
+        :param password: Password to create
+        :return: True if the account was created, False otherwise
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(username, str) or not username:
+            return self.log_error("Invalid username", False)
+
+        if not isinstance(password, str) or not password:
+            return self.log_error("Invalid password", False)
+
+        salt = bcrypt.gensalt()
+        self.bcrypt_prefix = salt
+        self.username = username
+        hashed_password = await self.hash_password(password, salt)
+        response = await self.request(CREATE_ACCOUNT, self.encode_create_account(username, hashed_password))
+        if response is False or not response.success:
+            return self.log_error("Account creation failed", False)
+        return True
+
+    # (4) LIST ACCOUNTS
+    async def send_list_accounts(self, filter_text="", offset_id=None):
+        """
+        OPERATION 4: Request a list of accounts (LIST_ACCOUNTS), starting after `last_offset_account_id`.
+
+        :param filter_text: Filter text to search for
+        :param offset_id: List accounts after this ID instead of `last_offset_account_id`
+        :return: List of (account ID, username) tuples, False if the request failed
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(filter_text, str):
+            return self.log_error("Invalid filter text", False)
+
+        if offset_id is None:
+            offset_id = self.last_offset_account_id
+        response = await self.request(
+            LIST_ACCOUNTS, self.encode_list_accounts(filter_text, offset_id))
+        if response is False:
+            return False
+        return response.accounts
+
+    # (5) SEND MESSAGE
+    async def send_message(self, recipient, message):
+        """
+        OPERATION 5: Send a message (SEND_MESSAGE).
+
+        :param recipient: Recipient of the message
+        :param message: Message to send
+        :return: Tuple of True and the message ID, False otherwise
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(recipient, str) or not recipient:
+            return self.log_error("Invalid recipient", False)
+
+        if not isinstance(message, str) or not message:
+            return self.log_error("Invalid message", False)
+
+        response = await self.request(SEND_MESSAGE, self.encode_message(recipient, message))
+        if response is False or not response.success:
+            return self.log_error("Message failed to send", False)
+        return True, response.message_id
+
+    # (6) REQUEST MESSAGES
+    async def send_request_messages(self):
+        """
+        OPERATION 6: Request up to `max_msg` unread messages (REQUEST_MESSAGES).
+
+        :return: List of (message ID, sender, message) tuples, False if the request failed
+        """
+        if self.is_not_connected():
+            return False
+
+        response = await self.request(REQUEST_MESSAGES, self.encode_request_messages())
+        if response is False:
+            return False
+        return response.messages
+
+    # (7) DELETE MESSAGES
+    async def send_delete_message(self, message_ids):
+        """
+        OPERATION 7: Delete messages (DELETE_MESSAGES).
+
+        :param message_ids: List of message IDs to delete
+        :return: True if messages are deleted successfully, False otherwise
+        """
+        if self.is_not_connected():
+            return False
+
+        if not isinstance(message_ids, list) or not message_ids or not all(isinstance(i, int) for i in message_ids):
+            return self.log_error("Invalid message IDs", False)
+
+        response = await self.request(DELETE_MESSAGES, self.encode_delete_message(message_ids))
+        if response is False or not response.success:
+            return self.log_error("Message deletion failed", False)
+        return True
+
+    # (8) DELETE ACCOUNT
+    async def send_delete_account(self):
+        """
+        OPERATION 8: Delete the account (DELETE_ACCOUNT).
+        The server closes the connection instead of responding.
+
+        :return: True once the request has been sent
+        """
+        if self.is_not_connected():
+            return False
+
+        await self.send(self.encode_delete_account())
+        return True
+
+    ### ERROR HANDLING ###
+    def log_error(self, message, return_value=None):
+        """
+        Helper method to log errors and return a default value.
+
+        :param message: Error message
+        :param return_value: Default return value
+        :return: Default return value
+        """
+        logger.error("%s", message)
+        return return_value
+
+    def is_not_connected(self):
+        """
+        Helper method to log a "not connected to server" error.
+
+        :return: True if not connected, False otherwise
+        """
+        if not self.running or self.writer is None:
+            self.log_error("Not connected to server")
+            return True
+        return False
+
+    ### MISC HELPER FUNCTIONS ###
+    async def hash_password(self, password, salt):
+        """
+        Hash a password without blocking the event loop.
+
+        :param password: Password
+        :param salt: Bcrypt salt/prefix
+        :return: Hashed password
+        """
+        return await self.hasher.hash_async(password, salt)
+
+
+class AsyncWireChatClient(AsyncChatClient):
+    """
+    AsyncChatClient using the custom wire protocol.
+    """
+
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, hasher=None):
+        super().__init__(host, port, max_msg, max_users, recv_size, hasher)
+        self.decoder = WireDecoder()  # Turns received bytes into response frames
+
+    async def read_frames(self):
+        data = await self.reader.read(self.recv_size)
+        if not data:
+            return None
+        self.bytes_received += len(data)
+        return self.decoder.feed(data)
+
+    def encode_lookup_account(self, username):
+        return wire_protocol.encode_lookup_user(username)
+
+    def encode_login(self, username, hashed_password):
+        return wire_protocol.encode_login(username, hashed_password)
+
+    def encode_create_account(self, username, hashed_password):
+        return wire_protocol.encode_create_account(username, hashed_password)
+
+    def encode_list_accounts(self, filter_text, offset_id):
+        return wire_protocol.encode_list_accounts(self.max_users, offset_id, filter_text)
+
+    def encode_message(self, recipient, message):
+        return wire_protocol.encode_send_message(recipient, message)
+
+    def encode_request_messages(self):
+        return wire_protocol.encode_request_messages(self.max_msg)
+
+    def encode_delete_message(self, message_ids):
+        return wire_protocol.encode_delete_messages(message_ids)
+
+    def encode_delete_account(self):
+        return wire_protocol.encode_delete_account()
+
+    async def send(self, data):
+        """
+        Write an encoded request to the server without joining its buffers.
+
+        :param data: Encoded request (list of buffers)
+        """
+        self.bytes_sent += sum(map(len, data))
+        self.writer.writelines(data)
+        await self.writer.drain()
+
+
+class AsyncJSONChatClient(AsyncChatClient):
+    """
+    AsyncChatClient using the JSON protocol.
+    """
+
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, hasher=None, max_line_length=1 << 20):
+        """
+        :param max_line_length: Longest JSON message (in bytes) accepted from the server
+        """
+        super().__init__(host, port, max_msg, max_users, recv_size, hasher)
+        self.max_line_length = max_line_length
+        # Splits received bytes into newline-delimited messages (the StreamReader's own
+        # readline would be capped by its buffer limit instead)
+        self.framer = LineFramer(max_line_length)
+
+    async def connect(self):
+        self.framer = LineFramer(self.max_line_length)  # Nothing is carried over from a previous connection
+        return await super().connect()
+
+    async def read_frames(self):
+        data = await self.reader.read(self.recv_size)
+        if not data:
+            return None
+        self.bytes_received += len(data)
+        return [decode_response(line) for line in self.framer.feed(data)]
+
+    def encode_lookup_account(self, username):
+        return encode_request("LOOKUP_USER", {"username": username})
+
+    def encode_login(self, username, hashed_password):
+        return encode_request("LOGIN", {"username": username, "password_hash": hashed_password.decode("utf-8")})
+
+    def encode_create_account(self, username, hashed_password):
+        return encode_request("CREATE_ACCOUNT", {"username": username, "password_hash": hashed_password.decode("utf-8")})
+
+    def encode_list_accounts(self, filter_text, offset_id):
+        return encode_request("LIST_ACCOUNTS", {
+            "maximum_number": self.max_users, "offset_account_id": offset_id, "filter_text": filter_text})
+
+    def encode_message(self, recipient, message):
+        return encode_request("SEND_MESSAGE", {"recipient": recipient, "message": message})
+
+    def encode_request_messages(self):
+        return encode_request("REQUEST_MESSAGES", {"maximum_number": self.max_msg})
+
+    def encode_delete_message(self, message_ids):
+        return encode_request("DELETE_MESSAGES", {"message_ids": message_ids})
+
+    def encode_delete_account(self):
+        return encode_request("DELETE_ACCOUNT")
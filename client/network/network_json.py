@@ -1,7 +1,14 @@
 
 import json
-import threading
+import logging
+from concurrent.futures import Future
 from .network import ChatClient
+from .events import (LookupResult, LoginResult, AccountCreated, AccountsPage, MessageSent, MessagesReceived,
+                     MessagesDeleted, AccountDeleted)
+from .json_protocol import LineFramer, encode_request, OPERATION_IDS
+from .wire_protocol import SEND_MESSAGE
+
+logger = logging.getLogger("chat.network.json")
 
 
 class JSONChatClient(ChatClient):
@@ -9,28 +16,56 @@ class JSONChatClient(ChatClient):
     Handles the client-side network communication for the chat application using a JSON protocol.
     (Subclass of ChatClient)
     """
+    protocol = "json"
+
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, dispatcher=None, hasher=None,
+                 prefix_cache=None, metrics=None, outbox=None, connect_timeout=None,
+                 defer_connect=False, endpoints=None, max_line_length=1 << 20):
+        """
+        Initialize the client.
+
+        :param host: Server host
+        :param port: Server port
+        :param max_msg: Maximum number of messages to display
+        :param max_users: Maximum number of users to display
+        :param recv_size: Maximum number of bytes to read from the socket at once
+        :param dispatcher: Dispatcher running response handlers (may be shared between clients)
+        :param hasher: PasswordHasher running bcrypt (defaults to a shared thread-pool hasher)
+        :param prefix_cache: Optional PrefixCache of known bcrypt prefixes (lets logins skip LOOKUP_USER)
+        :param metrics: MetricsRegistry to record per-operation metrics in (may be shared between clients)
+        :param outbox: Optional Outbox keeping messages sent while disconnected (otherwise they are dropped)
+        :param connect_timeout: Seconds to wait for the TCP connection (None for the OS default)
+        :param defer_connect: Do not connect here; start() then connects on a background thread
+        :param endpoints: Optional list of (host, port) servers to race and fail over between
+        :param max_line_length: Longest JSON message (in bytes) accepted from the server
+        """
+        self.max_line_length = max_line_length
+        self.connection_generation = 0  # Incremented per connection; older responses are dropped
+        super().__init__(host, port, max_msg, max_users, recv_size, dispatcher, hasher, prefix_cache, metrics,
+                         outbox, connect_timeout, defer_connect, endpoints)
 
     def listen_for_messages(self):
         """
         Listen for messages from the server and store them.
         """
-        print("[CLIENT] Listening for messages...")
+        logger.debug("Listening for messages...")
 
-        buffer = b""  # Buffer to store incoming data for JSON messages
+        # Splits incoming data into newline-delimited JSON messages
+        framer = LineFramer(self.max_line_length)
+        generation = self.connection_generation
         while self.running:
             try:
                 # Parse JSON messages and store them
                 # Read available bytes in chunks
-                chunk = self.socket.recv(1024)
+                chunk = self.socket.recv(self.recv_size)
                 if not chunk:
-                    print("[DISCONNECTED] Disconnected from server")
-                    self.close()
+                    logger.info("Server closed the connection")
+                    self.disconnect()
                     break
-                buffer += chunk
-                while b'\n' in buffer:  # Process each complete JSON message
-                    message, buffer = buffer.split(b'\n', 1)
-                    threading.Thread(target=self.handle_json_response, args=(
-                        message.decode("utf-8"),), daemon=True).start()
+                for message in framer.feed(chunk):  # Process each complete JSON message
+                    # Handle in order on the dispatcher (blocks while its queue is full)
+                    self.dispatcher.submit(
+                        self, self.handle_connection_response, generation, message)
 
             except (OSError, ConnectionError) as e:
                 self.log_error(
@@ -39,9 +74,39 @@ class JSONChatClient(ChatClient):
 
             except Exception as e:
                 self.log_error(f"Error receiving messages: {e}")
-                self.close()
+                self.disconnect()
                 break
 
+    def reset_connection_state(self):
+        """
+        Start a new connection generation, so responses of the previous connection still
+        queued on the dispatcher do not resolve the new connection's requests.
+        """
+        self.connection_generation += 1
+
+    def handle_connection_response(self, generation, message):
+        """
+        Handle a response on the dispatcher unless its connection has been replaced.
+
+        :param generation: Connection generation the message was received on
+        :param message: JSON message
+        :return: Result of handle_json_response, or None if the message was dropped
+        """
+        if generation != self.connection_generation:
+            logger.debug("Dropping response of a previous connection")
+            return None
+        return self.handle_json_response(message)
+
+    def send_heartbeat(self):
+        """
+        Send a heartbeat: a LOOKUP_USER whose response only proves the connection is alive.
+
+        :return: Future resolved with True when the response arrives
+        """
+        if self.is_not_connected():
+            return
+        return self.send_json_request("LOOKUP_USER", {"username": self.heartbeat_username()}, heartbeat=True)
+
     ### MAIN OPERATIONS ###
     # (1) LOOKUP
     def send_lookup_account(self, username):
@@ -49,6 +114,7 @@ class JSONChatClient(ChatClient):
         OPERATION 1: Send a lookup account message to the server (LOOKUP_USER).
 
         :param username: Username to lookup
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -56,22 +122,28 @@ class JSONChatClient(ChatClient):
         if not isinstance(username, str) or not username:
             return self.log_error("Invalid username", False)
 
-        self.send_json_request("LOOKUP_USER", {"username": username})
+        self.lookup_username = username
+        return self.send_json_request("LOOKUP_USER", {"username": username})
 
     def handle_lookup_account_response(self, payload):
         """
         Handle the JSON response from the server for the LOOKUP_USER operation (1).
 
         :param payload: JSON payload
+        :return: True if the account exists, False otherwise
         """
-        print("[LOOKUP] Handling JSON response...")
+        logger.debug("Handling LOOKUP_USER response")
         exists = payload["exists"]
         self.bcrypt_prefix = payload["bcrypt_prefix"].encode(
             "utf-8") if exists else None
+        if exists:
+            self.remember_prefix(self.lookup_username, self.bcrypt_prefix)
+        else:
+            self.forget_prefix(self.lookup_username)
 
         # Notify UI of lookup result
-        if self.message_callback:
-            self.message_callback(f"LOOKUP_USER:{int(exists)}")
+        self.emit(LookupResult(bool(exists)))
+        return bool(exists)
 
     # (2) LOGIN
     def send_login(self, username, password):
@@ -81,6 +153,7 @@ class JSONChatClient(ChatClient):
 
         :param username: Username to login
         :param password: Password to login
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -94,7 +167,17 @@ class JSONChatClient(ChatClient):
         hashed_password = self.get_hashed_password_for_login(
             username, password)
 
-        self.send_json_request(
+        return self.send_hashed_login(username, hashed_password)
+
+    def send_hashed_login(self, username, hashed_password):
+        """
+        Send a LOGIN request with an already hashed password (also used to resume a session).
+
+        :param username: Username to login
+        :param hashed_password: Bcrypt hash of the password
+        :return: Future resolved with the response handler's result
+        """
+        return self.send_json_request(
             "LOGIN", {"username": username, "password_hash": hashed_password.decode('utf-8')})
 
     def handle_login_response(self, payload, success):
@@ -106,12 +189,18 @@ class JSONChatClient(ChatClient):
         :return: Tuple of success flag and unread message count if login is successful, False otherwise
         """
         # Notify UI of login result
-        print("[LOGIN] Handling JSON response...")
+        logger.debug("Handling LOGIN response")
         unread_messages = payload.get("unread_messages", 0)
-        print(f"[LOGIN] Unread messages: {unread_messages}")
-        if self.message_callback:
-            self.message_callback(f"LOGIN:{int(success)}:{unread_messages}")
-        return True, unread_messages if success else False
+        logger.debug("Unread messages: %d", unread_messages)
+        resumed, self.resuming = self.resuming, False
+        # A resumed session is reported by the supervisor instead
+        if not resumed:
+            self.emit(LoginResult(bool(success), unread_messages))
+        if success:
+            # Messages written while disconnected can be sent now. Sent from the action
+            # thread: a write blocked on a full socket must never stop responses being read
+            self.submit(self.flush_outbox)
+        return int(success), unread_messages
 
     # (3) CREATE ACCOUNT
     def send_create_account(self, username, password):
@@ -121,6 +210,7 @@ class JSONChatClient(ChatClient):
 
         :param username: Username to create
         :param password: Password to create
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -134,26 +224,31 @@ class JSONChatClient(ChatClient):
         hashed_password = self.generate_hashed_password_for_create(
             username, password)
 
-        self.send_json_request("CREATE_ACCOUNT", {
-                               "username": username, "password_hash": hashed_password.decode('utf-8')})
+        return self.send_json_request("CREATE_ACCOUNT", {
+                                      "username": username, "password_hash": hashed_password.decode('utf-8')})
 
     def handle_create_account_response(self):
         """
         Handle the JSON response from the server for the CREATE_ACCOUNT operation (3).
+
+        :return: True (failures are reported with success set to false)
         """
+        self.remember_prefix(self.username, self.bcrypt_prefix)
         # Notify UI of account creation result
-        if self.message_callback:
-            self.message_callback(f"CREATE_ACCOUNT:{1}")  # success
+        self.emit(AccountCreated(True))
 
         if not self.username:
             self.log_error("Username not set")
+        return True
 
     # (4) LIST ACCOUNTS
-    def send_list_accounts(self, filter_text=""):
+    def send_list_accounts(self, filter_text="", offset_id=None):
         """
         OPERATION 4: Request a list of accounts from the server (LIST_ACCOUNTS).
 
         :param filter_text: Filter text to search for
+        :param offset_id: List accounts after this ID (defaults to `last_offset_account_id`)
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -162,13 +257,14 @@ class JSONChatClient(ChatClient):
             return self.log_error("Invalid filter text", False)
 
         # Determine the offset ID based on the direction user wants to go
-        offset_id = self.last_offset_account_id
+        if offset_id is None:
+            offset_id = self.last_offset_account_id
 
-        print("[ACCOUNTS] Offset ID:", offset_id, ", Filter:",
-              filter_text, ", Max users:", self.max_users)
+        logger.debug("Listing accounts: offset ID %d, filter %r, max users %d",
+                     offset_id, filter_text, self.max_users)
 
-        self.send_json_request("LIST_ACCOUNTS", {
-                               "maximum_number": self.max_users, "offset_account_id": offset_id, "filter_text": filter_text})
+        return self.send_json_request("LIST_ACCOUNTS", {
+                                      "maximum_number": self.max_users, "offset_account_id": offset_id, "filter_text": filter_text})
 
     def handle_list_accounts_response(self, payload):
         """
@@ -177,14 +273,13 @@ class JSONChatClient(ChatClient):
         :param payload: JSON payload
         :return: List of accounts
         """
-        print("[ACCOUNTS] Handling JSON response...")
+        logger.debug("Handling LIST_ACCOUNTS response")
         account_data = payload["accounts"]
         accounts = [(account["id"], account["username"])
                     for account in account_data]
-        print(f"[ACCOUNTS] Retrieved {len(accounts)} accounts")
+        logger.debug("Retrieved %d accounts", len(accounts))
 
-        if self.message_callback:  # Notify UI of user list update
-            self.message_callback(f"LIST_ACCOUNTS:{json.dumps(accounts)}")
+        self.emit(AccountsPage(accounts))
         return accounts
 
     # (5) SEND MESSAGE
@@ -194,18 +289,20 @@ class JSONChatClient(ChatClient):
 
         :param recipient: Recipient of the message
         :param message: Message to send
+        :return: Future resolved with the response handler's result (queued in the outbox while disconnected)
         """
-        if self.is_not_connected():
-            return
-
         if not isinstance(recipient, str) or not recipient:
             return self.log_error("Invalid recipient", False)
 
         if not isinstance(message, str) or not message:
             return self.log_error("Invalid message", False)
 
-        self.send_json_request(
-            "SEND_MESSAGE", {"recipient": recipient, "message": message})
+        if self.is_not_connected():
+            # Keep the message for the next login instead of dropping it
+            return self.queue_message(recipient, message)
+
+        return self.send_or_queue_message(recipient, message, self.send_json_request(
+            "SEND_MESSAGE", {"recipient": recipient, "message": message}))
 
     def handle_send_message_response(self, payload):
         """
@@ -215,22 +312,42 @@ class JSONChatClient(ChatClient):
         :return: True if message is sent successfully + message ID, False otherwise
         """
         message_id = payload["message_id"]
-        print(f"[MESSAGE SENT] Message ID: {message_id}")
+        logger.debug("Message sent with ID %d", message_id)
         # Notify UI of message sent
-        if self.message_callback:
-            self.message_callback(f"SEND_MESSAGE:{1}")  # success
+        self.emit(MessageSent(True, message_id))
         return True, message_id  # Return the message ID
 
+    def send_message_batch(self, messages):
+        """
+        Send several SEND_MESSAGE requests with a single sendall (used to flush the outbox).
+        The responses arrive in order and resolve the returned futures one by one.
+
+        :param messages: List of (recipient, message) tuples
+        :return: List of futures (one per message), False if the batch could not be sent
+        """
+        requests = []
+        for recipient, message in messages:
+            request = encode_request(
+                "SEND_MESSAGE", {"recipient": recipient, "message": message})
+            self.metrics.record_request(SEND_MESSAGE, len(request))
+            requests.append(request)
+        try:
+            return self.send_frame(requests, [(SEND_MESSAGE, False)] * len(messages))
+        except OSError as e:
+            return self.log_error(f"Could not send queued messages: {e}", False)
+
     # (6) REQUEST MESSAGES
     def send_request_messages(self):
         """
         OPERATION 6: Request unread messages from the server (REQUEST_MESSAGES).
+
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
 
-        self.send_json_request("REQUEST_MESSAGES", {
-                               "maximum_number": self.max_msg})
+        return self.send_json_request("REQUEST_MESSAGES", {
+                                      "maximum_number": self.max_msg})
 
     def handle_request_messages_response(self, payload):
         """
@@ -242,10 +359,9 @@ class JSONChatClient(ChatClient):
         message_data = payload["messages"]
         messages = [(message["id"], message["sender"], message["message"])
                     for message in message_data]
-        # print(f"[MESSAGES] Retrieved {len(messages)} messages")
+        logger.debug("Received %d messages", len(messages))
         # Notify UI of received messages
-        if self.message_callback:
-            self.message_callback(f"REQUEST_MESSAGES:{json.dumps(messages)}")
+        self.emit(MessagesReceived(messages))
         return messages
 
     # (7) DELETE MESSAGES
@@ -254,6 +370,7 @@ class JSONChatClient(ChatClient):
         OPERATION 7: Delete messages from the server (DELETE_MESSAGES).
 
         :param message_ids: List of message IDs to delete
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -265,7 +382,7 @@ class JSONChatClient(ChatClient):
         if num_messages == 0:
             return self.log_error("No messages to delete", False)
 
-        self.send_json_request("DELETE_MESSAGES", {"message_ids": message_ids})
+        return self.send_json_request("DELETE_MESSAGES", {"message_ids": message_ids})
 
     def handle_delete_message_response(self):
         """
@@ -273,22 +390,27 @@ class JSONChatClient(ChatClient):
 
         :return: True if messages are deleted successfully, False otherwise
         """
-        print(f"[MESSAGE DELETED] Messages deleted successfully")
+        logger.debug("Messages deleted successfully")
         # Notify UI of message deletion
-        if self.message_callback:
-            self.message_callback(f"DELETE_MESSAGES:{1}")  # success
+        self.emit(MessagesDeleted(True))
         return True
 
     # (8) DELETE ACCOUNT
     def send_delete_account(self):
         """
         OPERATION 8: Delete the account from the server (DELETE_ACCOUNT).
+
+        :return: Future resolved with True once the request is sent (there is no response)
         """
         if self.is_not_connected():
             return
 
-        print("[ACCOUNT DELETION] Deleting account...")
-        self.send_json_request("DELETE_ACCOUNT")
+        logger.info("Deleting account")
+        self.forget_prefix(self.username)
+        self.session = None  # Nothing to resume once the account is gone
+        self.closing = True  # The server closes the connection next: it is not lost, do not reconnect
+        # The server closes the connection instead of responding
+        return self.send_json_request("DELETE_ACCOUNT", expect_response=False)
 
     def handle_delete_account_response(self):
         """
@@ -296,80 +418,135 @@ class JSONChatClient(ChatClient):
 
         :return: True if account is deleted successfully
         """
-        print("[ACCOUNT DELETED] Account deleted successfully (JSON)")
+        logger.info("Account deleted successfully")
         # Notify UI of account deletion
-        if self.message_callback:
-            self.message_callback(f"DELETE_ACCOUNT:{1}")  # success
+        self.emit(AccountDeleted())
         return True
 
     ### HELPERS ###
-    def send_json_request(self, operation, payload=None):
+    def send_json_request(self, operation, payload=None, expect_response=True, heartbeat=False):
         """
         Send a request to the server using the JSON protocol
-a
+
         :param operation: Operation name
         :param payload: Payload data
+        :param expect_response: Whether the server answers this operation
+        :param heartbeat: Whether the request is a heartbeat (its response skips the handler)
+        :return: Future that resolves with the result of the response handler
         """
         if not isinstance(operation, str) or not operation:
             return self.log_error("Invalid operation", False)
 
-        request = (json.dumps(
-            {"operation": operation, "payload": payload or {}}) + '\n').encode("utf-8")
-        self.bytes_sent += len(request)
-        print("[DEBUG] Sending JSON request:", request)
-        self.socket.send(request)
+        op_id = OPERATION_IDS.get(operation, 0)
+        request = encode_request(operation, payload)
+        self.metrics.record_request(op_id, len(request))
+        logger.debug("Sending JSON request: %s", request)
+        try:
+            futures = self.send_frame(
+                [request], [(op_id, heartbeat)] if expect_response else [])
+        except OSError as e:
+            return self.log_error(f"Could not send request: {e}", False)
+        if expect_response:
+            return futures[0]
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def send_buffers(self, buffers):
+        """
+        Write encoded requests to the socket with a single sendall (only called by the FrameWriter).
+
+        :param buffers: List of encoded requests
+        :raises ConnectionError: If the connection was closed meanwhile
+        """
+        sock = self.socket
+        if sock is None:  # Disconnected by another thread since the request was checked
+            raise ConnectionError("Not connected to server")
+        data = b"".join(buffers)
+        self.bytes_sent += len(data)
+        sock.sendall(data)
 
     def handle_json_response(self, message):
         """ 
-        Handle JSON responses from the server.
+        Handle JSON responses from the server and resolve the matching request.
 
         :param message: JSON message
-        :return: True if the message is handled successfully, False otherwise
+        :return: Result of the response handler, False if the operation failed
         """
         if not isinstance(message, str) or not message:
             return self.log_error("Invalid message", False)
 
         self.bytes_received += len(message)
+        future = None
+        op_id = 0
         try:
             parsed_message = json.loads(message)
-            print("[DEBUG] Parsed message:", parsed_message)
+            logger.debug("Parsed message: %s", parsed_message)
             operation = parsed_message.get("operation")
             success = parsed_message.get("success")
             payload = parsed_message.get("payload", {})
-            if not success:
+
+            # Oldest request with this operation (None if the server pushed this message)
+            op_id = OPERATION_IDS.get(operation, 0)
+            future = self.pending.pop(op_id)
+            if future is None and not success:
+                future = self.pending.pop_oldest()
+
+            if self.is_heartbeat(future):
+                result = True  # Only the arrival matters
+            elif not success:
                 message = parsed_message.get("message", "")
                 # Log error message if operation failed
-                return self.log_error(f"Operation {operation} failed: {message}")
-
-            # Else, handle the JSON response based on the operation
-            if operation == "LOOKUP_USER":
-                if payload is None:
-                    return self.log_error(f"Operation {operation} failed: No payload found")
-                return self.handle_lookup_account_response(payload)
-            elif operation == "LOGIN":
-                if payload is None:
-                    return self.log_error(f"Operation {operation} failed: No payload found")
-                return self.handle_login_response(payload, success)
-            elif operation == "CREATE_ACCOUNT":
-                return self.handle_create_account_response()
-            elif operation == "LIST_ACCOUNTS":
-                if payload is None:
-                    return self.log_error(f"Operation {operation} failed: No payload found")
-                return self.handle_list_accounts_response(payload)
-            elif operation == "SEND_MESSAGE":
-                if payload is None:
-                    return self.log_error(f"Operation {operation} failed: No payload found")
-                return self.handle_send_message_response(payload)
-            elif operation == "REQUEST_MESSAGES":
-                if payload is None:
-                    return self.log_error(f"Operation {operation} failed: No payload found")
-                return self.handle_request_messages_response(payload)
-            elif operation == "DELETE_MESSAGES":
-                return self.handle_delete_message_response()
-            elif operation == "DELETE_ACCOUNT":
-                # Note: this is potentially not needed as the socket will be automatically disconnected
-                return self.handle_delete_account_response()
+                self.log_error(f"Operation {operation} failed: {message}")
+                if operation == "LOGIN":
+                    # The cached prefix may be stale: look the account up next time
+                    self.forget_prefix(self.username)
+                    self.session = None
+                    self.resuming = False
+                result = False
             else:
-                return self.log_error(f"Unknown operation: {operation}")
+                result = self.dispatch_json_response(operation, payload)
         except Exception as e:
-            return self.log_error(f"Error handling JSON response: {e}")
+            self.log_error(f"Error handling JSON response: {e}")
+            result = False
+        self.record_response(op_id, future, len(message), failed=result is False)
+        self.complete_request(future, result)
+        return result
+
+    def dispatch_json_response(self, operation, payload):
+        """
+        Call the handler for a successful JSON response.
+
+        :param operation: Operation name
+        :param payload: JSON payload
+        :return: Result of the handler, False if the response is invalid
+        """
+        if operation == "LOOKUP_USER":
+            if payload is None:
+                return self.log_error(f"Operation {operation} failed: No payload found", False)
+            return self.handle_lookup_account_response(payload)
+        elif operation == "LOGIN":
+            if payload is None:
+                return self.log_error(f"Operation {operation} failed: No payload found", False)
+            return self.handle_login_response(payload, True)
+        elif operation == "CREATE_ACCOUNT":
+            return self.handle_create_account_response()
+        elif operation == "LIST_ACCOUNTS":
+            if payload is None:
+                return self.log_error(f"Operation {operation} failed: No payload found", False)
+            return self.handle_list_accounts_response(payload)
+        elif operation == "SEND_MESSAGE":
+            if payload is None:
+                return self.log_error(f"Operation {operation} failed: No payload found", False)
+            return self.handle_send_message_response(payload)
+        elif operation == "REQUEST_MESSAGES":
+            if payload is None:
+                return self.log_error(f"Operation {operation} failed: No payload found", False)
+            return self.handle_request_messages_response(payload)
+        elif operation == "DELETE_MESSAGES":
+            return self.handle_delete_message_response()
+        elif operation == "DELETE_ACCOUNT":
+            # Note: this is potentially not needed as the socket will be automatically disconnected
+            return self.handle_delete_account_response()
+        else:
+            return self.log_error(f"Unknown operation: {operation}", False)
@@ -1,6 +1,17 @@
-import json
-import struct
+import logging
+from concurrent.futures import Future
 from .network import ChatClient
+from .events import (LookupResult, LoginResult, AccountCreated, AccountsPage, MessageSent, MessagesReceived,
+                     MessagesDeleted, AccountDeleted)
+from .wire_protocol import (WireDecoder, WireProtocolError, OPERATION_NAMES, LOOKUP_USER, LOGIN, CREATE_ACCOUNT,
+                            LIST_ACCOUNTS, SEND_MESSAGE, REQUEST_MESSAGES, DELETE_MESSAGES, DELETE_ACCOUNT, FAILURE,
+                            encode_lookup_user, encode_login, encode_create_account, encode_list_accounts,
+                            encode_send_message, encode_request_messages, encode_delete_messages,
+                            encode_delete_account)
+
+logger = logging.getLogger("chat.network.wire")
+
+IOV_MAX = 1024  # Most buffers a single sendmsg call accepts on POSIX systems
 
 
 class WireChatClient(ChatClient):
@@ -8,47 +19,66 @@ class WireChatClient(ChatClient):
     Handles the client-side network communication for the chat application using a custom wire protocol.
     (Subclass of ChatClient)
     """
+    protocol = "wire"
+
+    def __init__(self, host, port, max_msg, max_users, recv_size=65536, dispatcher=None, hasher=None,
+                 prefix_cache=None, metrics=None, outbox=None, connect_timeout=None,
+                 defer_connect=False, endpoints=None):
+        """
+        Initialize the client.
+
+        :param host: Server host
+        :param port: Server port
+        :param max_msg: Maximum number of messages to display
+        :param max_users: Maximum number of users to display
+        :param recv_size: Maximum number of bytes to read from the socket at once
+        :param dispatcher: Dispatcher running response handlers (may be shared between clients)
+        :param hasher: PasswordHasher running bcrypt (defaults to a shared thread-pool hasher)
+        :param prefix_cache: Optional PrefixCache of known bcrypt prefixes (lets logins skip LOOKUP_USER)
+        :param metrics: MetricsRegistry to record per-operation metrics in (may be shared between clients)
+        :param outbox: Optional Outbox keeping messages sent while disconnected (otherwise they are dropped)
+        :param connect_timeout: Seconds to wait for the TCP connection (None for the OS default)
+        :param defer_connect: Do not connect here; start() then connects on a background thread
+        :param endpoints: Optional list of (host, port) servers to race and fail over between
+        """
+        self.decoder = WireDecoder()  # Turns received bytes into response frames
+        self.recv_buffer = bytearray(recv_size)  # Reused for every socket read
+        super().__init__(host, port, max_msg, max_users, recv_size, dispatcher, hasher, prefix_cache, metrics,
+                         outbox, connect_timeout, defer_connect, endpoints)
+
+    def reset_connection_state(self):
+        """
+        Drop any partial frame left over from the previous connection.
+        """
+        self.decoder = WireDecoder()
 
     def listen_for_messages(self):
         """
         Listen for messages from the server and store them.
         """
-        print("[CLIENT] Listening for messages...")
+        logger.debug("Listening for messages...")
 
+        recv_view = memoryview(self.recv_buffer)
         while self.running:
             try:
-                # Parse custom protocol messages
-                # Try reading first byte (operation ID) first
-                op_id = self.socket.recv(1)
-                if not op_id or len(op_id) < 1:
-                    print("[DISCONNECTED] Disconnected from server")
-                    self.close()
+                # Read whatever is available in one call and let the decoder
+                # split it into complete frames
+                num_bytes = self.socket.recv_into(recv_view)
+                if not num_bytes:
+                    logger.info("Server closed the connection")
+                    self.disconnect()
                     break
-                op_id = struct.unpack("!B", op_id)[0]  # Convert to integer
-                self.bytes_received += 1
-                print("[OP ID]", op_id)
-                if op_id == 1:  # LOOKUP_USER
-                    self.handle_lookup_account_response()
-                elif op_id == 2:  # LOGIN
-                    self.handle_login_response()
-                elif op_id == 3:  # CREATE_ACCOUNT
-                    self.handle_create_account_response()
-                elif op_id == 4:  # LIST_ACCOUNTS
-                    self.handle_list_accounts_response()
-                elif op_id == 5:  # SEND_MESSAGE
-                    self.handle_send_message_response()
-                elif op_id == 6:  # REQUEST_MESSAGES
-                    self.handle_request_messages_response()
-                elif op_id == 7:  # DELETE_MESSAGES
-                    self.handle_delete_message_response()
-                elif op_id == 8:  # DELETE_ACCOUNT
-                    # Note: this is potentially not needed as the socket will be automatically disconnected
-                    self.handle_delete_account_response()
-                elif op_id == 255:  # FAILURE
-                    self.log_error("Operation failed")
-                else:  # Invalid operation ID
-                    self.log_error(
-                        f"[WIRE PROTOCOL] Invalid operation ID: {op_id}")
+                self.bytes_received += num_bytes
+
+                frames = self.decoder.feed(recv_view[:num_bytes])
+                for frame, size in zip(frames, self.decoder.frame_sizes):
+                    self.handle_frame(frame, size)
+
+            except WireProtocolError as e:
+                # Frames have no length header, so we cannot resync after garbage
+                self.log_error(f"[WIRE PROTOCOL] {e}")
+                self.disconnect()
+                break
 
             except (OSError, ConnectionError) as e:
                 self.log_error(
@@ -57,63 +87,186 @@ class WireChatClient(ChatClient):
 
             except Exception as e:
                 self.log_error(f"Error receiving messages: {e}")
-                self.close()
+                self.disconnect()
                 break
 
+    def handle_frame(self, frame, size=0):
+        """
+        Dispatch a decoded response frame to its handler and resolve the matching request.
+
+        :param frame: Frame returned by the decoder
+        :param size: Encoded size of the frame in bytes (for metrics)
+        :return: Result of the handler
+        """
+        op_id = frame.op_id
+        logger.debug("Received frame for operation %d", op_id)
+        if op_id == FAILURE:
+            operation = OPERATION_NAMES.get(frame.request_op_id, "UNKNOWN")
+            future = self.pending.pop(
+                frame.request_op_id) or self.pending.pop_oldest()
+            self.record_response(frame.request_op_id, future, size, failed=True)
+            self.complete_request(future, False)
+            return self.log_error(f"Operation {operation} failed: {frame.message}")
+
+        # Oldest request with this operation ID (None if the server pushed this frame)
+        future = self.pending.pop(op_id)
+        try:
+            if self.is_heartbeat(future):
+                result = True  # Only the arrival matters
+            elif op_id == LOOKUP_USER:
+                result = self.handle_lookup_account_response(frame)
+            elif op_id == LOGIN:
+                result = self.handle_login_response(frame)
+            elif op_id == CREATE_ACCOUNT:
+                result = self.handle_create_account_response(frame)
+            elif op_id == LIST_ACCOUNTS:
+                result = self.handle_list_accounts_response(frame)
+            elif op_id == SEND_MESSAGE:
+                result = self.handle_send_message_response(frame)
+            elif op_id == REQUEST_MESSAGES:
+                result = self.handle_request_messages_response(frame)
+            elif op_id == DELETE_MESSAGES:
+                result = self.handle_delete_message_response(frame)
+            else:  # DELETE_ACCOUNT
+                # Note: this is potentially not needed as the socket will be automatically disconnected
+                result = self.handle_delete_account_response()
+        except Exception as e:
+            if future is not None and not future.done():
+                future.set_exception(e)
+            raise
+        self.record_response(op_id, future, size, failed=result is False)
+        self.complete_request(future, result)
+        return result
+
+    def send_request(self, op_id, request, expect_response=True, heartbeat=False):
+        """
+        Send an encoded request to the server.
+
+        :param op_id: Operation ID of the request
+        :param request: Encoded request (list of buffers)
+        :param expect_response: Whether the server answers this operation
+        :param heartbeat: Whether the request is a heartbeat (its response skips the handler)
+        :return: Future that resolves with the result of the response handler
+        """
+        self.metrics.record_request(op_id, sum(map(len, request)))
+        try:
+            futures = self.send_frame(
+                request, [(op_id, heartbeat)] if expect_response else [])
+        except OSError as e:
+            return self.log_error(f"Could not send request: {e}", False)
+        if expect_response:
+            return futures[0]
+        future = Future()
+        future.set_result(True)
+        return future
+
+    def send_heartbeat(self):
+        """
+        Send a heartbeat: a LOOKUP_USER whose response only proves the connection is alive.
+
+        :return: Future resolved with True when the response arrives
+        """
+        if self.is_not_connected():
+            return
+        message = encode_lookup_user(self.heartbeat_username())
+        return self.send_request(LOOKUP_USER, message, heartbeat=True)
+
+    def send_buffers(self, buffers):
+        """
+        Write every buffer to the socket, in order, without joining them first
+        (only called by the FrameWriter). Uses scatter-gather sendmsg and keeps going after partial writes, so the
+        whole request is always sent. Falls back to sendall where sendmsg is not
+        available (e.g. Windows).
+
+        :param buffers: List of bytes-like objects
+        :raises ConnectionError: If the connection was closed meanwhile
+        """
+        sock = self.socket
+        if sock is None:  # Disconnected by another thread since the request was checked
+            raise ConnectionError("Not connected to server")
+        self.bytes_sent += sum(map(len, buffers))
+        if not hasattr(sock, "sendmsg"):
+            sock.sendall(b"".join(buffers))
+            return
+
+        views = [memoryview(buffer) for buffer in buffers]
+        while views:
+            sent = sock.sendmsg(views[:IOV_MAX])
+            # Drop the buffers that were written completely and trim a partially written one
+            written = 0
+            while written < len(views) and sent >= len(views[written]):
+                sent -= len(views[written])
+                written += 1
+            views = views[written:]
+            if views and sent:
+                views[0] = views[0][sent:]
+
+    def receive_frame(self, op_id):
+        """
+        Read the rest of a single response from the socket.
+        Only used when a handler is called directly instead of by the listener,
+        i.e. the operation ID byte has already been consumed.
+
+        :param op_id: Operation ID of the response being read
+        :return: The decoded frame, or None if the server closed the connection first
+        """
+        decoder = WireDecoder()
+        frames = decoder.feed(bytes((op_id,)))
+        while not frames:
+            chunk = self.socket.recv(self.recv_size)
+            if not chunk:
+                return None
+            self.bytes_received += len(chunk)
+            frames = decoder.feed(chunk)
+        return frames[0]
+
     # (1) LOOKUP
     def send_lookup_account(self, username):
         """
         OPERATION 1: Send a lookup account message to the server (LOOKUP_USER).
 
         :param username: Username to lookup
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
 
-        print("[LOOKUP] Looking up account for", username)
+        logger.debug("Looking up account for %s", username)
 
         if not isinstance(username, str) or not username:
             return self.log_error("Invalid username", False)
 
-        message = struct.pack("!B B", 1, len(username)) + \
-            username.encode("utf-8")
-        self.bytes_sent += len(message)
-        self.socket.send(message)
+        self.lookup_username = username
+        message = encode_lookup_user(username)
+        return self.send_request(LOOKUP_USER, message)
 
-    def handle_lookup_account_response(self):
+    def handle_lookup_account_response(self, payload=None):
         """
         Handle the response from the server for the LOOKUP_USER operation (1).
-        """
-        print("[LOOKUP] Handling response...")
-        response = self.socket.recv(1)  # Expected response: 1 byte exists
-        print("[LOOKUP] Response:", response)
-        if len(response) < 1:
-            return self.log_error("LOOKUP_USER Invalid response from server", None)
 
-        self.bytes_received += 1
+        :param payload: Decoded LookupUserFrame (read from the socket if not given)
+        :return: True if the account exists, False otherwise
+        """
+        logger.debug("Handling LOOKUP_USER response")
+        if payload is None:
+            payload = self.receive_frame(LOOKUP_USER)
+            if payload is None:
+                return self.log_error("LOOKUP_USER Invalid response from server", None)
 
-        exists = struct.unpack("!B", response)[0]
+        exists = payload.exists
         if exists == 0:
-            print("[LOOKUP] Account does not exist")
+            logger.debug("Account does not exist")
             self.bcrypt_prefix = None
+            self.forget_prefix(self.lookup_username)
         else:
             # Otherwise, account exists
-            # Extract salt from response
-            # Expected response: 29 byte bcrypt prefix
-            response = self.socket.recv(29)
-            if len(response) < 29:
-                return self.log_error("LOOKUP_USER Invalid response from server", None)
-
-            self.bytes_received += 29
-
-            print("[LOOKUP] Account exists:", exists)
-
-            salt = struct.unpack("!29s", response)[0]
-            self.bcrypt_prefix = salt
+            logger.debug("Account exists")
+            self.bcrypt_prefix = payload.bcrypt_prefix
+            self.remember_prefix(self.lookup_username, self.bcrypt_prefix)
 
         # Notify UI of lookup result
-        if self.message_callback:
-            self.message_callback(f"LOOKUP_USER:{exists}")
+        self.emit(LookupResult(bool(exists)))
+        return bool(exists)
 
     # (2) LOGIN
     def send_login(self, username, password):
@@ -123,6 +276,7 @@ class WireChatClient(ChatClient):
 
         :param username: Username to login
         :param password: Password to login
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -136,40 +290,48 @@ class WireChatClient(ChatClient):
         hashed_password = self.get_hashed_password_for_login(
             username, password)
 
-        message = struct.pack("!B B", 2, len(username)) + \
-            username.encode("utf-8")
-        message += struct.pack("!B", len(hashed_password)) + hashed_password
-        self.bytes_sent += len(message)
-        self.socket.send(message)
+        return self.send_hashed_login(username, hashed_password)
+
+    def send_hashed_login(self, username, hashed_password):
+        """
+        Send a LOGIN request with an already hashed password (also used to resume a session).
+
+        :param username: Username to login
+        :param hashed_password: Bcrypt hash of the password
+        :return: Future resolved with the response handler's result
+        """
+        message = encode_login(username, hashed_password)
+        return self.send_request(LOGIN, message)
 
-    def handle_login_response(self):
+    def handle_login_response(self, payload=None):
         """
         Handle the response from the server for the LOGIN operation (2).
 
+        :param payload: Decoded LoginFrame (read from the socket if not given)
         :return: Tuple of success flag and unread message count if login is successful, False otherwise
         """
-        response = self.socket.recv(1)  # Expected response: 1 byte success
-        if len(response) < 1:
-            return self.log_error("LOGIN Invalid response from server", False)
-
-        self.bytes_received += 1
+        if payload is None:
+            payload = self.receive_frame(LOGIN)
+            if payload is None:
+                return self.log_error("LOGIN Invalid response from server", False)
 
-        success = struct.unpack("!B", response)[0]
+        success = payload.success
+        unread_count = payload.unread_count
+        resumed, self.resuming = self.resuming, False
 
         if success == 0:
             self.log_error("Invalid credentials", False)
-            unread_count = 0
-        else:
-            # Expected response: 2 byte unread message count
-            response = self.socket.recv(2)
-            if len(response) < 2:
-                return self.log_error("LOGIN Invalid response from server", False)
-            self.bytes_received += 2
-            unread_count = struct.unpack("!H", response)[0]
-
-        # Notify UI of login result
-        if self.message_callback:
-            self.message_callback(f"LOGIN:{success}:{unread_count}")
+            # The cached prefix may be stale: look the account up next time
+            self.forget_prefix(self.username)
+            self.session = None
+
+        # Notify UI of login result (a resumed session is reported by the supervisor instead)
+        if not resumed:
+            self.emit(LoginResult(bool(success), unread_count))
+        if success:
+            # Messages written while disconnected can be sent now. Sent from the action
+            # thread: a write blocked on a full socket must never stop responses being read
+            self.submit(self.flush_outbox)
         # Return the number of unread messages if login successful
         return success, unread_count
 
@@ -181,6 +343,7 @@ class WireChatClient(ChatClient):
 
         :param username: Username to create
         :param password: Password to create
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -191,45 +354,48 @@ class WireChatClient(ChatClient):
         if not isinstance(password, str) or not password:
             return self.log_error("Invalid password", False)
 
-        print("[CREATE ACCOUNT] Creating account for", username)
+        logger.debug("Creating account for %s", username)
 
         hashed_password = self.generate_hashed_password_for_create(
             username, password)
 
-        message = struct.pack("!B B", 3, len(username)) + \
-            username.encode("utf-8")
-        message += struct.pack("!B", len(hashed_password)) + hashed_password
-        self.bytes_sent += len(message)
-        self.socket.send(message)
+        message = encode_create_account(username, hashed_password)
+        return self.send_request(CREATE_ACCOUNT, message)
 
-    def handle_create_account_response(self):
+    def handle_create_account_response(self, payload=None):
         """
         Handle the response from the server for the CREATE_ACCOUNT operation (3).
-        """
-        response = self.socket.recv(1)  # Expected response: 1 byte success
-        if len(response) < 1:
-            return self.log_error("CREATE_ACCOUNT Invalid response from server")
 
-        self.bytes_received += 1
+        :param payload: Decoded CreateAccountFrame (read from the socket if not given)
+        :return: True if the account was created, False otherwise
+        """
+        if payload is None:
+            payload = self.receive_frame(CREATE_ACCOUNT)
+            if payload is None:
+                return self.log_error("CREATE_ACCOUNT Invalid response from server")
 
-        success = struct.unpack("!B", response)[0]
+        success = payload.success
 
         if success == 0:
             self.log_error("Account creation failed")
+        else:
+            self.remember_prefix(self.username, self.bcrypt_prefix)
 
         # Notify UI of account creation result
-        if self.message_callback:
-            self.message_callback(f"CREATE_ACCOUNT:{success}")
+        self.emit(AccountCreated(bool(success)))
 
         if not self.username:
             self.log_error("Username not set")
+        return bool(success)
 
     # (4) LIST ACCOUNTS
-    def send_list_accounts(self, filter_text=""):
+    def send_list_accounts(self, filter_text="", offset_id=None):
         """
         OPERATION 4: Request a list of accounts from the server (LIST_ACCOUNTS).
 
         :param filter_text: Filter text to search for
+        :param offset_id: List accounts after this ID (defaults to `last_offset_account_id`)
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -238,56 +404,32 @@ class WireChatClient(ChatClient):
             return self.log_error("Invalid filter text", False)
 
         # Determine the offset ID based on the direction user wants to go
-        offset_id = self.last_offset_account_id
+        if offset_id is None:
+            offset_id = self.last_offset_account_id
 
-        print("[ACCOUNTS] Offset ID:", offset_id, ", Filter:",
-              filter_text, ", Max users:", self.max_users)
+        logger.debug("Listing accounts: offset ID %d, filter %r, max users %d",
+                     offset_id, filter_text, self.max_users)
 
-        message = struct.pack("!B B I B", 4, self.max_users,
-                              offset_id, len(filter_text))
-        message += filter_text.encode("utf-8")
-        self.bytes_sent += len(message)
-        self.socket.send(message)
+        message = encode_list_accounts(self.max_users, offset_id, filter_text)
+        return self.send_request(LIST_ACCOUNTS, message)
 
-    def handle_list_accounts_response(self):
+    def handle_list_accounts_response(self, payload=None):
         """
         Handle the response from the server for the LIST_ACCOUNTS operation (4).
 
+        :param payload: Decoded ListAccountsFrame (read from the socket if not given)
         :return: List of accounts
         """
-        response = self.socket.recv(
-            1)  # Expected response: 1 byte number of accounts
-        if len(response) < 1:
-            return self.log_error("LIST_ACCOUNTS Invalid response from server")
+        if payload is None:
+            payload = self.receive_frame(LIST_ACCOUNTS)
+            if payload is None:
+                return self.log_error("LIST_ACCOUNTS Invalid response from server")
 
-        self.bytes_received += 1
-
-        num_accounts = struct.unpack("!B", response)[0]
-
-        accounts = []
-        for _ in range(num_accounts):
-            # First 5 bytes: 4 byte account ID + 1 byte username length
-            header = self.socket.recv(5)
-
-            if len(header) < 5:
-                self.log_error("LIST_ACCOUNTS Invalid response from server")
-                continue
-
-            self.bytes_received += 5
-
-            account_id, username_len = struct.unpack("!I B", header)
-
-            # Extract username
-            username = self.socket.recv(username_len).decode("utf-8")
-            self.bytes_received += username_len
-            print("Username:", username)
-            accounts.append((account_id, username))
-
-        print(f"[ACCOUNTS] Retrieved {num_accounts} accounts")
+        accounts = payload.accounts
+        logger.debug("Retrieved %d accounts", len(accounts))
 
         # Notify UI of user list update
-        if self.message_callback:
-            self.message_callback(f"LIST_ACCOUNTS:{json.dumps(accounts)}")
+        self.emit(AccountsPage(accounts))
         return accounts
 
     # (5) SEND MESSAGE
@@ -297,115 +439,95 @@ class WireChatClient(ChatClient):
 
         :param recipient: Recipient of the message
         :param message: Message to send
+        :return: Future resolved with the response handler's result (queued in the outbox while disconnected)
         """
-        if self.is_not_connected():
-            return
-
         if not isinstance(recipient, str) or not recipient:
             return self.log_error("Invalid recipient", False)
 
         if not isinstance(message, str) or not message:
             return self.log_error("Invalid message", False)
 
-        message_bytes = message.encode("utf-8")
-        request = struct.pack("!B B", 5, len(recipient)) + \
-            recipient.encode("utf-8")
-        request += struct.pack("!H", len(message_bytes)) + message_bytes
-        self.bytes_sent += len(request)
-        self.socket.send(request)
+        if self.is_not_connected():
+            # Keep the message for the next login instead of dropping it
+            return self.queue_message(recipient, message)
+
+        request = encode_send_message(recipient, message)
+        return self.send_or_queue_message(
+            recipient, message, self.send_request(SEND_MESSAGE, request))
 
-    def handle_send_message_response(self):
+    def handle_send_message_response(self, payload=None):
         """
         Handle the response from the server for the SEND_MESSAGE operation (5).
 
+        :param payload: Decoded SendMessageFrame (read from the socket if not given)
         :return: True if message is sent successfully + message ID, False otherwise
         """
-        response = self.socket.recv(
-            5)  # Expected response: 1 byte success + 4 byte message ID
-        if len(response) < 5:
-            return self.log_error("SEND_MESSAGE Invalid response from server", False)
+        if payload is None:
+            payload = self.receive_frame(SEND_MESSAGE)
+            if payload is None:
+                return self.log_error("SEND_MESSAGE Invalid response from server", False)
 
-        self.bytes_received += 5
-
-        success, message_id = struct.unpack("!B I", response)
+        success, message_id = payload
 
         if success == 0:
             return self.log_error("Message failed to send", False)
 
-        print(f"[MESSAGE SENT] Message ID: {message_id}")
+        logger.debug("Message sent with ID %d", message_id)
         # Notify UI of message sent
-        if self.message_callback:
-            self.message_callback(f"SEND_MESSAGE:{success}")
+        self.emit(MessageSent(True, message_id))
         return True, message_id  # Return the message ID
 
+    def send_message_batch(self, messages):
+        """
+        Send several SEND_MESSAGE requests in one write (used to flush the outbox).
+        The responses arrive in order and resolve the returned futures one by one.
+
+        :param messages: List of (recipient, message) tuples
+        :return: List of futures (one per message), False if the batch could not be sent
+        """
+        buffers = []
+        for recipient, message in messages:
+            request = encode_send_message(recipient, message)
+            self.metrics.record_request(SEND_MESSAGE, sum(map(len, request)))
+            buffers.extend(request)
+        try:
+            return self.send_frame(buffers, [(SEND_MESSAGE, False)] * len(messages))
+        except OSError as e:
+            return self.log_error(f"Could not send queued messages: {e}", False)
+
     # (6) REQUEST MESSAGES
     def send_request_messages(self):
         """
         OPERATION 6: Request unread messages from the server (REQUEST_MESSAGES).
+
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
         # Request up to max messages
-        message = struct.pack("!B B", 6, self.max_msg)
-        self.bytes_sent += len(message)
-        self.socket.send(message)
+        message = encode_request_messages(self.max_msg)
+        return self.send_request(REQUEST_MESSAGES, message)
 
-    def handle_request_messages_response(self):
+    def handle_request_messages_response(self, payload=None):
         """
         Handle the response from the server for the REQUEST_MESSAGES operation (6).
 
+        :param payload: Decoded RequestMessagesFrame (read from the socket if not given)
         :return: List of messages
         """
-        response = self.socket.recv(
-            1)  # Expected response: 1 byte num messages
-        if len(response) < 1:
-            return self.log_error("REQUEST_MESSAGES Invalid response from server")
-
-        self.bytes_received += 1
-
-        num_messages = struct.unpack("!B", response)[0]
-        print(f"[MESSAGES] Received {num_messages} messages")
-
-        messages = []
-        for _ in range(num_messages):
-
-            # Expected response: 4 byte message ID
-            id_header = self.socket.recv(4)
-            if len(id_header) < 4:
-                self.log_error("REQUEST_MESSAGES Invalid response from server")
-                continue
-            self.bytes_received += 4
-            message_id = struct.unpack("!I", id_header)[0]
-
-            # Expected response: 1 byte sender length
-            sender_header = self.socket.recv(1)
-            if len(sender_header) < 1:
-                self.log_error("REQUEST_MESSAGES Invalid response from server")
-                continue
-            self.bytes_received += 1
-            sender_len = struct.unpack("!B", sender_header)[0]
-            sender = self.socket.recv(sender_len).decode("utf-8")
-            self.bytes_received += sender_len
-
-            # Expected response: 2 byte message length
-            message_header = self.socket.recv(2)
-            if len(message_header) < 2:
-                self.log_error("REQUEST_MESSAGES Invalid response from server")
-                continue
-            self.bytes_received += 2
-            message_len = struct.unpack("!H", message_header)[0]
-            message = self.socket.recv(message_len).decode("utf-8")
-            self.bytes_received += message_len
-
-            print(f"[DEBUG] Sender: {sender}, Message: {message}")
-
-            # Add message to list
-            messages.append((message_id, sender, message))
-
-        # print (f"[MESSAGES] Retrieved {num_messages} messages")
+        if payload is None:
+            payload = self.receive_frame(REQUEST_MESSAGES)
+            if payload is None:
+                return self.log_error("REQUEST_MESSAGES Invalid response from server")
+
+        messages = payload.messages
+        if logger.isEnabledFor(logging.DEBUG):  # Skip the loop entirely unless debugging
+            logger.debug("Received %d messages", len(messages))
+            for _, sender, message in messages:
+                logger.debug("Sender: %s, Message: %s", sender, message)
+
         # Notify UI of received messages
-        if self.message_callback:
-            self.message_callback(f"REQUEST_MESSAGES:{json.dumps(messages)}")
+        self.emit(MessagesReceived(messages))
         return messages
 
      # (7) DELETE MESSAGES
@@ -414,6 +536,7 @@ class WireChatClient(ChatClient):
         OPERATION 7: Delete messages from the server (DELETE_MESSAGES).
 
         :param message_ids: List of message IDs to delete
+        :return: Future resolved with the response handler's result
         """
         if self.is_not_connected():
             return
@@ -425,47 +548,46 @@ class WireChatClient(ChatClient):
         if num_messages == 0:
             return self.log_error("No messages to delete", False)
 
-        request = struct.pack("!B B", 7, num_messages)
-        for message_id in message_ids:
-            request += struct.pack("!I", message_id)
-        self.bytes_sent += len(request)
-        self.socket.send(request)
+        request = encode_delete_messages(message_ids)
+        return self.send_request(DELETE_MESSAGES, request)
 
-    def handle_delete_message_response(self):
+    def handle_delete_message_response(self, payload=None):
         """
         Handle the response from the server for the DELETE_MESSAGES operation (7).
 
+        :param payload: Decoded DeleteMessagesFrame (read from the socket if not given)
         :return: True if messages are deleted successfully, False otherwise
         """
-        response = self.socket.recv(1)  # Expected response: 1 byte success
-        if len(response) < 1:
-            return self.log_error("DELETE_MESSAGES Invalid response from server", False)
+        if payload is None:
+            payload = self.receive_frame(DELETE_MESSAGES)
+            if payload is None:
+                return self.log_error("DELETE_MESSAGES Invalid response from server", False)
 
-        self.bytes_received += 1
-
-        success = struct.unpack("!B", response)[0]
-
-        if success == 0:
+        if payload.success == 0:
             return self.log_error("Message deletion failed", False)
 
-        print(f"[MESSAGE DELETED] Messages deleted successfully")
+        logger.debug("Messages deleted successfully")
         # Notify UI of message deletion
-        if self.message_callback:
-            self.message_callback(f"DELETE_MESSAGES:{success}")
+        self.emit(MessagesDeleted(True))
         return True
 
     # (8) DELETE ACCOUNT
     def send_delete_account(self):
         """
         OPERATION 8: Delete the account from the server (DELETE_ACCOUNT).
+
+        :return: Future resolved with True once the request is sent (there is no response)
         """
         if self.is_not_connected():
             return
 
-        print("[ACCOUNT DELETION] Deleting account...")
-        request = struct.pack("!B", 8)
-        self.bytes_sent += 1
-        self.socket.send(request)
+        logger.info("Deleting account")
+        self.forget_prefix(self.username)
+        self.session = None  # Nothing to resume once the account is gone
+        self.closing = True  # The server closes the connection next: it is not lost, do not reconnect
+        request = encode_delete_account()
+        # The server closes the connection instead of responding
+        return self.send_request(DELETE_ACCOUNT, request, expect_response=False)
 
     def handle_delete_account_response(self):
         """
@@ -473,8 +595,7 @@ class WireChatClient(ChatClient):
 
         :return: True if account is deleted successfully
         """
-        print("[ACCOUNT DELETED] Account deleted successfully")
+        logger.info("Account deleted successfully")
         # Notify UI of account deletion
-        if self.message_callback:
-            self.message_callback(f"DELETE_ACCOUNT:{1}")  # success
+        self.emit(AccountDeleted())
         return True
@@ -0,0 +1,115 @@
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"  # Waiting to be sent
+SENT = "sent"  # Accepted by the server (message_id is set)
+FAILED = "failed"  # Rejected by the server (e.g. unknown recipient); not retried
+
+
+class Outbox:
+    """
+    Durable queue of messages written while the client was disconnected.
+
+    Entries are stored in SQLite so they survive a restart. Once the account is logged in
+    again, every pending entry is sent in one pipelined batch, and each entry is updated
+    with the message ID the server assigned to it (or marked failed if it was rejected).
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS outbox (
+            entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            account TEXT NOT NULL,
+            recipient TEXT NOT NULL,
+            message TEXT NOT NULL,
+            status TEXT NOT NULL,
+            message_id INTEGER,
+            created_at REAL NOT NULL,
+            sent_at REAL
+        )
+    """
+
+    def __init__(self, path=":memory:"):
+        """
+        Open (or create) the outbox.
+
+        :param path: SQLite database file (":memory:" for an outbox that is not persisted)
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        # Used from the UI and network threads; every access holds the lock
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.execute(self.SCHEMA)
+
+    @staticmethod
+    def account_key(host, port, username):
+        """
+        :return: Key identifying an account on a server
+        """
+        return f"{host}:{port}:{username}"
+
+    def add(self, account, recipient, message):
+        """
+        Queue a message.
+
+        :param account: Key of the sending account
+        :param recipient: Recipient username
+        :param message: Message text
+        :return: Entry ID
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO outbox (account, recipient, message, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (account, recipient, message, PENDING, time.time()))
+            return cursor.lastrowid
+
+    def pending(self, account):
+        """
+        :param account: Key of the sending account
+        :return: List of (entry ID, recipient, message) waiting to be sent, oldest first
+        """
+        with self.lock:
+            return self.connection.execute(
+                "SELECT entry_id, recipient, message FROM outbox WHERE account = ? AND status = ? "
+                "ORDER BY entry_id", (account, PENDING)).fetchall()
+
+    def mark_sent(self, entry_id, message_id):
+        """
+        :param entry_id: Entry that the server accepted
+        :param message_id: Message ID assigned by the server
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE outbox SET status = ?, message_id = ?, sent_at = ? WHERE entry_id = ?",
+                (SENT, message_id, time.time(), entry_id))
+
+    def mark_failed(self, entry_id):
+        """
+        :param entry_id: Entry that the server rejected
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE outbox SET status = ? WHERE entry_id = ?", (FAILED, entry_id))
+
+    def get(self, entry_id):
+        """
+        :param entry_id: Entry ID
+        :return: Dictionary describing the entry, or None if it does not exist
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT entry_id, recipient, message, status, message_id FROM outbox WHERE entry_id = ?",
+                (entry_id,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("entry_id", "recipient", "message", "status", "message_id"), row))
+
+    def close(self):
+        """
+        Close the database.
+        """
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,86 @@
+import itertools
+import threading
+from collections import deque
+
+
+class PendingRequests:
+    """
+    Per-connection registry of requests that are waiting for a response.
+
+    The server answers the requests of a connection in the order it received them,
+    so each operation keeps a FIFO of waiters and a response is matched to the oldest
+    waiter with the same operation ID. A REQUEST_MESSAGES frame that arrives while no
+    REQUEST_MESSAGES request is pending is a server push, not a reply.
+    """
+
+    def __init__(self):
+        self.queues = {}  # Operation ID -> deque of (sequence number, waiter)
+        self.sequence = itertools.count()  # Global send order, used to find the oldest waiter
+        self.lock = threading.Lock()
+
+    def push(self, op_id, waiter):
+        """
+        Register a waiter for the next response to an operation.
+
+        :param op_id: Operation ID of the request that was sent
+        :param waiter: Object to hand the response to (e.g. a future)
+        """
+        with self.lock:
+            self.queues.setdefault(op_id, deque()).append(
+                (next(self.sequence), waiter))
+
+    def pop(self, op_id):
+        """
+        Take the oldest waiter for an operation.
+
+        :param op_id: Operation ID of the response that arrived
+        :return: The waiter, or None if no request with that operation ID is pending
+        """
+        with self.lock:
+            queue = self.queues.get(op_id)
+            if not queue:
+                return None
+            return queue.popleft()[1]
+
+    def remove(self, op_id, waiter):
+        """
+        Remove a specific waiter, e.g. when its request could not be sent.
+
+        :param op_id: Operation ID the waiter was registered for
+        :param waiter: The waiter to remove
+        """
+        with self.lock:
+            queue = self.queues.get(op_id)
+            if queue:
+                for entry in queue:
+                    if entry[1] is waiter:
+                        queue.remove(entry)
+                        break
+
+    def pop_oldest(self):
+        """
+        Take the oldest waiter of any operation (for failures that do not say which request failed).
+
+        :return: The waiter, or None if nothing is pending
+        """
+        with self.lock:
+            heads = [queue for queue in self.queues.values() if queue]
+            if not heads:
+                return None
+            return min(heads, key=lambda queue: queue[0][0]).popleft()[1]
+
+    def drain(self):
+        """
+        Remove every pending waiter, e.g. when the connection is closed.
+
+        :return: List of waiters in the order their requests were sent
+        """
+        with self.lock:
+            entries = [entry for queue in self.queues.values()
+                       for entry in queue]
+            self.queues.clear()
+        return [waiter for _, waiter in sorted(entries, key=lambda entry: entry[0])]
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(queue) for queue in self.queues.values())
@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger("chat.network.prefix_cache")
+
+
+class PrefixCache:
+    """
+    Least-recently-used cache of bcrypt prefixes (cost + salt), keyed by server and username.
+
+    An account's prefix never changes, so a client that already knows it can skip the
+    LOOKUP_USER round trip and log in directly. Entries are dropped when a login with the
+    cached prefix fails (e.g. the account was deleted and created again). If a path is
+    given, the cache is loaded from and saved to that JSON file.
+    """
+
+    def __init__(self, path=None, capacity=1024):
+        """
+        Initialize the cache.
+
+        :param path: JSON file to persist the cache to (None to keep it in memory only)
+        :param capacity: Maximum number of prefixes to keep
+        """
+        self.path = path
+        self.capacity = capacity
+        self.entries = OrderedDict()  # "host:port:username" -> prefix (str), oldest first
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # Serializes writes to the file
+        self.load()
+
+    @staticmethod
+    def make_key(host, port, username):
+        """
+        :return: Cache key for an account on a server
+        """
+        return f"{host}:{port}:{username}"
+
+    def get(self, host, port, username):
+        """
+        Look up the prefix of an account.
+
+        :param host: Server host
+        :param port: Server port
+        :param username: Username
+        :return: Bcrypt prefix (bytes), or None if it is not cached
+        """
+        key = self.make_key(host, port, username)
+        with self.lock:
+            prefix = self.entries.get(key)
+            if prefix is None:
+                return None
+            self.entries.move_to_end(key)
+        return prefix.encode("utf-8")
+
+    def put(self, host, port, username, prefix):
+        """
+        Remember the prefix of an account.
+
+        :param host: Server host
+        :param port: Server port
+        :param username: Username
+        :param prefix: Bcrypt prefix (bytes)
+        """
+        key = self.make_key(host, port, username)
+        prefix = prefix.decode("utf-8")
+        with self.lock:
+            if self.entries.get(key) == prefix:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = prefix
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+        self.save()
+
+    def invalidate(self, host, port, username):
+        """
+        Forget the prefix of an account (e.g. after a failed login).
+
+        :param host: Server host
+        :param port: Server port
+        :param username: Username
+        """
+        with self.lock:
+            if self.entries.pop(self.make_key(host, port, username), None) is None:
+                return
+        self.save()
+
+    def load(self):
+        """
+        Load the cache from its file. A missing or unreadable file leaves the cache empty.
+        """
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error("Could not load prefix cache %s: %s", self.path, e)
+            return
+        with self.lock:
+            # Saved oldest first; keep the most recent entries if the capacity shrank
+            self.entries = OrderedDict(list(entries.items())[-self.capacity:])
+
+    def save(self):
+        """
+        Write the cache to its file (atomically, so a crash never leaves a partial file).
+        """
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with self.save_lock:
+            with self.lock:
+                entries = dict(self.entries)  # Snapshot after earlier saves finished
+            try:
+                with open(temp_path, "w") as f:
+                    json.dump(entries, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error("Could not save prefix cache %s: %s", self.path, e)
+
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
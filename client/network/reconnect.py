@@ -0,0 +1,158 @@
+import logging
+import random
+import threading
+import time
+from .events import ConnectionLost, Reconnected
+
+logger = logging.getLogger("chat.network.reconnect")
+
+RESUME_TIMEOUT_FLOOR = 5.0  # Seconds; the server may be busy right after restarting
+
+
+class Backoff:
+    """
+    Exponential backoff with full jitter: the delay before retry n is drawn uniformly from
+    [0, min(max_delay, base_delay * multiplier ** n)]. The jitter spreads out the clients
+    that lost their connection at the same moment (e.g. when the server restarts), so they
+    do not all reconnect in lockstep.
+    """
+
+    def __init__(self, base_delay=0.5, max_delay=30.0, multiplier=2.0, rng=None):
+        """
+        :param base_delay: Upper bound of the first delay in seconds
+        :param max_delay: Largest upper bound in seconds
+        :param multiplier: Growth of the upper bound per attempt
+        :param rng: random.Random to draw delays from (for reproducible tests)
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt):
+        """
+        :param attempt: Number of failed attempts so far, starting at 0
+        :return: Seconds to wait before the next attempt
+        """
+        ceiling = min(self.max_delay, self.base_delay *
+                      self.multiplier ** attempt)
+        return self.rng.uniform(0, ceiling)
+
+
+class ReconnectSupervisor:
+    """
+    Reconnects a ChatClient whose connection was lost.
+
+    When the client's listener stops for any reason other than close(), the supervisor
+    opens a new socket (retrying with backoff), restarts the listener and replays the login
+    with the stored password hash, so no bcrypt round and no LOOKUP_USER are needed. The UI
+    keeps its state; it only sees a ConnectionLost event followed by Reconnected.
+    Reconnect latency and attempt counts are recorded in the client's metrics.
+    """
+
+    def __init__(self, client, backoff=None, max_attempts=None, resume_timeout=None):
+        """
+        Attach a supervisor to a client.
+
+        :param client: ChatClient to supervise
+        :param backoff: Backoff between attempts (defaults to Backoff())
+        :param max_attempts: Attempts before giving up (None to retry until close)
+        :param resume_timeout: Seconds to wait for the replayed LOGIN response
+            (None to derive it from the client's RTT estimate)
+        """
+        self.client = client
+        self.backoff = backoff or Backoff()
+        self.max_attempts = max_attempts
+        self.resume_timeout = resume_timeout
+        self.stopped = threading.Event()  # Set by stop(); interrupts the backoff sleep
+        self.lock = threading.Lock()
+        self.active = False  # Whether a reconnect thread is running
+        self.lost_again = False  # Connection lost while the reconnect thread was running
+        self.thread = None
+        client.supervisor = self
+
+    def connection_lost(self):
+        """
+        Start reconnecting (called by the client when its listener stops).
+        """
+        if self.stopped.is_set():
+            return
+        with self.lock:
+            if self.active:
+                self.lost_again = True
+                return
+            self.active = True
+        self.client.emit(ConnectionLost())
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stop reconnecting (called by the client's close()).
+        """
+        self.stopped.set()
+
+    def run(self):
+        """
+        Reconnect until it succeeds, the attempts run out or the supervisor is stopped.
+        """
+        while True:
+            self.reconnect()
+            with self.lock:
+                if not self.lost_again or self.stopped.is_set():
+                    self.active = False
+                    return
+                self.lost_again = False
+
+    def reconnect(self):
+        """
+        Run one reconnect cycle: connect with backoff, then resume the session.
+
+        :return: True if the connection was re-established
+        """
+        started = time.perf_counter()
+        attempts = 0
+        while not self.stopped.is_set():
+            attempts += 1
+            if self.client.reconnect():
+                break
+            if self.max_attempts is not None and attempts >= self.max_attempts:
+                logger.error("Giving up after %d reconnect attempts", attempts)
+                self.client.metrics.record_reconnect(
+                    attempts, time.perf_counter() - started, False)
+                return False
+            delay = self.backoff.delay(attempts - 1)
+            logger.info("Reconnect attempt %d failed, retrying in %.2f s",
+                        attempts, delay)
+            if self.stopped.wait(delay):
+                return False
+        else:
+            return False
+
+        resumed = self.resume_session()
+        latency = time.perf_counter() - started
+        self.client.metrics.record_reconnect(attempts, latency, True)
+        logger.info("Reconnected after %d attempts in %.2f s (session %s)",
+                    attempts, latency, "resumed" if resumed else "not resumed")
+        self.client.emit(Reconnected(attempts, resumed))
+        return True
+
+    def resume_session(self):
+        """
+        Replay the login of the previous connection.
+
+        :return: True if the server accepted the login
+        """
+        future = self.client.resume_session()
+        if not future:
+            return False
+        timeout = self.resume_timeout
+        if timeout is None:
+            # A few retransmission timeouts, never less than RESUME_TIMEOUT_FLOOR
+            timeout = max(RESUME_TIMEOUT_FLOOR, 4 * self.client.rtt.rto)
+        try:
+            result = future.result(timeout=timeout)
+        except Exception as e:
+            logger.error("Could not resume the session: %s", e)
+            return False
+        return bool(result and result[0])
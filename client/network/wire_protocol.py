@@ -0,0 +1,360 @@
+import struct
+from typing import NamedTuple, Optional
+
+### OPERATION IDS ###
+LOOKUP_USER = 1
+LOGIN = 2
+CREATE_ACCOUNT = 3
+LIST_ACCOUNTS = 4
+SEND_MESSAGE = 5
+REQUEST_MESSAGES = 6
+DELETE_MESSAGES = 7
+DELETE_ACCOUNT = 8
+FAILURE = 255
+
+OPERATION_NAMES = {
+    LOOKUP_USER: "LOOKUP_USER",
+    LOGIN: "LOGIN",
+    CREATE_ACCOUNT: "CREATE_ACCOUNT",
+    LIST_ACCOUNTS: "LIST_ACCOUNTS",
+    SEND_MESSAGE: "SEND_MESSAGE",
+    REQUEST_MESSAGES: "REQUEST_MESSAGES",
+    DELETE_MESSAGES: "DELETE_MESSAGES",
+    DELETE_ACCOUNT: "DELETE_ACCOUNT",
+    FAILURE: "FAILURE",
+}
+
+BCRYPT_PREFIX_LENGTH = 29
+
+# Precompiled struct formats used while decoding
+_U8 = struct.Struct("!B")
+_U16 = struct.Struct("!H")
+_U32 = struct.Struct("!I")
+_ACCOUNT_HEADER = struct.Struct("!I B")  # account ID + username length
+
+# Precompiled request headers: operation ID followed by the fixed-size fields that
+# precede the first variable-length field
+REQUEST_HEADERS = {
+    LOOKUP_USER: struct.Struct("!B B"),  # username length
+    LOGIN: struct.Struct("!B B"),  # username length
+    CREATE_ACCOUNT: struct.Struct("!B B"),  # username length
+    LIST_ACCOUNTS: struct.Struct("!B B I B"),  # maximum number, offset account ID, filter length
+    SEND_MESSAGE: struct.Struct("!B B"),  # recipient length
+    REQUEST_MESSAGES: struct.Struct("!B B"),  # maximum number
+    DELETE_MESSAGES: struct.Struct("!B B"),  # number of IDs
+    DELETE_ACCOUNT: struct.Struct("!B"),
+}
+
+
+### REQUEST ENCODING ###
+# Each encoder returns the request as a list of buffers (header and body kept separate),
+# ready to be written with a single scatter-gather send. Use b"".join() to get the bytes.
+def encode_lookup_user(username):
+    """
+    :param username: Username to look up
+    :return: LOOKUP_USER (1) request buffers
+    """
+    username_bytes = username.encode("utf-8")
+    return [REQUEST_HEADERS[LOOKUP_USER].pack(LOOKUP_USER, len(username_bytes)), username_bytes]
+
+
+def encode_login(username, password_hash):
+    """
+    :param username: Username to log in as
+    :param password_hash: Bcrypt password hash (bytes)
+    :return: LOGIN (2) request buffers
+    """
+    username_bytes = username.encode("utf-8")
+    return [REQUEST_HEADERS[LOGIN].pack(LOGIN, len(username_bytes)), username_bytes,
+            _U8.pack(len(password_hash)), password_hash]
+
+
+def encode_create_account(username, password_hash):
+    """
+    :param username: Username to create
+    :param password_hash: Bcrypt password hash (bytes)
+    :return: CREATE_ACCOUNT (3) request buffers
+    """
+    username_bytes = username.encode("utf-8")
+    return [REQUEST_HEADERS[CREATE_ACCOUNT].pack(CREATE_ACCOUNT, len(username_bytes)), username_bytes,
+            _U8.pack(len(password_hash)), password_hash]
+
+
+def encode_list_accounts(maximum_number, offset_account_id, filter_text):
+    """
+    :param maximum_number: Maximum number of accounts to return
+    :param offset_account_id: Only return accounts with a larger ID
+    :param filter_text: Filter text to search for
+    :return: LIST_ACCOUNTS (4) request buffers
+    """
+    filter_bytes = filter_text.encode("utf-8")
+    return [REQUEST_HEADERS[LIST_ACCOUNTS].pack(LIST_ACCOUNTS, maximum_number, offset_account_id,
+                                                len(filter_bytes)), filter_bytes]
+
+
+def encode_send_message(recipient, message):
+    """
+    :param recipient: Recipient username
+    :param message: Message text
+    :return: SEND_MESSAGE (5) request buffers
+    """
+    recipient_bytes = recipient.encode("utf-8")
+    message_bytes = message.encode("utf-8")
+    return [REQUEST_HEADERS[SEND_MESSAGE].pack(SEND_MESSAGE, len(recipient_bytes)), recipient_bytes,
+            _U16.pack(len(message_bytes)), message_bytes]
+
+
+def encode_request_messages(maximum_number):
+    """
+    :param maximum_number: Maximum number of messages to return
+    :return: REQUEST_MESSAGES (6) request buffers
+    """
+    return [REQUEST_HEADERS[REQUEST_MESSAGES].pack(REQUEST_MESSAGES, maximum_number)]
+
+
+def encode_delete_messages(message_ids):
+    """
+    :param message_ids: List of message IDs to delete
+    :return: DELETE_MESSAGES (7) request buffers
+    """
+    count = len(message_ids)
+    # All IDs are packed in one call instead of one struct.pack per ID
+    return [REQUEST_HEADERS[DELETE_MESSAGES].pack(DELETE_MESSAGES, count),
+            struct.pack(f"!{count}I", *message_ids)]
+
+
+def encode_delete_account():
+    """
+    :return: DELETE_ACCOUNT (8) request buffers
+    """
+    return [REQUEST_HEADERS[DELETE_ACCOUNT].pack(DELETE_ACCOUNT)]
+
+
+### RESPONSE FRAMES ###
+class LookupUserFrame(NamedTuple):
+    """ Response to LOOKUP_USER (1). """
+    exists: int
+    bcrypt_prefix: Optional[bytes] = None
+
+    op_id = LOOKUP_USER
+
+
+class LoginFrame(NamedTuple):
+    """ Response to LOGIN (2). """
+    success: int
+    unread_count: int = 0
+
+    op_id = LOGIN
+
+
+class CreateAccountFrame(NamedTuple):
+    """ Response to CREATE_ACCOUNT (3). """
+    success: int
+
+    op_id = CREATE_ACCOUNT
+
+
+class ListAccountsFrame(NamedTuple):
+    """ Response to LIST_ACCOUNTS (4): list of (account ID, username) tuples. """
+    accounts: list
+
+    op_id = LIST_ACCOUNTS
+
+
+class SendMessageFrame(NamedTuple):
+    """ Response to SEND_MESSAGE (5). """
+    success: int
+    message_id: int
+
+    op_id = SEND_MESSAGE
+
+
+class RequestMessagesFrame(NamedTuple):
+    """ Response to (or server push of) REQUEST_MESSAGES (6): list of (message ID, sender, message) tuples. """
+    messages: list
+
+    op_id = REQUEST_MESSAGES
+
+
+class DeleteMessagesFrame(NamedTuple):
+    """ Response to DELETE_MESSAGES (7). """
+    success: int
+
+    op_id = DELETE_MESSAGES
+
+
+class DeleteAccountFrame(NamedTuple):
+    """ Response to DELETE_ACCOUNT (8). The server normally closes the socket instead. """
+    op_id = DELETE_ACCOUNT
+
+
+class FailureFrame(NamedTuple):
+    """ Unexpected failure (255) for the request with operation ID `request_op_id`. """
+    request_op_id: int
+    message: str
+
+    op_id = FAILURE
+
+
+class WireProtocolError(ValueError):
+    """
+    Raised when the byte stream cannot be a valid wire protocol response.
+    """
+    pass
+
+
+class _Incomplete(Exception):
+    """
+    Internal signal: the frame at the front of the buffer needs `needed` bytes in total.
+    """
+
+    def __init__(self, needed):
+        self.needed = needed
+
+
+class _Cursor:
+    """
+    Read position inside a single frame of the decoder buffer.
+    """
+    __slots__ = ("view", "start", "pos")
+
+    def __init__(self, view, start):
+        self.view = view
+        self.start = start
+        self.pos = start
+
+    def take(self, size):
+        end = self.pos + size
+        if end > len(self.view):
+            raise _Incomplete(end - self.start)
+        chunk = self.view[self.pos:end]
+        self.pos = end
+        return chunk
+
+    def unpack(self, fmt):
+        end = self.pos + fmt.size
+        if end > len(self.view):
+            raise _Incomplete(end - self.start)
+        values = fmt.unpack_from(self.view, self.pos)
+        self.pos = end
+        return values
+
+    def u8(self):
+        return self.unpack(_U8)[0]
+
+    def u16(self):
+        return self.unpack(_U16)[0]
+
+    def u32(self):
+        return self.unpack(_U32)[0]
+
+    def string(self, length):
+        return str(self.take(length), "utf-8")
+
+
+class WireDecoder:
+    """
+    Incremental, sans-I/O decoder for wire protocol responses.
+
+    Feed it arbitrary chunks of bytes as they arrive from the socket (split anywhere,
+    several frames per chunk, ...) and it returns every complete response frame.
+    Partial frames are kept in an internal buffer until the rest of their bytes arrive.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()  # Bytes received but not yet decoded
+        self.frame_sizes = []  # Encoded size of each frame returned by the last feed
+        # Minimum buffer length before the frame at the front could be complete
+        self.needed = 1
+
+    def feed(self, data):
+        """
+        Add received bytes to the decoder.
+
+        :param data: Bytes-like chunk received from the server
+        :return: List of complete frames decoded so far (possibly empty)
+        """
+        self.buffer += data
+        frames = []
+        self.frame_sizes = sizes = []
+        if len(self.buffer) < self.needed:
+            return frames  # Still waiting on the rest of the current frame
+
+        offset = 0
+        view = memoryview(self.buffer)
+        try:
+            while offset < len(view):
+                try:
+                    frame, end = self.decode_frame(view, offset)
+                except _Incomplete as incomplete:
+                    self.needed = incomplete.needed
+                    break
+                frames.append(frame)
+                sizes.append(end - offset)
+                offset = end
+            else:
+                self.needed = 1
+        finally:
+            view.release()
+
+        # Drop the decoded bytes in one go
+        if offset:
+            del self.buffer[:offset]
+        return frames
+
+    def pending_bytes(self):
+        """
+        :return: Number of buffered bytes belonging to an incomplete frame
+        """
+        return len(self.buffer)
+
+    def decode_frame(self, view, start):
+        """
+        Decode a single frame from the buffer.
+
+        :param view: Memoryview over the decoder buffer
+        :param start: Offset of the operation ID byte of the frame
+        :return: Tuple of the decoded frame and the offset just past it
+        """
+        cursor = _Cursor(view, start)
+        op_id = cursor.u8()
+
+        if op_id == LOOKUP_USER:
+            exists = cursor.u8()
+            prefix = bytes(cursor.take(BCRYPT_PREFIX_LENGTH)) if exists else None
+            frame = LookupUserFrame(exists, prefix)
+        elif op_id == LOGIN:
+            success = cursor.u8()
+            unread_count = cursor.u16() if success else 0
+            frame = LoginFrame(success, unread_count)
+        elif op_id == CREATE_ACCOUNT:
+            frame = CreateAccountFrame(cursor.u8())
+        elif op_id == LIST_ACCOUNTS:
+            accounts = []
+            for _ in range(cursor.u8()):
+                account_id, username_len = cursor.unpack(_ACCOUNT_HEADER)
+                accounts.append((account_id, cursor.string(username_len)))
+            frame = ListAccountsFrame(accounts)
+        elif op_id == SEND_MESSAGE:
+            # The server always sends the message ID, even though the spec makes it optional
+            success = cursor.u8()
+            frame = SendMessageFrame(success, cursor.u32())
+        elif op_id == REQUEST_MESSAGES:
+            messages = []
+            for _ in range(cursor.u8()):
+                message_id = cursor.u32()
+                sender = cursor.string(cursor.u8())
+                message = cursor.string(cursor.u16())
+                messages.append((message_id, sender, message))
+            frame = RequestMessagesFrame(messages)
+        elif op_id == DELETE_MESSAGES:
+            frame = DeleteMessagesFrame(cursor.u8())
+        elif op_id == DELETE_ACCOUNT:
+            frame = DeleteAccountFrame()
+        elif op_id == FAILURE:
+            request_op_id = cursor.u8()
+            frame = FailureFrame(request_op_id, cursor.string(cursor.u16()))
+        else:
+            raise WireProtocolError(f"Invalid operation ID: {op_id}")
+
+        return frame, cursor.pos
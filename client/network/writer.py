@@ -0,0 +1,103 @@
+import logging
+import threading
+
+logger = logging.getLogger("chat.network.writer")
+
+
+class FrameWriter:
+    """
+    Single writer for a client's socket.
+
+    Requests are sent from several threads (UI actions, the heartbeat, the reconnect
+    supervisor, outbox flushes). Unsynchronized writes can interleave the bytes of two
+    frames, and a request registered in the pending FIFO before another one could reach the
+    wire after it, so responses would resolve the wrong futures. Every frame therefore goes
+    through this queue: the frame is queued and its future registered under one lock, so the
+    pending FIFO always matches the order of the bytes on the wire. Only one thread writes at
+    a time. The thread that finds the writer idle writes the whole queue, including frames
+    other threads queued meanwhile, as one write; the other threads return as soon as their
+    frame is queued.
+    """
+
+    def __init__(self, write):
+        """
+        :param write: Function writing a list of buffers to the socket (raises OSError on failure)
+        """
+        self.write = write
+        self.lock = threading.Lock()  # Guards the queue and the writing flag
+        self.queue = []  # (buffers, on_error) of frames waiting to be written, in order
+        self.writing = False  # Whether a thread is draining the queue
+
+        # Metrics
+        self.frames = 0  # Frames submitted
+        self.writes = 0  # Socket writes made
+        self.coalesced = 0  # Frames written by another thread's write
+
+    def submit(self, buffers, prepare=None, on_error=None):
+        """
+        Queue a frame and write it, unless another thread is writing (that thread writes it too).
+
+        :param buffers: List of bytes-like objects making up the frame
+        :param prepare: Function called under the queue lock right before the frame is queued
+            (e.g. registering the request's future), so registrations follow the wire order
+        :param on_error: Function called with the exception if writing the frame fails
+        :return: Result of prepare
+        :raises OSError: If writing this thread's own frame failed (on_error was called for
+            every frame lost)
+        """
+        frame = (buffers, on_error)
+        with self.lock:
+            result = prepare() if prepare is not None else None
+            self.queue.append(frame)
+            self.frames += 1
+            if self.writing:
+                self.coalesced += 1
+                return result
+            self.writing = True
+        self.drain(frame)
+        return result
+
+    def drain(self, own=None):
+        """
+        Write queued frames until the queue is empty (called by the thread that set `writing`).
+
+        :param own: Frame submitted by the calling thread; a failure is only raised if it was lost
+        """
+        while True:
+            with self.lock:
+                batch, self.queue = self.queue, []
+                if not batch:
+                    self.writing = False
+                    return
+            try:
+                self.write([buffer for buffers, _ in batch for buffer in buffers])
+            except Exception as e:
+                # Any failure (not only OSError, e.g. a bug in write) must release the writer,
+                # or every later frame would be queued behind a write that never happens
+                with self.lock:
+                    # The connection is broken: fail the frames queued behind the batch too
+                    batch += self.queue
+                    self.queue = []
+                    self.writing = False
+                logger.debug("Write of %d frames failed: %s", len(batch), e)
+                for _, on_error in batch:
+                    if on_error is not None:
+                        on_error(e)
+                if any(frame is own for frame in batch):
+                    raise
+                # This thread's frame went out in an earlier write: only the others were lost
+                return
+            with self.lock:
+                self.writes += 1
+
+    def stats(self):
+        """
+        :return: Dictionary of write counters
+        """
+        with self.lock:
+            return {
+                "frames": self.frames,
+                "writes": self.writes,
+                "coalesced": self.coalesced,
+                "queued": len(self.queue),
+            }
@@ -1,8 +1,33 @@
-import math
+import logging
 import tkinter as tk
 from tkinter import messagebox
-import threading
-import json
+from dataclasses import dataclass
+from network.events import (LookupResult, LoginResult, AccountCreated, MessageSent, MessagesReceived,
+                            MessagesDeleted, AccountDeleted, Connected, ConnectionLost,
+                            Reconnected)
+from message_store import MessageStore
+from message_view import MessageView
+from update_queue import UpdateQueue
+from account_directory import AccountDirectory
+from view_model import UserListModel, MessageListModel, FETCH, SHOW
+
+logger = logging.getLogger("chat.ui")
+
+# Added to the window title while the connection is not ready
+CONNECTING = " (connecting...)"
+RECONNECTING = " (reconnecting...)"
+DISCONNECTED = " (disconnected)"
+
+SEARCH_DEBOUNCE_MS = 250  # Pause in typing before the user list is searched
+RESIZE_SETTLE_MS = 100  # Pause in resizing before message labels are rewrapped
+
+
+@dataclass
+class UserPage:
+    """ Page of accounts for user list query number `query` (posted by the UI itself). """
+    __slots__ = ("query", "accounts")
+    query: int
+    accounts: list
 
 
 class ChatUI:
@@ -10,34 +35,49 @@ class ChatUI:
     Handles the user interface for the chat application.
     """
 
-    def __init__(self, root, client):
+    def __init__(self, root, client, message_store=None):
         """
         Initialize the user interface.
 
         :param root: The Tkinter root window
         :param client: The ChatClient instance
+        :param message_store: MessageStore keeping received messages (defaults to an in-memory store)
         """
         self.root = root
         self.client = client
 
-        # Keep track of current pages for list accounts and messages
-        self.current_user_page = 0
-        self.current_msg_page = 0
-
-        self.all_users = []
-        self.all_messages = []
-
-        self.unread_count = 0
-
-        self.prev_search = ""  # Store previous search text for user list
-
-        # Start listening for messages
-        self.client.start_listener(self.display_message)
-
-        # Start on the login screen
+        # Users loaded for the current search text, and the current page (headless state)
+        self.users = UserListModel(client.max_users)
+        self.shown_users = None  # Rows currently in the user list, to skip redundant redraws
+        # Cached LIST_ACCOUNTS results, so refining a search does not need the network
+        self.directory = AccountDirectory()
+        self.users_future = None  # (query, future) of the LIST_ACCOUNTS request in flight, if any
+        self.users_prefetch = None  # (search text, offset ID, future) of the next user page being prefetched
+        self.search_after_id = None  # Pending debounced search
+
+        # Every received message is kept in the local store, which the message pages are read from
+        self.message_store = message_store or MessageStore()
+        # Message pages, unread count and selection of the logged in account (headless state)
+        self.messages = MessageListModel(self.message_store, client.max_msg)
+        self.messages_fetching = False  # Whether a REQUEST_MESSAGES request is queued or in flight
+
+        self.message_wrap_length = 400  # Width available to message labels (updated on resize)
+        self.resize_after_id = None  # Pending rewrap, run once resizing settles
+        self.message_view = None  # Row pool showing the current message page
+
+        self.connected = False  # Whether requests can be sent
+        self.pending_actions = []  # Network actions requested before the connection was ready
+        self.updates = None  # UpdateQueue passing client events to the Tkinter thread
+
+        # Start on the login screen right away; the client connects in the background
         self.root.title("Login")
+        self.set_connection_status(CONNECTING)
         self.create_login_screen()
 
+        # Connect (if needed) and start listening for messages
+        self.subscribe_to_events()
+        self.client.start()
+
     ### LOGIN + ACCOUNT CREATION WORKFLOW ###
     def create_login_screen(self):
         """
@@ -75,8 +115,7 @@ class ChatUI:
             return
 
         # Run lookup in a background thread
-        threading.Thread(target=self.lookup_username_async,
-                         args=(username,), daemon=True).start()
+        self.run_when_connected(self.lookup_username_async, username)
 
     def lookup_username_async(self, username):
         """
@@ -84,6 +123,10 @@ class ChatUI:
 
         :param username: The username to look up
         """
+        if self.client.cached_prefix(username) is not None:
+            # Known account: skip the LOOKUP_USER round trip and go straight to login
+            self.updates.post(LookupResult(True))
+            return
         self.client.send_lookup_account(username)
 
     def handle_lookup_result(self, lookup_result):
@@ -146,8 +189,8 @@ class ChatUI:
             return
 
         # Run login or account creation in a background thread
-        threading.Thread(target=self.handle_credentials, args=(
-            username, password, login), daemon=True).start()
+        self.run_when_connected(
+            self.handle_credentials, username, password, login)
 
     def handle_credentials(self, username, password, login):
         """
@@ -159,11 +202,11 @@ class ChatUI:
         """
         if login:
             # Log in to the existing account
-            print("[DEBUG] Logging in")
+            logger.debug("Logging in")
             self.client.send_login(username, password)
         else:
             # Create a new account
-            print("[DEBUG] Creating account")
+            logger.debug("Creating account")
             self.client.send_create_account(username, password)
 
     def handle_login_result(self, success, unread_count):
@@ -174,10 +217,10 @@ class ChatUI:
         :param unread_count: The number of unread messages
         """
         if success:
-            self.unread_count = unread_count
+            self.messages.set_unread(unread_count)
             messagebox.showinfo("Login Successful",
                                 f"You have {unread_count} unread messages.")
-            print("[DEBUG] Calling create_chat")
+            logger.debug("Calling create_chat")
             self.create_chat_screen()
         else:
             messagebox.showerror(
@@ -192,7 +235,7 @@ class ChatUI:
         if success:
             messagebox.showinfo("Account Created",
                                 "Account successfully created! Logging in...")
-            print("[DEBUG] Calling create_chat")
+            logger.debug("Calling create_chat")
             self.create_chat_screen()
         else:
             messagebox.showerror(
@@ -203,7 +246,9 @@ class ChatUI:
         """
         Create the main chat screen.
         """
-        print("[DEBUG] In create_chat")
+        logger.debug("In create_chat")
+        self.messages.start(MessageStore.account_key(
+            self.client.host, self.client.port, self.client.username))
         self.clear_window()
         self.root.title("Chat")
         self.root.geometry("900x500")  # Larger window
@@ -240,6 +285,7 @@ class ChatUI:
             self.sidebar, height=self.client.max_users)
         self.user_listbox.pack(fill=tk.BOTH, expand=True)
         self.user_listbox.bind("<Double-1>", self.fill_recipient)
+        self.shown_users = None
 
         # Create a frame to hold the input and button side by side
         search_frame = tk.Frame(self.sidebar)
@@ -248,6 +294,9 @@ class ChatUI:
         # Search input field
         self.user_search = tk.Entry(search_frame)
         self.user_search.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        # Search as the user types, once they pause
+        self.user_search.bind("<KeyRelease>", self.on_search_typed)
+        self.user_search.bind("<Return>", lambda event: self.load_user_list())
 
         # Search button
         tk.Button(search_frame, text="Search",
@@ -272,6 +321,11 @@ class ChatUI:
             self.chat_frame, height=self.client.max_msg, selectmode=tk.MULTIPLE)
         self.chat_display.pack(expand=True, fill=tk.BOTH, padx=10, pady=10)
 
+        # Fixed pool of message rows, rebound to each page instead of rebuilt
+        self.message_view = MessageView(self.chat_display, self.client.max_msg, self.message_wrap_length,
+                                        on_select=self.select_message,
+                                        on_open=self.open_new_message_window)
+
         # Ensure chat_display gets focus so buttons are immediately clickable
         self.chat_display.focus_set()
 
@@ -293,7 +347,7 @@ class ChatUI:
         self.next_msg_button = tk.Button(self.pagination_frame, text="Newer Messages",
                                          command=lambda: self.change_msg_page(
                                              1),
-                                         state=tk.NORMAL if len(self.all_messages) > self.unread_count else tk.DISABLED)
+                                         state=tk.DISABLED)
         self.next_msg_button.pack(side=tk.LEFT, padx=5)
 
         # "Delete Selected" button (RIGHT side)
@@ -309,62 +363,187 @@ class ChatUI:
         self.root.bind("<Configure>", self.on_resize)  # Bind resize event
 
         self.load_user_list()
+        self.update_messages([])  # Show the stored history right away
         self.root.after(0, self.load_messages)  # Load messages asynchronously
 
     def on_resize(self, event=None):
         """
-        Adjust message width based on window size.
+        Adjust message width based on window size, once resizing settles.
         """
-        if hasattr(self, "chat_display"):
-            # Adjust based on padding/margins
-            new_width = self.chat_display.winfo_width() - 60
-            self.message_wrap_length = max(
-                new_width, 200)  # Ensure a minimum width
-            print(
-                f"[DEBUG] Resizing message wrap length to {self.message_wrap_length}")
-
-            # Throttle frequent updates using `after()`
-            if hasattr(self, "resize_after_id"):
-                self.root.after_cancel(self.resize_after_id)
-
-            self.resize_after_id = self.root.after(
-                0, self.update_message_widths)
+        if event is not None and event.widget is not self.root:
+            return  # Child widgets report their own (re)configuration too
+        # Debounce: while the window is being dragged, only the last event rewraps
+        if self.resize_after_id is not None:
+            self.root.after_cancel(self.resize_after_id)
+        self.resize_after_id = self.root.after(
+            RESIZE_SETTLE_MS, self.update_message_widths)
 
     def update_message_widths(self):
         """
-        Update the wrap length of existing message labels without reloading messages.
+        Update the wrap length of the shown message labels without reloading messages.
+        Labels are only rewrapped when the width moved to another bucket.
         """
-        for frame in self.chat_display.winfo_children():
-            for widget in frame.winfo_children():
-                if isinstance(widget, tk.Label):
-                    widget.config(wraplength=self.message_wrap_length)
+        self.resize_after_id = None
+        if self.message_view is None or not self.chat_display.winfo_exists():
+            return  # Not on the chat screen
+        # Adjust based on padding/margins
+        self.message_wrap_length = self.chat_display.winfo_width() - 60
+        rewrapped = self.message_view.set_wraplength(self.message_wrap_length)
+        logger.debug("Message width %d: rewrapped %d rows",
+                     self.message_wrap_length, rewrapped)
 
     ### LIST ACCOUNTS WORKFLOW ###
+    def on_search_typed(self, event=None):
+        """
+        Search the user list once the user stops typing for SEARCH_DEBOUNCE_MS.
+        """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(
+            SEARCH_DEBOUNCE_MS, self.search_users)
+
+    def search_users(self):
+        """
+        Run the debounced search if the search text changed.
+        """
+        self.search_after_id = None
+        if self.user_search.get().strip() != self.users.search_text:
+            self.load_user_list()
+
     def load_user_list(self, reset_pages=True):
         """
         Start a thread to fetch and display users.
 
         :param reset_pages: Whether to reset the current page to 0
         """
+        if self.search_after_id is not None:
+            # Searching now: the pending debounced search is not needed
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
         if reset_pages:
-            self.current_user_page = 0  # Reset to first page when loading users
-        threading.Thread(target=self.fetch_users, daemon=True).start()
+            self.users.page = 0  # Reset to first page when loading users
+
+        # A new search text starts over (and makes results of the previous one stale);
+        # otherwise continue after the last user ID
+        search_text = self.user_search.get().strip()
+        self.users.set_search(search_text)
+        self.run_when_connected(
+            self.fetch_users, search_text, self.users.last_id(), self.users.query)
 
-    def fetch_users(self):
+    def fetch_users(self, search_text, after_id, query):
         """
         Fetch user list in a background thread.
+
+        :param search_text: Filter text
+        :param after_id: ID of the last user already listed
+        :param query: User list query number the page is for
+        """
+        # A newer search supersedes the request in flight: drop its result when it arrives.
+        # A prefetch is left alone, as its response still fills the account directory.
+        previous, self.users_future = self.users_future, None
+        if previous is not None and previous[0] != query:
+            prefetch = self.users_prefetch
+            if (prefetch is None or previous[1] is not prefetch[2]) and previous[1].cancel():
+                logger.debug("Cancelled stale user list request")
+
+        # Serve the page from the account directory when it has it
+        cached, offset_id = self.directory.lookup(
+            search_text, after_id, self.client.max_users)
+        if offset_id is None:
+            logger.debug("Users for search text %r served from cache", search_text)
+            self.updates.post(UserPage(query, cached))
+            return
+
+        prefetch = self.users_prefetch
+        if prefetch is not None and prefetch[:2] == (search_text, offset_id) and not prefetch[2].done():
+            logger.debug("Waiting for the prefetched users")
+            future = prefetch[2]  # The page is already on its way
+        else:
+            logger.debug("Fetching users with search text: %r from ID %d",
+                         search_text, offset_id)
+            future = self.client.send_list_accounts(search_text, offset_id)
+        if future:
+            self.users_future = (query, future)
+            future.add_done_callback(lambda future: self.handle_directory_page(
+                search_text, offset_id, cached, query, future))
+
+    def handle_directory_page(self, search_text, offset_id, cached, query, future):
         """
-        search_text = self.user_search.get().strip()
+        Add a LIST_ACCOUNTS response to the account directory and show the page.
+
+        :param search_text: Filter text of the request
+        :param offset_id: Offset account ID of the request
+        :param cached: Accounts of the page that were already cached (all before offset_id)
+        :param query: User list query number the page is for
+        :param future: Future of the request
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        accounts = future.result()
+        if accounts is False or accounts is None:
+            return
+        self.directory.add(search_text, offset_id,
+                           accounts, self.client.max_users)
+        self.updates.post(UserPage(
+            query, (cached + accounts)[:self.client.max_users]))
+
+    def prefetch_users(self):
+        """
+        When the current page is within one page of the end of the loaded users,
+        fetch the next page into the account directory so "Next Page" needs no round trip.
+        """
+        if not self.users.needs_prefetch():
+            return
+        self.run_when_connected(self.prefetch_user_page,
+                                self.users.search_text, self.users.last_id())
 
-        if search_text != self.prev_search:
-            self.prev_search = search_text
-            self.client.last_offset_account_id = 0  # Reset offset when search text changes
-            self.all_users = []  # Clear existing users
-        else:  # If search text is the same, increment offset to last user ID
-            self.client.last_offset_account_id = self.all_users[-1][0] if self.all_users else 0
+    def prefetch_user_page(self, search_text, after_id):
+        """
+        Fetch the page of users after after_id into the account directory (in a background thread).
 
-        print(f"[DEBUG] Fetching users with search text: {search_text}")
-        self.client.send_list_accounts(search_text)
+        :param search_text: Filter text
+        :param after_id: ID of the last user loaded
+        """
+        _, offset_id = self.directory.lookup(
+            search_text, after_id, self.client.max_users)
+        if offset_id is None:
+            return  # Cached already, or there are no more users
+        prefetch = self.users_prefetch
+        if prefetch is not None and prefetch[:2] == (search_text, offset_id) and not prefetch[2].done():
+            return  # Already being prefetched
+        logger.debug("Prefetching users with search text: %r from ID %d",
+                     search_text, offset_id)
+        future = self.client.send_list_accounts(search_text, offset_id)
+        if future:
+            self.users_prefetch = (search_text, offset_id, future)
+            future.add_done_callback(lambda future: self.handle_prefetched_users(
+                search_text, offset_id, future))
+
+    def handle_prefetched_users(self, search_text, offset_id, future):
+        """
+        Add a prefetched page of users to the account directory.
+
+        :param search_text: Filter text of the request
+        :param offset_id: Offset account ID of the request
+        :param future: Future of the request
+        """
+        if future.cancelled() or future.exception() is not None:
+            return
+        accounts = future.result()
+        if accounts is not False and accounts is not None:
+            self.directory.add(search_text, offset_id,
+                               accounts, self.client.max_users)
+
+    def handle_user_page(self, page):
+        """
+        Show a page of the user list unless a newer search made it stale.
+
+        :param page: UserPage to show
+        """
+        if page.query != self.users.query:
+            logger.debug("Dropping stale user list page")
+            return
+        self.handle_user_results(page.accounts)
 
     def handle_user_results(self, users):
         """
@@ -373,35 +552,36 @@ class ChatUI:
         :param users: The list of users to display
         """
         if len(users) == 0:
+            if not self.users.users:
+                self.update_user_list()  # Nothing matches the search text
+                return
             # show message that no users found
             messagebox.showinfo("No Users Found", "No more users to load.")
             return
-        # Else increment current page if needed
-        if len(self.all_users) > 0:
-            self.current_user_page += 1
-        # Then update the user list UI
-        self.update_user_list(users)
+        # Add the new users (moving to their page), then update the user list UI
+        self.users.add_page(users)
+        self.update_user_list()
 
-    def update_user_list(self, users):
+    def update_user_list(self):
         """
         Update the user list UI.
-
-        :param users: The list of users to display
         """
-        self.all_users += users  # Append to existing list
         current_user = self.client.username
 
-        print("[DEBUG] Current user:", current_user)
+        logger.debug("Current user: %s", current_user)
+
+        visible_users = self.users.visible()
+        shown = (current_user, self.users.page, visible_users)
+        if shown == self.shown_users:
+            return  # Same rows as before: keep the Listbox as it is
+        self.shown_users = shown
 
         self.user_listbox.delete(0, tk.END)
 
-        if not self.all_users:
+        if not self.users.users:
             self.user_listbox.insert(tk.END, "No users found.")
             return
 
-        visible_users = self.all_users[self.current_user_page * self.client.max_users:(
-            self.current_user_page + 1) * self.client.max_users]
-
         for i, (_, username) in enumerate(visible_users):
             self.user_listbox.insert(
                 tk.END, username + (" (you)" if current_user == username else ""))
@@ -411,33 +591,28 @@ class ChatUI:
 
         # Update pagination buttons
         self.prev_user_button.config(
-            state=tk.NORMAL if self.current_user_page > 0 else tk.DISABLED)
+            state=tk.NORMAL if self.users.page > 0 else tk.DISABLED)
 
         # Next button is always enabled to allow users to load more accounts
 
         # Force focus back to user list
         self.user_listbox.focus_set()
 
+        self.prefetch_users()
+
     def change_user_page(self, direction):
         """
         Paginate through user list.
 
         :param direction: The direction to move in the user list
         """
-        new_page = self.current_user_page + direction
-        if new_page < 0:
-            return
-
-        # Calculate total pages
-        total_pages = math.ceil(len(self.all_users) / self.client.max_users)
-        if new_page >= total_pages:
+        action = self.users.change_page(direction)
+        if action == FETCH:
             # request more users
             self.load_user_list(reset_pages=False)
-            return
-
-        self.current_user_page = new_page  # Update current page
-        print(f"Changing user page to {self.current_user_page}")
-        self.update_user_list([])
+        elif action == SHOW:
+            logger.debug("Changing user page to %d", self.users.page)
+            self.update_user_list()
 
     ### MESSAGES WORKFLOW ###
     def load_messages(self, reset_pages=True):
@@ -447,107 +622,117 @@ class ChatUI:
         :param reset_pages: Whether to reset the current page to 0
         """
         if reset_pages:
-            self.current_msg_page = 0  # Reset to first page when loading messages
-        threading.Thread(target=self.fetch_messages, daemon=True).start()
+            self.messages.page = 0  # Reset to first page when loading messages
+        self.messages_fetching = True
+        self.run_when_connected(self.fetch_messages)
 
     def fetch_messages(self):
         """
         Fetch messages.
         """
-        print("[DEBUG] Fetching messages")
-        self.client.send_request_messages()
+        logger.debug("Fetching messages")
+        future = self.client.send_request_messages()
+        if future:
+            future.add_done_callback(self.handle_messages_fetched)
+        else:
+            self.messages_fetching = False
 
-    def update_messages(self, messages):
+    def handle_messages_fetched(self, future):
         """
-        Update the chat display with messages.
+        Note that a REQUEST_MESSAGES request finished (called on a network thread).
+        The messages themselves arrive through the MessagesReceived event.
 
-        :param messages: The list of messages to display
+        :param future: Future of the request
         """
-        # Make sure only messages with new IDs are added
-        new_messages = [msg for msg in messages if msg[0]
-                        not in self.all_messages]
-        self.all_messages += new_messages  # Append to existing messages
+        if not future.cancelled() and future.exception() is None:
+            messages = future.result()
+            if messages is not False and messages is not None:
+                self.messages.batch_received(len(messages))
+        self.messages_fetching = False
 
-        visible_messages = self.all_messages[self.current_msg_page * self.client.max_msg:(
-            self.current_msg_page + 1) * self.client.max_msg]
-
-        # Clear only messages, not buttons or pagination controls
-        for widget in self.chat_display.winfo_children():
-            widget.destroy()
-
-        self.message_selection = {}  # Dictionary to store selected messages
-
-        # Add message checkboxes for selection
-        for idx, (msg_id, sender, message) in enumerate(visible_messages):
-            frame = tk.Frame(self.chat_display)
-            frame.pack(fill=tk.X, padx=5, pady=2)
+    def prefetch_messages(self):
+        """
+        When the current page is within one page of the end of the stored messages,
+        fetch the next batch of unread messages so "Newer Messages" needs no round trip.
+        """
+        if self.messages_fetching or not self.messages.needs_prefetch():
+            return
+        logger.debug("Prefetching messages")
+        self.load_messages(reset_pages=False)
 
-            var = tk.BooleanVar()
-            self.message_selection[msg_id] = var
+    def update_messages(self, messages):
+        """
+        Store new messages and schedule a redraw of the chat display.
+        The redraw runs once at the end of the current UI tick, however many updates it had.
 
-            # Bind a trace to update delete button state when selection changes
-            var.trace_add(
-                "write", lambda *args: self.update_delete_button_state())
+        :param messages: The list of messages to display
+        """
+        if self.messages.account is None:
+            return  # Not logged in
 
-            cb = tk.Checkbutton(frame, variable=var)
-            cb.pack(side=tk.LEFT)
+        # Store the new messages (the store skips IDs it already has)
+        self.messages.add_messages(messages)
+        self.updates.invalidate()
 
-            lbl = tk.Label(frame, text=f"{sender}: {message}", anchor="w",
-                           justify="left", wraplength=self.message_wrap_length)
-            lbl.pack(side=tk.LEFT, fill=tk.X, expand=True)
+    def render_messages(self):
+        """
+        Redraw the chat display from the local store.
+        """
+        if self.messages.account is None or self.message_view is None:
+            return  # Not on the chat screen
 
-            # Bind double click to fill recipient
-            lbl.bind("<Double-1>", lambda event,
-                     sender=sender: self.open_new_message_window(sender))
+        # Rebind the pooled rows to the current page (only rows whose message changed are reconfigured)
+        self.message_view.show(self.messages.visible(), self.messages.selected)
 
         # Update delete button state
         self.update_delete_button_state()
 
         # Update pagination buttons
         self.prev_msg_button.config(
-            state=tk.NORMAL if self.current_msg_page > 0 else tk.DISABLED)
-
-        # Calculate total pages
-        total_pages = math.ceil(len(self.all_messages) / self.client.max_msg)
-        self.next_msg_button.config(state=tk.NORMAL if self.current_msg_page < total_pages -
-                                    1 or len(self.all_messages) < self.unread_count else tk.DISABLED)
+            state=tk.NORMAL if self.messages.has_older() else tk.DISABLED)
+        self.next_msg_button.config(
+            state=tk.NORMAL if self.messages.has_newer() else tk.DISABLED)
 
         # Force focus back to chat display
         self.chat_display.focus_set()
 
+        self.prefetch_messages()
+
     def update_delete_button_state(self):
         """
         Enable or disable the delete button based on message selection.
         """
-        selected = any(var.get() for var in self.message_selection.values())
+        selected = bool(self.messages.selected)
         self.delete_msg_button.config(
             state=tk.NORMAL if selected else tk.DISABLED)
 
+    def select_message(self, message_id, selected):
+        """
+        Record a message being checked or unchecked in the chat display.
+
+        :param message_id: ID of the message
+        :param selected: Whether it is selected now
+        """
+        self.messages.select(message_id, selected)
+        self.update_delete_button_state()
+
     def change_msg_page(self, direction):
         """
         Paginate through messages.
 
         :param direction: The direction to move in the message list
         """
-        print("[DEBUG] Changing message page:", direction)
-        new_page = self.current_msg_page + direction
-        if new_page < 0:
+        logger.debug("Changing message page: %s", direction)
+        action = self.messages.change_page(direction)
+        if action is None:
             return
+        logger.debug("Changing message page to %d", self.messages.page)
 
-        num_messages = max(len(self.all_messages), self.unread_count)
-        # Calculate total pages
-        total_pages = math.ceil(num_messages / self.client.max_msg)
-        if new_page >= total_pages:
-            return
-
-        self.current_msg_page = new_page
-        print(f"Changing message page to {self.current_msg_page}")
-
-        if (direction == 1 and self.unread_count > len(self.all_messages)):
-            print("[DEBUG] Loading more messages")
-            # Fetch more messages if we reach the end and there are unread messages
+        if action == FETCH and not self.messages_fetching:
+            logger.debug("Loading more messages")
+            # Fetch more messages if we reach the end and there are unread messages (and no prefetch is on its way)
             self.load_messages(reset_pages=False)
-        else:  # Otherwise, just update the current list
+        else:  # Otherwise, just show the page from the local store
             self.update_messages([])
 
     ### SEND MESSAGE WORKFLOW ###
@@ -555,7 +740,7 @@ class ChatUI:
         """
         Fills the recipient entry when a user is clicked in the list.
         """
-        print("[DEBUG] Filling recipient")
+        logger.debug("Filling recipient")
         selection = self.user_listbox.curselection()
         current_user = self.client.username
         if selection:
@@ -624,14 +809,13 @@ class ChatUI:
             messagebox.showerror("Error", "Cannot send message to self.")
             return
 
-        valid_users = [user for _, user in self.all_users]
+        valid_users = [user for _, user in self.users.users]
         if recipient not in valid_users:
             messagebox.showerror("Error", "Recipient not found.")
             return
 
-        # Start thread to send message
-        threading.Thread(target=self.process_send_message, args=(
-            recipient, message), daemon=True).start()
+        # Send on the client's action thread (queued in the outbox while disconnected)
+        self.client.submit(self.process_send_message, recipient, message)
 
     def process_send_message(self, recipient, message):
         """
@@ -659,8 +843,7 @@ class ChatUI:
         """
         Deletes selected messages.
         """
-        selected_msg_ids = [msg_id for msg_id,
-                            var in self.message_selection.items() if var.get()]
+        selected_msg_ids = self.messages.selected_ids()
 
         if not selected_msg_ids:
             messagebox.showwarning(
@@ -668,8 +851,7 @@ class ChatUI:
             return
 
         # Start thread to delete messages
-        threading.Thread(target=self.process_delete_messages,
-                         args=(selected_msg_ids,), daemon=True).start()
+        self.run_when_connected(self.process_delete_messages, selected_msg_ids)
 
     def process_delete_messages(self, selected_msg_ids):
         """
@@ -688,18 +870,10 @@ class ChatUI:
         if success:
             messagebox.showinfo("Success", "Messages deleted successfully")
 
-            # Remove deleted messages from current list
-            deleted_ids = [msg_id for msg_id,
-                           var in self.message_selection.items() if var.get()]
-            self.all_messages = [
-                msg for msg in self.all_messages if msg[0] not in deleted_ids]
-
-            # Update unread count if necessary
-            if len(self.all_messages) < self.unread_count:
-                self.unread_count = len(self.all_messages)
+            # Remove deleted messages from the store and go back to the first page
+            self.messages.delete(self.messages.selected_ids())
 
             # Update UI with remaining messages
-            self.current_msg_page = 0  # Reset to first page
             self.update_messages([])
 
             # Disable delete button
@@ -716,15 +890,17 @@ class ChatUI:
             "Confirm", "Are you sure you want to delete your account?")
         if confirm:
             # Start thread to delete account
-            threading.Thread(target=self.delete_account, daemon=True).start()
+            self.run_when_connected(self.delete_account)
 
     def delete_account(self):
         """
         Delete the account in a background thread.
         """
-        print("[DEBUG] Deleting account")
+        logger.debug("Deleting account")
         self.client.send_delete_account()
-        self.root.after(0, self.handle_delete_account_result(True))
+        # The server may close the connection without answering: show the result anyway,
+        # on the Tkinter thread like every other result
+        self.updates.post(AccountDeleted())
 
     def handle_delete_account_result(self, success):
         """
@@ -733,59 +909,134 @@ class ChatUI:
         :param success: Whether the account was deleted successfully
         """
         if success:
+            if self.messages.account is None:
+                return  # Already handled
+            # Close before the dialog: its nested event loop keeps running UI updates,
+            # and the closed connection must not be reported as lost
+            self.client.close()
+            self.message_store.delete_account(self.messages.account)
+            self.messages.account = None
             messagebox.showinfo("Account Deleted",
                                 "Account deleted successfully")
             self.root.after(0, self.disconnect)
-            self.client.close()
         else:
             messagebox.showerror("Error", "Failed to delete account")
 
     ### HELPER METHODS ###
-    def display_message(self, message):
-        """
-        Handles messages received from the server.
-
-        :param message: The message to display
-        """
-        print(f"[DEBUG] Received message: {message}")
-        if message.startswith("LOOKUP_USER"):  # OP 1
-            exists = int(message.split(":")[1])
-            self.root.after(0, lambda: self.handle_lookup_result(exists))
-        elif message.startswith("LOGIN"):  # OP 2
-            success, unread_count = message.split(":")[1:]
-            success = int(success)
-            unread_count = int(unread_count)
-            self.root.after(0, lambda: self.handle_login_result(
-                success, unread_count))
-        elif message.startswith("CREATE_ACCOUNT"):  # OP 3
-            success = int(message.split(":")[1])
-            self.root.after(
-                0, lambda: self.handle_account_creation_result(success))
-        elif message.startswith("LIST_ACCOUNTS"):  # OP 4
-            users = json.loads(message.split(":", 1)[1])
-            self.root.after(0, lambda: self.handle_user_results(users))
-        elif message.startswith("REQUEST_MESSAGES"):  # OP 5
-            messages = json.loads(message.split(":", 1)[1])
-            self.root.after(0, lambda: self.update_messages(messages))
-        elif message.startswith("SEND_MESSAGE"):  # OP 6
-            success = int(message.split(":")[1])
-            self.root.after(
-                0, lambda: self.handle_send_message_result(success))
-        elif message.startswith("DELETE_MESSAGES"):  # OP 7
-            success = int(message.split(":")[1])
-            self.root.after(
-                0, lambda: self.handle_delete_messages_result(success))
-        elif message.startswith("DELETE_ACCOUNT"):  # OP 8
-            success = int(message.split(":")[1])
-            self.root.after(
-                0, lambda: self.handle_delete_account_result(success))
-        else:
-            print(f"[DEBUG] Unknown message: {message}")
+    def subscribe_to_events(self):
+        """
+        Subscribe to the events the client publishes for server responses.
+        Events arrive on a network thread, so they go through an UpdateQueue that handles them
+        on the Tkinter thread once per tick, merging message batches and account pages.
+        """
+        handlers = {
+            LookupResult: lambda event: self.handle_lookup_result(event.exists),  # OP 1
+            LoginResult: lambda event: self.handle_login_result(
+                event.success, event.unread_count),  # OP 2
+            AccountCreated: lambda event: self.handle_account_creation_result(
+                event.success),  # OP 3
+            UserPage: self.handle_user_page,  # OP 4, through the account directory
+            MessageSent: lambda event: self.handle_send_message_result(
+                event.success),  # OP 5
+            MessagesReceived: lambda event: self.update_messages(
+                event.messages),  # OP 6
+            MessagesDeleted: lambda event: self.handle_delete_messages_result(
+                event.success),  # OP 7
+            AccountDeleted: lambda event: self.handle_delete_account_result(
+                True),  # OP 8
+            Connected: lambda event: self.handle_connected(),
+            ConnectionLost: lambda event: self.handle_connection_lost(),
+            Reconnected: lambda event: self.handle_reconnected(event.resumed),
+        }
+        self.updates = UpdateQueue(
+            self.root.after, handlers, render=self.render_messages,
+            mergers={
+                MessagesReceived: lambda pending, event: MessagesReceived(pending.messages + event.messages),
+            },
+            collapse=(Connected, ConnectionLost, AccountDeleted))
+        for event_type in handlers:
+            if event_type is not UserPage:  # Posted by fetch_users
+                self.client.subscribe(event_type, self.updates.post)
+
+    ### CONNECTION STATE ###
+    def run_when_connected(self, action, *args):
+        """
+        Run a network action on the client's action thread, or queue it until the connection is ready.
+        Only called from the Tkinter thread.
+
+        :param action: Function sending the request(s)
+        :param args: Arguments for the function
+        """
+        if not self.connected:
+            logger.debug("Not connected yet, queueing %s", action.__name__)
+            self.pending_actions.append((action, args))
+            return
+        self.client.submit(action, *args)
+
+    def run_pending_actions(self):
+        """
+        Run the actions queued while the connection was not ready, in order.
+        """
+        actions, self.pending_actions = self.pending_actions, []
+        for action, args in actions:
+            self.run_when_connected(action, *args)
+
+    def set_connection_status(self, status=None):
+        """
+        Show the connection status in the window title.
+
+        :param status: CONNECTING, RECONNECTING, DISCONNECTED or None once connected
+        """
+        title = self.root.title()
+        for suffix in (CONNECTING, RECONNECTING, DISCONNECTED):
+            if title.endswith(suffix):
+                title = title[:-len(suffix)]
+        self.root.title(title + (status or ""))
+
+    def handle_connected(self):
+        """
+        Handle UI update once the initial connection is ready.
+        """
+        self.connected = True
+        self.set_connection_status()
+        self.run_pending_actions()
+
+    def handle_connection_lost(self):
+        """
+        Show that the connection dropped. The screen is kept while the client reconnects,
+        and network actions are queued until it is back.
+        """
+        self.connected = False
+        self.set_connection_status(
+            RECONNECTING if self.client.supervisor is not None else DISCONNECTED)
+
+    def handle_reconnected(self, resumed):
+        """
+        Handle UI update after the connection was re-established.
+
+        :param resumed: Whether the session was logged in again
+        """
+        self.connected = True
+        self.set_connection_status()
+        if self.messages.account is not None and not resumed:
+            messagebox.showerror(
+                "Session Expired", "Could not log in again after reconnecting. Please log in.")
+            self.pending_actions = []  # They belonged to the expired session
+            self.messages.account = None
+            self.root.title("Login")
+            self.create_login_screen()
+            return
+        if self.messages.account is not None:
+            # Fetch whatever arrived while the connection was down
+            self.load_messages(reset_pages=False)
+        self.run_pending_actions()
 
     def disconnect(self):
         """
         Disconnect from the server.
         """
+        self.updates.stop()
+        logger.info("UI updates: %s", self.updates.snapshot())
         self.client.close()
         self.root.destroy()
 
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger("chat.ui.updates")
+
+
+class UpdateQueue:
+    """
+    Thread-safe queue of UI updates, drained on a fixed tick.
+
+    Network threads post events; the first post after a drain schedules the next tick on the
+    UI thread, which runs the handlers of every pending event and then renders once. A burst
+    of events therefore costs one tick instead of one scheduled callback and one render each:
+    - an event is merged into the pending event before it if `mergers` has a function for
+      their type (e.g. consecutive message batches become one batch),
+    - an event is dropped if it repeats the pending event before it and its type is in
+      `collapse` (e.g. status changes that change nothing).
+    Only consecutive events are merged or dropped, so handlers still see events in order.
+    """
+
+    def __init__(self, schedule, handlers, render=None, interval=16, mergers=None, collapse=()):
+        """
+        :param schedule: Function scheduling a call on the UI thread: schedule(delay_ms, function)
+        :param handlers: Dictionary of event type -> function handling an event of that type
+        :param render: Function called once after a drain if any handler called invalidate()
+        :param interval: Milliseconds between the first post and the drain (one frame at 60 Hz)
+        :param mergers: Dictionary of event type -> function(pending, new) returning the merged event
+        :param collapse: Event types for which repeated consecutive events are dropped
+        """
+        self.schedule = schedule
+        self.handlers = handlers
+        self.render = render
+        self.interval = interval
+        self.mergers = mergers or {}
+        self.collapse = tuple(collapse)
+        self.lock = threading.Lock()
+        self.pending = []  # Events waiting for the next tick, in order
+        self.scheduled = False  # Whether a drain is scheduled
+        self.dirty = False  # Whether a render is needed after the drain
+        self.stopped = False
+
+        # Counters
+        self.posted = 0  # Events posted
+        self.merged = 0  # Events merged into the event before them
+        self.dropped = 0  # Events dropped (repeated, or posted after stop())
+        self.ticks = 0  # Drains that ran
+        self.renders = 0  # Renders that ran
+
+    def post(self, event):
+        """
+        Queue an event for the next tick (from any thread).
+
+        :param event: Event to handle on the UI thread
+        """
+        with self.lock:
+            self.posted += 1
+            if self.stopped:
+                self.dropped += 1
+                return
+            last = self.pending[-1] if self.pending else None
+            if type(last) is type(event):
+                merger = self.mergers.get(type(event))
+                if merger is not None:
+                    self.pending[-1] = merger(last, event)
+                    self.merged += 1
+                    return
+                if isinstance(event, self.collapse) and last == event:
+                    self.dropped += 1
+                    return
+            self.pending.append(event)
+            self.schedule_drain()
+
+    def invalidate(self):
+        """
+        Request a render at the end of the current (or next) tick.
+        """
+        with self.lock:
+            if self.stopped:
+                return
+            self.dirty = True
+            self.schedule_drain()
+
+    def schedule_drain(self):
+        """
+        Schedule a drain unless one is already scheduled. Called with the lock held.
+        """
+        if not self.scheduled:
+            self.scheduled = True
+            self.schedule(self.interval, self.drain)
+
+    def drain(self):
+        """
+        Handle every pending event, then render once if needed. Runs on the UI thread.
+
+        :return: Number of events handled
+        """
+        with self.lock:
+            events, self.pending = self.pending, []
+            if self.stopped:
+                self.scheduled = False
+                return 0
+        self.ticks += 1
+        started = time.perf_counter()
+        try:
+            for event in events:
+                handler = self.handlers.get(type(event))
+                if handler is not None:
+                    handler(event)
+        finally:
+            with self.lock:
+                # Still marked as scheduled while the handlers ran, so their posts and
+                # invalidate() calls did not schedule another tick
+                dirty, self.dirty = self.dirty, False
+                self.scheduled = False
+                if self.pending:
+                    self.schedule_drain()  # Events posted by other threads during the drain
+        if dirty and self.render is not None:
+            self.render()
+            self.renders += 1
+        logger.debug("Handled %d updates in %.2f ms%s", len(events),
+                     (time.perf_counter() - started) * 1000, " and rendered" if dirty else "")
+        return len(events)
+
+    def stop(self):
+        """
+        Drop pending and future events (e.g. when the window is closed).
+        """
+        with self.lock:
+            self.stopped = True
+            self.dropped += len(self.pending)
+            self.pending = []
+
+    def snapshot(self):
+        """
+        :return: Dictionary of the counters
+        """
+        with self.lock:
+            return {
+                "posted": self.posted,
+                "merged": self.merged,
+                "dropped": self.dropped,
+                "ticks": self.ticks,
+                "renders": self.renders,
+                "pending": len(self.pending),
+            }
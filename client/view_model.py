@@ -0,0 +1,258 @@
+import math
+
+# Headless state of the chat screen. ChatUI keeps only widget code and renders what these
+# models compute, so pagination, deduplication and selection can be tested and benchmarked
+# without a display (see tests/benchmark_view_model.py).
+
+# Results of change_page
+SHOW = "show"  # The page is in memory: render it
+FETCH = "fetch"  # The page needs more data from the server
+
+
+class UserListModel:
+    """
+    The user list: accounts loaded for the current search text, split into pages.
+    """
+
+    def __init__(self, page_size):
+        """
+        :param page_size: Number of users on a page
+        """
+        self.page_size = page_size
+        self.search_text = ""  # Search text the loaded users match
+        self.query = 0  # Incremented when the search text changes; results of older queries are stale
+        self.users = []  # Loaded (account ID, username) tuples, by increasing ID
+        self.user_ids = set()  # IDs of the loaded users, to drop duplicates
+        self.page = 0  # Current page
+
+    def set_search(self, search_text):
+        """
+        Start over if the search text changed.
+
+        :param search_text: Search text entered by the user
+        :return: True if the search text changed
+        """
+        if search_text == self.search_text:
+            return False
+        self.search_text = search_text
+        self.query += 1
+        self.users = []
+        self.user_ids = set()
+        self.page = 0
+        return True
+
+    def last_id(self):
+        """
+        :return: ID of the last loaded user (0 if none), the offset of the next page
+        """
+        return self.users[-1][0] if self.users else 0
+
+    def add_page(self, accounts):
+        """
+        Add a page of users returned by the server and move to it.
+
+        :param accounts: List of (account ID, username) tuples
+        :return: Number of users that were new
+        """
+        first_new = len(self.users)
+        new = [account for account in accounts if account[0] not in self.user_ids]
+        self.users += new
+        self.user_ids.update(account[0] for account in new)
+        if new and first_new:
+            self.page = first_new // self.page_size  # Page of the first new user
+        return len(new)
+
+    def total_pages(self):
+        """
+        :return: Number of pages of loaded users
+        """
+        return math.ceil(len(self.users) / self.page_size)
+
+    def visible(self):
+        """
+        :return: Users on the current page
+        """
+        start = self.page * self.page_size
+        return self.users[start:start + self.page_size]
+
+    def change_page(self, direction):
+        """
+        Move to the previous or next page.
+
+        :param direction: -1 for the previous page, 1 for the next one
+        :return: SHOW if the page is loaded, FETCH if the next page must be fetched, None if there is no such page
+        """
+        new_page = self.page + direction
+        if new_page < 0:
+            return None
+        if new_page >= self.total_pages():
+            return FETCH
+        self.page = new_page
+        return SHOW
+
+    def needs_prefetch(self):
+        """
+        :return: Whether the current page is within one page of the last loaded user
+        """
+        return bool(self.users) and self.page >= self.total_pages() - 2
+
+
+class MessageListModel:
+    """
+    The message list of the logged in account: pages read from the local MessageStore,
+    the unread messages still waiting on the server, and the selected messages.
+    """
+
+    def __init__(self, store, page_size):
+        """
+        :param store: MessageStore keeping received messages
+        :param page_size: Number of messages on a page
+        """
+        self.store = store
+        self.page_size = page_size
+        self.account = None  # Store key of the logged in account (None when logged out)
+        self.page = 0  # Current page
+        self.stored_count = 0  # Stored messages of the account (kept here so paging does not count rows)
+        self.unread_count = 0  # Unread messages on the server at login
+        self.fetched_count = 0  # Messages returned by REQUEST_MESSAGES since logging in (not pushes)
+        self.unread_drained = False  # Whether the server returned its last unread messages
+        self.selected = set()  # Selected message IDs (always on the current page)
+
+    def set_unread(self, unread_count):
+        """
+        :param unread_count: Unread messages the server reported at login
+        """
+        self.unread_count = unread_count
+        self.unread_drained = False
+
+    def start(self, account):
+        """
+        Start showing the messages of an account.
+
+        :param account: Store key of the account
+        """
+        self.account = account
+        self.page = 0
+        self.stored_count = self.store.count(account)
+        self.fetched_count = 0
+        self.selected = set()
+
+    def add_messages(self, messages):
+        """
+        Store received messages, fetched or pushed (the store drops IDs it already has).
+
+        :param messages: List of (message ID, sender, message) tuples
+        :return: Number of messages that were new
+        """
+        added = self.store.add_messages(self.account, messages)
+        self.stored_count += added
+        return added
+
+    def batch_received(self, count):
+        """
+        Count a batch returned by REQUEST_MESSAGES against the unread messages.
+
+        The server pushes new messages as REQUEST_MESSAGES frames too, so a push arriving while
+        a fetch is pending is taken as its reply. A short batch may thus be a push and does not
+        mean the unread messages are drained; only an empty one does (a push is never empty).
+        A miscounted batch is corrected by that one extra fetch.
+
+        :param count: Number of messages in the batch
+        """
+        self.fetched_count += count
+        if count == 0:
+            self.unread_drained = True
+
+    def remaining_unread(self):
+        """
+        :return: Number of unread messages still waiting on the server
+        """
+        if self.unread_drained:
+            return 0
+        return max(self.unread_count - self.fetched_count, 0)
+
+    def stored(self):
+        """
+        :return: Number of stored messages
+        """
+        return self.stored_count
+
+    def visible(self):
+        """
+        Read the current page, and drop selected messages that are no longer on it.
+
+        :return: List of (message ID, sender, message) tuples
+        """
+        messages = self.store.page(
+            self.account, self.page * self.page_size, self.page_size)
+        self.selected &= {message_id for message_id, _, _ in messages}
+        return messages
+
+    def has_older(self):
+        """
+        :return: Whether there is a page before the current one
+        """
+        return self.page > 0
+
+    def has_newer(self):
+        """
+        :return: Whether there are stored messages after the current page, or unread ones on the server
+        """
+        total_pages = math.ceil(self.stored() / self.page_size)
+        return self.page < total_pages - 1 or self.remaining_unread() > 0
+
+    def change_page(self, direction):
+        """
+        Move to the previous or next page.
+
+        :param direction: -1 for older messages, 1 for newer ones
+        :return: FETCH if the new page needs unread messages from the server, SHOW if it is stored,
+            None if there is no such page
+        """
+        new_page = self.page + direction
+        if new_page < 0:
+            return None
+        stored = self.stored()
+        total_pages = math.ceil(
+            (stored + self.remaining_unread()) / self.page_size)
+        if new_page >= total_pages:
+            return None
+        self.page = new_page
+        if direction == 1 and (new_page + 1) * self.page_size > stored and self.remaining_unread() > 0:
+            return FETCH
+        return SHOW
+
+    def needs_prefetch(self):
+        """
+        :return: Whether unread messages wait on the server and the next page is not fully stored
+        """
+        if self.remaining_unread() == 0:
+            return False
+        return (self.page + 2) * self.page_size > self.stored()
+
+    def select(self, message_id, selected):
+        """
+        :param message_id: ID of a message on the current page
+        :param selected: Whether it is selected now
+        """
+        if selected:
+            self.selected.add(message_id)
+        else:
+            self.selected.discard(message_id)
+
+    def selected_ids(self):
+        """
+        :return: Selected message IDs, in ascending order
+        """
+        return sorted(self.selected)
+
+    def delete(self, message_ids):
+        """
+        Remove deleted messages from the store and go back to the first page.
+
+        :param message_ids: IDs of the deleted messages
+        """
+        self.store.delete(self.account, message_ids)
+        self.stored_count = self.store.count(self.account)
+        self.selected -= set(message_ids)
+        self.page = 0
@@ -0,0 +1,155 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.message_store import MessageStore
+from client.network.events import AccountsPage, MessagesReceived
+from client.view_model import UserListModel, MessageListModel, FETCH
+
+# Replays network event streams through the chat screen's view-models and reports the time
+# each update takes (model update plus the reads a render does), without a display.
+# Not collected by pytest; run it directly:
+#     python tests/benchmark_view_model.py [--messages 10000] [--accounts 10000]
+
+ACCOUNT = MessageStore.account_key("localhost", 12345, "alice")
+
+
+def record_messages(count, page_size, rng):
+    """
+    Build the events a session receiving `count` messages produces: REQUEST_MESSAGES batches
+    of `page_size` while paging forward, single pushed messages in between, and batches
+    delivered again after a reconnect.
+
+    :param count: Number of distinct messages
+    :param page_size: Messages per REQUEST_MESSAGES batch
+    :param rng: random.Random generating the stream
+    :return: List of ("event", MessagesReceived) and ("page", direction) steps
+    """
+    steps = []
+    messages = [(msg_id, f"user{rng.randrange(1000)}", f"message {msg_id}")
+                for msg_id in range(1, count + 1)]
+    i = 0
+    while i < len(messages):
+        if rng.random() < 0.3:  # Pushed while logged in
+            steps.append(("event", MessagesReceived(messages[i:i + 1])))
+            i += 1
+            continue
+        batch = messages[i:i + page_size]
+        steps.append(("event", MessagesReceived(batch)))
+        if rng.random() < 0.05:  # Delivered again after a reconnect
+            steps.append(("event", MessagesReceived(batch)))
+        i += len(batch)
+        steps.append(("page", rng.choice((1, 1, 1, -1))))
+    return steps
+
+
+def record_accounts(count, page_size, rng):
+    """
+    Build the LIST_ACCOUNTS pages listing `count` accounts, with an occasional page received
+    twice (e.g. a prefetched page and the request it raced with).
+
+    :param count: Number of accounts
+    :param page_size: Accounts per page
+    :param rng: random.Random generating the stream
+    :return: List of ("event", AccountsPage) and ("page", direction) steps
+    """
+    steps = []
+    accounts = [(account_id, f"user{account_id}") for account_id in range(1, count + 1)]
+    for start in range(0, count, page_size):
+        page = accounts[start:start + page_size]
+        steps.append(("event", AccountsPage(page)))
+        if rng.random() < 0.05:
+            steps.append(("event", AccountsPage(page)))
+        steps.append(("page", rng.choice((1, -1, 1))))
+    return steps
+
+
+def replay_messages(steps, page_size, unread_count):
+    """
+    Replay a message stream through a MessageListModel.
+
+    :return: List of seconds taken by each step
+    """
+    store = MessageStore()
+    model = MessageListModel(store, page_size)
+    model.set_unread(unread_count)
+    model.start(ACCOUNT)
+    timings = []
+    for kind, value in steps:
+        start = time.perf_counter()
+        if kind == "event":
+            model.add_messages(value.messages)
+        elif model.change_page(value) == FETCH:
+            model.needs_prefetch()
+        # What render_messages reads
+        visible = model.visible()
+        if visible:
+            model.select(visible[0][0], True)
+        model.has_older()
+        model.has_newer()
+        model.needs_prefetch()
+        timings.append(time.perf_counter() - start)
+    store.close()
+    return timings
+
+
+def replay_accounts(steps, page_size):
+    """
+    Replay an account stream through a UserListModel.
+
+    :return: List of seconds taken by each step
+    """
+    model = UserListModel(page_size)
+    model.set_search("user")
+    timings = []
+    for kind, value in steps:
+        start = time.perf_counter()
+        if kind == "event":
+            model.add_page(value.accounts)
+        else:
+            model.change_page(value)
+        # What update_user_list reads
+        model.visible()
+        model.needs_prefetch()
+        model.last_id()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name, timings):
+    """
+    Print statistics of the time per update, in microseconds.
+    """
+    micros = sorted(t * 1e6 for t in timings)
+    quantiles = statistics.quantiles(micros, n=100)
+    print(f"{name}: {len(micros)} updates in {sum(micros) / 1e3:.1f} ms; per update "
+          f"mean {statistics.mean(micros):.1f} us, p50 {quantiles[49]:.1f} us, "
+          f"p95 {quantiles[94]:.1f} us, p99 {quantiles[98]:.1f} us, max {micros[-1]:.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chat screen view-models.")
+    parser.add_argument("--messages", type=int, default=10000, help="Messages in the stream")
+    parser.add_argument("--accounts", type=int, default=10000, help="Accounts in the stream")
+    parser.add_argument("--max-msg", type=int, default=10, help="Messages per page")
+    parser.add_argument("--max-users", type=int, default=10, help="Accounts per page")
+    parser.add_argument("--seed", type=int, default=262, help="Seed of the generated streams")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    message_steps = record_messages(args.messages, args.max_msg, rng)
+    account_steps = record_accounts(args.accounts, args.max_users, rng)
+
+    report("Messages", replay_messages(message_steps, args.max_msg, args.messages))
+    report("Accounts", replay_accounts(account_steps, args.max_users))
+
+
+if __name__ == "__main__":
+    main()
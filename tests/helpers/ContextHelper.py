@@ -1,4 +1,11 @@
-import json
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from client.network.events import AccountsPage, MessageSent, MessagesReceived, MessagesDeleted
 
 class ContextHelper:
     """
@@ -12,19 +19,31 @@ class ContextHelper:
         self.accounts = []
         self.msg_sent = False
         self.msg_deleted = False
-    
-    def message_callback(self, msg):
-        print(f"[CALLBACK] Received message: {msg}")
-
-        if msg.startswith("SEND_MESSAGE:"):
-            success = int(msg.split(":")[1])
-            self.msg_sent = success == 1
-        elif msg.startswith("REQUEST_MESSAGES:"):
-            msg_data = json.loads(msg.split(":", 1)[1])
-            self.messages = msg_data
-        elif msg.startswith("LIST_ACCOUNTS:"):
-            account_data = json.loads(msg.split(":", 1)[1])
-            self.accounts = account_data
-        elif msg.startswith("DELETE_MESSAGES:"):
-            success = int(msg.split(":")[1])
-            self.msg_deleted = success == 1
+
+    def attach(self, client):
+        """
+        Subscribe to a client's events and start its listener.
+
+        :param client: ChatClient instance
+        """
+        client.subscribe(MessageSent, self.on_message_sent)
+        client.subscribe(MessagesReceived, self.on_messages_received)
+        client.subscribe(AccountsPage, self.on_accounts_page)
+        client.subscribe(MessagesDeleted, self.on_messages_deleted)
+        client.start_listener()
+
+    def on_message_sent(self, event):
+        print(f"[EVENT] Received event: {event}")
+        self.msg_sent = event.success
+
+    def on_messages_received(self, event):
+        print(f"[EVENT] Received event: {event}")
+        self.messages = event.messages
+
+    def on_accounts_page(self, event):
+        print(f"[EVENT] Received event: {event}")
+        self.accounts = event.accounts
+
+    def on_messages_deleted(self, event):
+        print(f"[EVENT] Received event: {event}")
+        self.msg_deleted = event.success
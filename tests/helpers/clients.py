@@ -0,0 +1,55 @@
+import os
+import sys
+from unittest.mock import patch, MagicMock
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from client.network.network_wire import WireChatClient
+from client.network.wire_protocol import WireDecoder
+
+
+def attach_socket(client):
+    """
+    Give a client a mocked, connected socket whose writes always succeed.
+
+    :param client: ChatClient instance
+    :return: The mocked socket
+    """
+    client.socket = MagicMock()
+    client.socket.sendmsg.side_effect = lambda buffers: sum(map(len, buffers))
+    client.running = True
+    return client.socket
+
+
+def make_client(client_class=WireChatClient, connected=True, username=None, **kwargs):
+    """
+    Create a client without connecting to a server.
+
+    :param client_class: WireChatClient or JSONChatClient
+    :param connected: Whether to attach a mocked socket (otherwise the connection is down)
+    :param username: Username of the logged-in account, if any
+    :param kwargs: Extra arguments for the client (e.g. outbox, prefix_cache)
+    :return: The client
+    """
+    with patch.object(client_class, 'connect', return_value=True):
+        client = client_class("host", 1, 10, 10, **kwargs)
+    client.username = username
+    if connected:
+        attach_socket(client)
+    else:
+        client.socket = None
+        client.running = False
+    return client
+
+
+def feed_frames(client, data):
+    """
+    Decode wire protocol response bytes and dispatch the frames like the listener does.
+
+    :param client: WireChatClient instance
+    :param data: Encoded response frames
+    """
+    for frame in WireDecoder().feed(data):
+        client.handle_frame(frame)
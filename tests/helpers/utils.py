@@ -18,7 +18,24 @@ def wait_for_condition(condition_func, timeout=5, interval=0.1):
     return False
 
 
-def write_to_log(test_name, protocol_type, bytes_received, bytes_sent, time_elapsed):
+def format_metrics(metrics):
+    """
+    Format a MetricsRegistry as one line per operation.
+    """
+    lines = []
+    for operation, values in metrics.snapshot().items():
+        latency = values["latency_seconds"]
+        latency_text = "n/a" if latency["count"] == 0 else \
+            f"p50={latency['p50'] * 1000:.2f}ms p95={latency['p95'] * 1000:.2f}ms p99={latency['p99'] * 1000:.2f}ms"
+        lines.append(
+            f"  {operation}: requests={values['requests']} responses={values['responses']} "
+            f"errors={values['errors']} pushes={values['pushes']} "
+            f"request_bytes={values['request_bytes']['sum']} response_bytes={values['response_bytes']['sum']} "
+            f"latency {latency_text}\n")
+    return "".join(lines)
+
+
+def write_to_log(test_name, protocol_type, bytes_received, bytes_sent, time_elapsed, metrics=None):
     log_file = os.path.join(
         LOG_DIR, f"integration_metrics_{protocol_type}.log")
 
@@ -45,8 +62,11 @@ def write_to_log(test_name, protocol_type, bytes_received, bytes_sent, time_elap
         f"[TEST METRICS] {test_name}\n"
         f"Time taken: {time_elapsed:.3f} seconds\n"
         f"Total bytes sent: {bytes_sent}\n"
-        f"Total bytes received: {bytes_received}\n\n"
+        f"Total bytes received: {bytes_received}\n"
     )
+    if metrics is not None:
+        log_message += "Per-operation metrics:\n" + format_metrics(metrics)
+    log_message += "\n"
     new_lines.append(log_message)
 
     # Write back the modified content
@@ -0,0 +1,103 @@
+from unittest.mock import patch
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.account_directory import AccountDirectory
+
+# Test the AccountDirectory against a model of the server's LIST_ACCOUNTS
+
+ACCOUNTS = [(1, "alice"), (2, "bob"), (3, "alicia"), (4, "carol"), (5, "malik"),
+            (6, "alina"), (7, "dave"), (8, "sal"), (9, "alfred"), (10, "alibaba")]
+
+
+def list_accounts(count, offset_id, filter_text):
+    """
+    Same rules as the server: accounts containing the filter, after the offset, by ID.
+    """
+    return [account for account in ACCOUNTS
+            if account[0] > offset_id and filter_text in account[1]][:count]
+
+
+def fetch_page(directory, filter_text, after_id, count, requests):
+    """
+    Get a page like the UI does, recording the requests sent to the "server".
+
+    :return: The page of accounts
+    """
+    cached, offset_id = directory.lookup(filter_text, after_id, count)
+    if offset_id is None:
+        return cached
+    requests.append((filter_text, offset_id))
+    accounts = list_accounts(count, offset_id, filter_text)
+    directory.add(filter_text, offset_id, accounts, count)
+    return (cached + accounts)[:count]
+
+
+def test_pages_match_server():
+    """
+    Test that cached pages match what the server returns, for every filter and offset.
+    """
+    directory = AccountDirectory()
+    requests = []
+    for filter_text in ["", "al", "ali", "alic", "a", "l", "zzz"]:
+        for after_id in range(0, 11):
+            for count in (1, 2, 3, 5):
+                assert fetch_page(directory, filter_text, after_id, count, requests) == \
+                    list_accounts(count, after_id, filter_text), (filter_text, after_id, count)
+
+
+def test_extended_filter_needs_no_request():
+    """
+    Test that a filter extending a fully listed one is served locally.
+    """
+    directory = AccountDirectory()
+    requests = []
+    # List every account matching "al" (3 pages of 2 + 1 short page)
+    after_id = 0
+    while True:
+        page = fetch_page(directory, "al", after_id, 2, requests)
+        if not page:
+            break
+        after_id = page[-1][0]
+    sent = len(requests)
+
+    assert fetch_page(directory, "ali", 0, 2, requests) == [
+        (1, "alice"), (3, "alicia")]
+    assert fetch_page(directory, "alic", 0, 5, requests) == [
+        (1, "alice"), (3, "alicia")]
+    assert fetch_page(directory, "mal", 0, 5, requests) == [(5, "malik")]
+    assert len(requests) == sent, "Extended filters should not send requests"
+
+
+def test_partial_coverage_fetches_only_the_rest():
+    """
+    Test that a filter seeded from a partly listed one only fetches after its coverage.
+    """
+    directory = AccountDirectory()
+    requests = []
+    assert fetch_page(directory, "a", 0, 3, requests) == [
+        (1, "alice"), (3, "alicia"), (4, "carol")]
+
+    # "ali" seeded from "a" up to ID 4: only alice and alicia are known
+    assert fetch_page(directory, "ali", 0, 3, requests) == [
+        (1, "alice"), (3, "alicia"), (5, "malik")]
+    assert requests[-1] == ("ali", 4)
+
+
+def test_entries_expire():
+    """
+    Test that cached filters are dropped after max_age.
+    """
+    directory = AccountDirectory(max_age=30)
+    requests = []
+    with patch("client.account_directory.time.monotonic", return_value=100.0):
+        fetch_page(directory, "zzz", 0, 2, requests)
+        fetch_page(directory, "zzz", 0, 2, requests)
+    assert len(requests) == 1
+    with patch("client.account_directory.time.monotonic", return_value=131.0):
+        fetch_page(directory, "zzz", 0, 2, requests)
+    assert len(requests) == 2
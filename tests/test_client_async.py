@@ -0,0 +1,265 @@
+import asyncio
+import json
+import struct
+import os
+import sys
+import bcrypt
+import pytest
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.network_async import AsyncWireChatClient, AsyncJSONChatClient
+
+# Test the AsyncChatClient classes against small in-process fake servers
+
+SALT = bcrypt.gensalt(rounds=4)  # Cheap cost factor to keep the tests fast
+MESSAGES = [(1, "test_sender", "Hello, world!"), (2, "test_sender", "Bye")]
+
+
+async def handle_wire_connection(reader, writer):
+    """
+    Minimal wire protocol server: parses each request and writes a canned response.
+    """
+    try:
+        while True:
+            op_id = (await reader.readexactly(1))[0]
+            if op_id == 1:  # LOOKUP_USER
+                await reader.readexactly((await reader.readexactly(1))[0])
+                writer.write(struct.pack("!B B", 1, 1) + SALT)
+            elif op_id in (2, 3):  # LOGIN / CREATE_ACCOUNT
+                await reader.readexactly((await reader.readexactly(1))[0])
+                await reader.readexactly((await reader.readexactly(1))[0])
+                writer.write(struct.pack("!B B H", 2, 1, 2) if op_id == 2 else struct.pack("!B B", 3, 1))
+                # Push a message right after logging in
+                writer.write(encode_wire_messages(MESSAGES[:1]))
+            elif op_id == 4:  # LIST_ACCOUNTS
+                _, _, filter_len = struct.unpack("!B I B", await reader.readexactly(6))
+                await reader.readexactly(filter_len)
+                writer.write(struct.pack("!B B I B", 4, 1, 1, 5) + b"alice")
+            elif op_id == 5:  # SEND_MESSAGE
+                await reader.readexactly((await reader.readexactly(1))[0])
+                await reader.readexactly(struct.unpack("!H", await reader.readexactly(2))[0])
+                writer.write(struct.pack("!B B I", 5, 1, 77))
+            elif op_id == 6:  # REQUEST_MESSAGES
+                await reader.readexactly(1)
+                writer.write(encode_wire_messages(MESSAGES))
+            elif op_id == 7:  # DELETE_MESSAGES
+                await reader.readexactly(4 * (await reader.readexactly(1))[0])
+                message = b"Message not found"
+                writer.write(struct.pack("!B B H", 255, 7, len(message)) + message)
+            elif op_id == 8:  # DELETE_ACCOUNT
+                break
+            await writer.drain()
+    except asyncio.IncompleteReadError:
+        pass
+    writer.close()
+
+
+def encode_wire_messages(messages):
+    frame = struct.pack("!B B", 6, len(messages))
+    for message_id, sender, message in messages:
+        frame += struct.pack("!I B", message_id, len(sender)) + sender.encode("utf-8")
+        frame += struct.pack("!H", len(message)) + message.encode("utf-8")
+    return frame
+
+
+async def handle_json_connection(reader, writer):
+    """
+    Minimal JSON protocol server: writes a canned response for each request line.
+    """
+    def respond(operation, payload=None, success=True):
+        writer.write((json.dumps({"operation": operation, "success": success,
+                                  "payload": payload}) + "\n").encode("utf-8"))
+
+    json_messages = {"messages": [{"id": message_id, "sender": sender, "message": message}
+                                  for message_id, sender, message in MESSAGES]}
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        operation = json.loads(line)["operation"]
+        if operation == "LOOKUP_USER":
+            respond(operation, {"exists": True, "bcrypt_prefix": SALT.decode("utf-8")})
+        elif operation == "LOGIN":
+            respond(operation, {"unread_messages": 2})
+            respond("REQUEST_MESSAGES", {"messages": json_messages["messages"][:1]})
+        elif operation == "CREATE_ACCOUNT":
+            respond(operation)
+            respond("REQUEST_MESSAGES", {"messages": json_messages["messages"][:1]})
+        elif operation == "LIST_ACCOUNTS":
+            respond(operation, {"accounts": [{"id": 1, "username": "alice"}]})
+        elif operation == "SEND_MESSAGE":
+            respond(operation, {"message_id": 77})
+        elif operation == "REQUEST_MESSAGES":
+            respond(operation, json_messages)
+        elif operation == "DELETE_MESSAGES":
+            writer.write((json.dumps({"operation": operation, "success": False, "unexpected_failure": True,
+                                      "message": "Message not found"}) + "\n").encode("utf-8"))
+        elif operation == "DELETE_ACCOUNT":
+            break
+        await writer.drain()
+    writer.close()
+
+
+CASES = [(AsyncWireChatClient, handle_wire_connection),
+         (AsyncJSONChatClient, handle_json_connection)]
+
+
+async def start_client(client_class, handler):
+    """
+    Start a fake server on an ephemeral port and connect a client to it.
+
+    :return: Tuple of the server and the connected client
+    """
+    server = await asyncio.start_server(handler, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = client_class("127.0.0.1", port, 10, 10)
+    assert await client.connect() == True, "Client should connect"
+    return server, client
+
+
+@pytest.mark.parametrize("client_class, handler", CASES)
+def test_all_operations(client_class, handler):
+    """
+    Test every operation end to end and the byte accounting.
+
+    :param client_class: AsyncChatClient subclass to test
+    :param handler: Matching fake server connection handler
+    """
+    async def run():
+        server, client = await start_client(client_class, handler)
+        pushed = []
+        client.push_callback = pushed.append
+
+        assert await client.send_lookup_account("test_user") == True
+        assert client.bcrypt_prefix == SALT
+        assert await client.send_login("test_user", "test_password") == (1, 2)
+        assert await client.send_create_account("test_user2", "test_password") == True
+        assert await client.send_list_accounts("al") == [(1, "alice")]
+        assert await client.send_message("alice", "hi") == (True, 77)
+        assert await client.send_request_messages() == MESSAGES
+        assert await client.send_delete_message([1]) == False, "Failure response should return False"
+        assert await client.send_delete_account() == True
+
+        assert pushed == [MESSAGES[:1], MESSAGES[:1]], "Pushed messages should go to push_callback"
+        assert client.bytes_sent > 0 and client.bytes_received > 0
+
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("client_class, handler", CASES)
+def test_pipelined_requests(client_class, handler):
+    """
+    Test that concurrent requests on one connection each get their own response.
+
+    :param client_class: AsyncChatClient subclass to test
+    :param handler: Matching fake server connection handler
+    """
+    async def run():
+        server, client = await start_client(client_class, handler)
+
+        results = await asyncio.gather(
+            client.send_list_accounts(),
+            client.send_request_messages(),
+            client.send_message("alice", "one"),
+            client.send_list_accounts())
+
+        assert results == [[(1, "alice")], MESSAGES, (True, 77), [(1, "alice")]]
+
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_pending_requests_fail_on_disconnect():
+    """
+    Test that requests waiting on a closed connection raise ConnectionError.
+    """
+    async def run():
+        async def hang_up(reader, writer):
+            await reader.read(1)
+            writer.close()
+
+        server, client = await start_client(AsyncWireChatClient, hang_up)
+
+        with pytest.raises(ConnectionError):
+            await client.send_request_messages()
+
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_not_connected():
+    """
+    Test that operations fail without a connection.
+    """
+    client = AsyncJSONChatClient("127.0.0.1", 1, 10, 10)
+    assert asyncio.run(client.send_request_messages()) == False
+
+
+def test_failed_send_withdraws_request():
+    """
+    Test that a request whose write fails leaves no waiter behind for the next response.
+    """
+    class BrokenWriter:
+        def write(self, data):
+            pass
+
+        def writelines(self, data):
+            pass
+
+        async def drain(self):
+            raise ConnectionResetError("connection reset")
+
+    async def run():
+        client = AsyncWireChatClient("127.0.0.1", 1, 10, 10)
+        client.writer = BrokenWriter()
+        client.running = True
+        with pytest.raises(ConnectionResetError):
+            await client.send_request_messages()
+        assert len(client.pending) == 0
+
+    asyncio.run(run())
+
+
+def test_json_long_lines():
+    """
+    Test that JSON responses longer than the StreamReader's 64 KiB limit are read, and that a
+    response over max_line_length fails the pending requests instead of leaving them waiting.
+    """
+    big = [(message_id, "test_sender", "x" * 1000) for message_id in range(100)]
+
+    async def respond_big(reader, writer):
+        while await reader.readline():
+            writer.write((json.dumps({"operation": "REQUEST_MESSAGES", "success": True, "payload": {
+                "messages": [{"id": message_id, "sender": sender, "message": message}
+                             for message_id, sender, message in big]}}) + "\n").encode("utf-8"))
+            await writer.drain()
+        writer.close()
+
+    async def run():
+        server, client = await start_client(AsyncJSONChatClient, respond_big)
+        assert await client.send_request_messages() == big
+        await client.close()
+
+        client.max_line_length = 1000
+        assert await client.connect()
+        with pytest.raises(ConnectionError):
+            await asyncio.wait_for(client.send_request_messages(), 5)
+        assert not client.running
+        await client.close()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
@@ -30,6 +30,7 @@ def mock_client():
         client.socket = MagicMock()
         client.running = True
         client.message_callback = MagicMock()
+        client.listen_for_messages = MagicMock()
         client.start_listener(client.message_callback)
         return client
 
@@ -69,7 +70,7 @@ def test_send_lookup_account(mock_client):
     mock_client.send_lookup_account("test_user")
     expected_request = (json.dumps({"operation": "LOOKUP_USER", "payload": {
                         "username": user}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_username", ["", None, 123])
@@ -94,7 +95,7 @@ def test_send_create_account(mock_client):
         mock_client.send_create_account(user, password)
         expected_request = (json.dumps({"operation": "CREATE_ACCOUNT", "payload": {
                             "username": user, "password_hash": hashed_password.decode('utf-8')}}) + '\n').encode("utf-8")
-        mock_client.socket.send.assert_called_with(expected_request)
+        mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_username", ["", None, 123])
@@ -126,7 +127,7 @@ def test_send_login(mock_client):
         mock_client.send_login(user, password)
         expected_request = (json.dumps({"operation": "LOGIN", "payload": {
                             "username": user, "password_hash": hashed_password.decode('utf-8')}}) + '\n').encode("utf-8")
-        mock_client.socket.send.assert_called_with(expected_request)
+        mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_username", [123, False])
@@ -153,7 +154,19 @@ def test_send_list_accounts(mock_client):
     mock_client.send_list_accounts(filter_text)
     expected_request = (json.dumps({"operation": "LIST_ACCOUNTS", "payload": {"maximum_number": mock_client.max_users,
                                                                               "offset_account_id": mock_client.last_offset_account_id, "filter_text": filter_text}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
+
+
+def test_send_list_accounts_offset(mock_client):
+    """
+    Test that an explicit offset ID is sent instead of last_offset_account_id.
+
+    :param mock_client: Mocked JSONChatClient instance
+    """
+    mock_client.send_list_accounts("test", 42)
+    expected_request = (json.dumps({"operation": "LIST_ACCOUNTS", "payload": {"maximum_number": mock_client.max_users,
+                                                                              "offset_account_id": 42, "filter_text": "test"}}) + '\n').encode("utf-8")
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_filter_text", [None, 123])
@@ -174,7 +187,7 @@ def test_send_message(mock_client):
     mock_client.send_message(recipient, message)
     expected_request = (json.dumps({"operation": "SEND_MESSAGE", "payload": {
                         "recipient": recipient, "message": message}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_recipient", ["", None, 123])
@@ -200,7 +213,7 @@ def test_send_request_messages(mock_client):
     mock_client.send_request_messages()
     expected_request = (json.dumps({"operation": "REQUEST_MESSAGES", "payload": {
                         "maximum_number": mock_client.max_msg}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 def test_send_delete_message(mock_client):
@@ -213,7 +226,7 @@ def test_send_delete_message(mock_client):
     mock_client.send_delete_message(message_ids)
     expected_request = (json.dumps({"operation": "DELETE_MESSAGES", "payload": {
                         "message_ids": message_ids}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 
 @pytest.mark.parametrize("invalid_message_ids", ["", None, 123])
@@ -232,7 +245,7 @@ def test_send_delete_account(mock_client):
     mock_client.send_delete_account()
     expected_request = (json.dumps(
         {"operation": "DELETE_ACCOUNT", "payload": {}}) + '\n').encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    mock_client.socket.sendall.assert_called_with(expected_request)
 
 ### HANDLING RESPONSES ###
 
@@ -639,3 +652,82 @@ def test_delete_account_fail(mock_client):
 
         mock_log_error.assert_called_with(
             "Operation DELETE_ACCOUNT failed: Unexpected failure")
+
+
+### REQUEST FUTURES ###
+
+
+def test_request_futures_fifo(mock_client):
+    """
+    Test that pipelined requests are resolved in order with typed results.
+
+    :param mock_client: Mocked JSONChatClient instance
+    """
+    lookup = mock_client.send_lookup_account("test_user")
+    first_messages = mock_client.send_request_messages()
+    second_messages = mock_client.send_request_messages()
+
+    mock_client.handle_json_response(json.dumps({"operation": "LOOKUP_USER", "success": True, "payload": {
+        "exists": False}}))
+    mock_client.handle_json_response(json.dumps({"operation": "REQUEST_MESSAGES", "success": True, "payload": {
+        "messages": [{"id": 1, "sender": "a", "message": "hi"}]}}))
+    mock_client.handle_json_response(json.dumps({"operation": "REQUEST_MESSAGES", "success": True, "payload": {
+        "messages": []}}))
+
+    assert lookup.result(timeout=1) == False
+    assert first_messages.result(timeout=1) == [(1, "a", "hi")]
+    assert second_messages.result(timeout=1) == []
+
+
+def test_request_futures_failure(mock_client):
+    """
+    Test that a failed response resolves the request with False.
+
+    :param mock_client: Mocked JSONChatClient instance
+    """
+    with patch.object(mock_client, 'get_hashed_password_for_login', return_value=b"$2b$12$1Q7e4wto"):
+        login = mock_client.send_login("test_user", "test_password")
+    mock_client.handle_json_response(json.dumps(
+        {"operation": "LOGIN", "success": False, "payload": {"unread_messages": 0}}))
+
+    assert login.result(timeout=1) == False
+
+
+def test_listen_for_messages_in_order(mock_client):
+    """
+    Test that the listener hands messages to the dispatcher in order, one per line.
+
+    :param mock_client: Mocked JSONChatClient instance
+    """
+    mock_client.running = True
+    pushes = [json.dumps({"operation": "REQUEST_MESSAGES", "success": True, "payload": {
+        "messages": [{"id": i, "sender": "a", "message": str(i)}]}}) for i in range(20)]
+    data = ("\n".join(pushes) + "\n").encode("utf-8")
+    mock_client.socket.recv = MagicMock(side_effect=[data[:100], data[100:], b""])
+
+    JSONChatClient.listen_for_messages(mock_client)
+    mock_client.dispatcher.join()
+
+    received = [call.args[0] for call in mock_client.message_callback.call_args_list
+                if call.args[0].startswith("REQUEST_MESSAGES")]
+    assert received == [f"REQUEST_MESSAGES:{json.dumps([[i, 'a', str(i)]])}" for i in range(20)]
+
+
+def test_responses_of_previous_connection_dropped(mock_client):
+    """
+    Test that a response still queued from a replaced connection does not resolve a request
+    of the new connection.
+
+    :param mock_client: Mocked JSONChatClient instance
+    """
+    old_generation = mock_client.connection_generation
+    response = json.dumps({"operation": "SEND_MESSAGE", "success": True, "payload": {"message_id": 1}})
+
+    mock_client.reset_connection_state()  # Reconnected
+    future = mock_client.send_message("bob", "hello")
+    assert mock_client.handle_connection_response(old_generation, response) is None
+    assert not future.done()
+    assert len(mock_client.pending) == 1
+
+    mock_client.handle_connection_response(mock_client.connection_generation, response)
+    assert future.result(timeout=1) == (True, 1)
@@ -1,3 +1,4 @@
+import logging
 import struct
 from unittest.mock import patch, MagicMock
 import pytest
@@ -6,12 +7,14 @@ import sys
 import json
 
 from helpers.utils import wait_for_condition
+from helpers.clients import attach_socket, feed_frames
 
 # Add project root to sys.path
 sys.path.insert(0, os.path.abspath(
     os.path.join(os.path.dirname(__file__), '..')))
 
 from client.network.network_wire import WireChatClient
+from client.network.events import LoginResult, MessagesReceived, MessageSent
 from client import config
 
 # Test the WireChatClient class
@@ -27,14 +30,21 @@ def mock_client():
     with patch.object(WireChatClient, 'connect', return_value=True):
         # prevent actual connection to the server
         client = WireChatClient(host, port, max_msg, max_users)
-        client.socket = MagicMock()
-        client.running = True
+        attach_socket(client)
         client.message_callback = MagicMock()
         client.listen_for_messages = MagicMock()
         client.start_listener(client.message_callback)
         return client
 
 
+def sent_request(mock_socket):
+    """
+    :param mock_socket: The client's mocked socket
+    :return: Bytes written by the last sendmsg call
+    """
+    return b"".join(mock_socket.sendmsg.call_args[0][0])
+
+
 ### BASIC TESTS ###
 
 
@@ -73,8 +83,8 @@ def test_send_lookup_account(mock_client):
     # Call the send_lookup_account method
     mock_client.send_lookup_account("test_user")
 
-    # Check if the sendall method was called with the expected request
-    mock_client.socket.send.assert_called_with(expected_request)
+    # Check if the expected request was written to the socket
+    assert sent_request(mock_client.socket) == expected_request
 
 
 @pytest.mark.parametrize("invalid_username", ["", None, 123])
@@ -107,7 +117,7 @@ def test_send_create_account(mock_client):
             user.encode("utf-8")
         expected_request += struct.pack("!B",
                                         len(hashed_password)) + hashed_password
-        mock_client.socket.send.assert_called_with(expected_request)
+        assert sent_request(mock_client.socket) == expected_request
 
 
 @pytest.mark.parametrize("invalid_username", ["", None, 123])
@@ -152,7 +162,7 @@ def test_send_login(mock_client):
             user.encode("utf-8")
         expected_request += struct.pack("!B",
                                         len(hashed_password)) + hashed_password
-        mock_client.socket.send.assert_called_with(expected_request)
+        assert sent_request(mock_client.socket) == expected_request
 
 
 @pytest.mark.parametrize("invalid_username", ["", None, 123])
@@ -192,7 +202,22 @@ def test_send_list_accounts(mock_client):
     expected_request = struct.pack("!B B I B", 4, mock_client.max_users,
                                    mock_client.last_offset_account_id, len(filter_text))
     expected_request += filter_text.encode("utf-8")
-    mock_client.socket.send.assert_called_with(expected_request)
+    assert sent_request(mock_client.socket) == expected_request
+
+
+def test_send_list_accounts_offset(mock_client):
+    """
+    Test that an explicit offset ID is sent instead of last_offset_account_id
+
+    :param mock_client: A WireChatClient instance
+    """
+    mock_client.last_offset_account_id = 3
+
+    mock_client.send_list_accounts("a", 42)
+
+    expected_request = struct.pack("!B B I B", 4, mock_client.max_users, 42, 1) + b"a"
+    assert sent_request(mock_client.socket) == expected_request
+    assert mock_client.last_offset_account_id == 3
 
 
 @pytest.mark.parametrize("invalid_filter_text", [None, 123])
@@ -222,7 +247,7 @@ def test_send_message(mock_client):
     expected_request = struct.pack("!B B", 5, len(
         recipient)) + recipient.encode("utf-8")
     expected_request += struct.pack("!H", len(message_bytes)) + message_bytes
-    mock_client.socket.send.assert_called_with(expected_request)
+    assert sent_request(mock_client.socket) == expected_request
 
 
 @pytest.mark.parametrize("invalid_recipient", ["", None, 123])
@@ -255,7 +280,7 @@ def test_send_request_messages(mock_client):
     """
     mock_client.send_request_messages()
     expected_request = struct.pack("!B B", 6, mock_client.max_msg)
-    mock_client.socket.send.assert_called_with(expected_request)
+    assert sent_request(mock_client.socket) == expected_request
 
 
 def test_send_delete_message(mock_client):
@@ -270,7 +295,7 @@ def test_send_delete_message(mock_client):
     expected_request = struct.pack("!B B", 7, len(message_ids))
     for message_id in message_ids:
         expected_request += struct.pack("!I", message_id)
-    mock_client.socket.send.assert_called_with(expected_request)
+    assert sent_request(mock_client.socket) == expected_request
 
 
 @pytest.mark.parametrize("invalid_message_ids", ["", None, 123])
@@ -292,7 +317,42 @@ def test_send_delete_account(mock_client):
     """
     mock_client.send_delete_account()
     expected_request = struct.pack("!B", 8)
-    mock_client.socket.send.assert_called_with(expected_request)
+    assert sent_request(mock_client.socket) == expected_request
+
+
+def test_send_request_partial_writes(mock_client):
+    """
+    Test that a request is sent completely, in order, when the socket only accepts a few bytes at a time
+
+    :param mock_client: A WireChatClient instance
+    """
+    written = bytearray()
+
+    def send_three_bytes(buffers):
+        chunk = b"".join(buffers)[:3]
+        written.extend(chunk)
+        return len(chunk)
+
+    mock_client.socket.sendmsg.side_effect = send_three_bytes
+    mock_client.send_message("recipient", "a message that needs several writes")
+
+    expected_request = struct.pack("!B B", 5, 9) + b"recipient" + \
+        struct.pack("!H", 35) + b"a message that needs several writes"
+    assert bytes(written) == expected_request
+    assert mock_client.bytes_sent == len(expected_request)
+
+
+def test_send_request_without_sendmsg(mock_client):
+    """
+    Test that requests fall back to sendall when the socket has no sendmsg (e.g. on Windows)
+
+    :param mock_client: A WireChatClient instance
+    """
+    mock_client.socket = MagicMock(spec=["sendall", "close"])
+    mock_client.send_delete_message([1, 2])
+
+    mock_client.socket.sendall.assert_called_with(
+        struct.pack("!B B I I", 7, 2, 1, 2))
 
 ### HANDLING RESPONSES ###
 
@@ -630,3 +690,185 @@ def test_delete_account(mock_client):
 
     mock_client.message_callback.assert_called_with(
         "DELETE_ACCOUNT:1")
+
+
+def test_listen_for_messages_split_frames(mock_client):
+    """
+    Test that the listener decodes frames split across (and packed into) socket reads
+
+    :param mock_client: A WireChatClient instance
+    """
+    data = struct.pack("!B B H", 2, 1, 3) + struct.pack("!B B I", 5, 1, 42)
+    chunks = [data[:3], data[3:], b""]
+
+    def recv_into(buffer):
+        chunk = chunks.pop(0)
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+    mock_client.socket.recv_into = MagicMock(side_effect=recv_into)
+
+    WireChatClient.listen_for_messages(mock_client)
+
+    assert [call.args[0] for call in mock_client.message_callback.call_args_list] == [
+        "LOGIN:1:3", "SEND_MESSAGE:1"]
+    assert mock_client.bytes_received == len(data)
+
+
+### REQUEST FUTURES ###
+
+
+def test_request_futures_fifo(mock_client):
+    """
+    Test that pipelined requests are resolved in order with typed results
+
+    :param mock_client: A WireChatClient instance
+    """
+    first_accounts = mock_client.send_list_accounts()
+    sent = mock_client.send_message("test_recipient", "test_message")
+    second_accounts = mock_client.send_list_accounts("b")
+
+    feed_frames(mock_client, struct.pack("!B B I B", 4, 1, 1, 1) + b"a" +
+                struct.pack("!B B I", 5, 1, 42) +
+                struct.pack("!B B I B", 4, 1, 2, 1) + b"b")
+
+    assert first_accounts.result(timeout=1) == [(1, "a")]
+    assert sent.result(timeout=1) == (True, 42)
+    assert second_accounts.result(timeout=1) == [(2, "b")]
+    assert len(mock_client.pending) == 0
+
+
+def test_request_futures_cancelled(mock_client):
+    """
+    Test that a cancelled request still consumes its response, so later requests match theirs
+
+    :param mock_client: A WireChatClient instance
+    """
+    stale = mock_client.send_list_accounts("a")
+    latest = mock_client.send_list_accounts("b")
+    assert stale.cancel()
+
+    feed_frames(mock_client, struct.pack("!B B I B", 4, 1, 1, 1) + b"a" +
+                struct.pack("!B B I B", 4, 1, 2, 1) + b"b")
+
+    assert stale.cancelled()
+    assert latest.result(timeout=1) == [(2, "b")]
+    assert len(mock_client.pending) == 0
+
+
+def test_request_futures_push(mock_client):
+    """
+    Test that a pushed REQUEST_MESSAGES frame is not mistaken for a reply
+
+    :param mock_client: A WireChatClient instance
+    """
+    login = mock_client.send_lookup_account("test_user")
+    push = struct.pack("!B B I B", 6, 1, 7, 1) + b"a" + struct.pack("!H", 2) + b"hi"
+
+    feed_frames(mock_client, push)
+    assert not login.done(), "Push should not resolve an unrelated request"
+    mock_client.message_callback.assert_called_with(
+        f"REQUEST_MESSAGES:{json.dumps([(7, 'a', 'hi')])}")
+
+    requested = mock_client.send_request_messages()
+    feed_frames(mock_client, struct.pack("!B B", 1, 0) + push)
+    assert login.result(timeout=1) == False
+    assert requested.result(timeout=1) == [(7, "a", "hi")]
+
+
+def test_request_futures_failure(mock_client):
+    """
+    Test that a failure frame resolves the failed request with False
+
+    :param mock_client: A WireChatClient instance
+    """
+    deleted = mock_client.send_delete_message([1])
+    message = b"Not logged in"
+
+    feed_frames(mock_client, struct.pack("!B B H", 255, 7, len(message)) + message)
+
+    assert deleted.result(timeout=1) == False
+
+
+def test_request_futures_closed(mock_client):
+    """
+    Test that closing the client fails requests still waiting for a response
+
+    :param mock_client: A WireChatClient instance
+    """
+    requested = mock_client.send_request_messages()
+    deleted_account = mock_client.send_delete_account()
+
+    mock_client.close()
+
+    assert deleted_account.result(timeout=1) == True
+    with pytest.raises(ConnectionError):
+        requested.result(timeout=1)
+
+
+### EVENTS ###
+
+
+def test_subscribe_typed_events(mock_client):
+    """
+    Test that subscribers receive typed events for the event type they subscribed to
+
+    :param mock_client: A WireChatClient instance
+    """
+    received = []
+    mock_client.subscribe(MessagesReceived, received.append)
+    mock_client.subscribe(LoginResult, received.append)
+
+    messages = struct.pack("!B B", 6, 1) + struct.pack("!I B", 7, 5) + b"alice" + \
+        struct.pack("!H", 2) + b"hi"
+    feed_frames(mock_client, struct.pack("!B B H", 2, 1, 4) + messages +
+                struct.pack("!B B I", 5, 1, 9))
+
+    assert received == [LoginResult(True, 4),
+                        MessagesReceived([(7, "alice", "hi")])]
+    # The legacy string callback still gets every event
+    assert [call.args[0] for call in mock_client.message_callback.call_args_list] == [
+        "LOGIN:1:4", 'REQUEST_MESSAGES:[[7, "alice", "hi"]]', "SEND_MESSAGE:1"]
+
+
+def test_unsubscribe(mock_client):
+    """
+    Test that an unsubscribed callback is no longer called
+
+    :param mock_client: A WireChatClient instance
+    """
+    received = []
+    mock_client.subscribe(MessageSent, received.append)
+    mock_client.unsubscribe(MessageSent, received.append)
+
+    feed_frames(mock_client, struct.pack("!B B I", 5, 1, 9))
+
+    assert received == []
+
+
+### LOGGING ###
+
+
+def test_receive_path_logging(mock_client, caplog):
+    """
+    Test that received messages are only formatted for the log when debug logging is on
+
+    :param mock_client: A WireChatClient instance
+    :param caplog: Pytest log capture fixture
+    """
+    messages = struct.pack("!B B", 6, 1) + struct.pack("!I B", 7, 5) + b"alice" + \
+        struct.pack("!H", 2) + b"hi"
+
+    wire_logger = logging.getLogger("chat.network.wire")
+    wire_logger.setLevel(logging.INFO)
+    try:
+        with patch.object(logging.LogRecord, "getMessage") as get_message:
+            feed_frames(mock_client, messages)
+        get_message.assert_not_called()
+    finally:
+        wire_logger.setLevel(logging.NOTSET)
+
+    with caplog.at_level(logging.DEBUG, logger="chat.network.wire"):
+        feed_frames(mock_client, messages)
+    assert "Sender: alice, Message: hi" in caplog.text
+
@@ -0,0 +1,93 @@
+import threading
+import os
+import sys
+import pytest
+
+from helpers.utils import wait_for_condition
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.dispatcher import Dispatcher
+
+# Test the bounded, ordered Dispatcher
+
+
+def test_dispatcher_preserves_order():
+    """
+    Test that tasks with the same key run in submission order, even with several workers.
+    """
+    dispatcher = Dispatcher(workers=4, max_queue=8)
+    results = {"a": [], "b": []}
+
+    for i in range(200):
+        dispatcher.submit("a", results["a"].append, i)
+        dispatcher.submit("b", results["b"].append, i)
+    dispatcher.join()
+
+    assert results["a"] == list(range(200))
+    assert results["b"] == list(range(200))
+    stats = dispatcher.stats()
+    assert stats["submitted"] == stats["completed"] == 400
+    assert stats["depth"] == 0
+    dispatcher.shutdown()
+
+
+def test_dispatcher_backpressure():
+    """
+    Test that submit blocks once the queue is full until the consumer catches up.
+    """
+    dispatcher = Dispatcher(workers=1, max_queue=2)
+    started = threading.Event()
+    release = threading.Event()
+    done = []
+
+    def occupy_worker():
+        started.set()
+        release.wait()
+
+    dispatcher.submit("key", occupy_worker)
+    started.wait(timeout=1)
+    dispatcher.submit("key", done.append, 1)
+    dispatcher.submit("key", done.append, 2)  # Queue is now full
+
+    producer = threading.Thread(target=dispatcher.submit, args=("key", done.append, 3))
+    producer.start()
+    producer.join(timeout=0.2)
+    assert producer.is_alive(), "Submit should block while the queue is full"
+
+    release.set()
+    producer.join(timeout=1)
+    dispatcher.join()
+
+    assert done == [1, 2, 3]
+    stats = dispatcher.stats()
+    assert stats["blocked"] == 1
+    assert stats["max_depth"] >= 2
+    dispatcher.shutdown()
+
+
+def test_dispatcher_survives_failing_task(caplog):
+    """
+    Test that an exception in one task does not stop the worker and is logged with its traceback.
+    """
+    dispatcher = Dispatcher()
+    done = []
+
+    dispatcher.submit("key", lambda: 1 / 0)
+    dispatcher.submit("key", done.append, "ok")
+
+    assert wait_for_condition(lambda: done == ["ok"], timeout=1)
+    assert dispatcher.stats()["failed"] == 1
+    failures = [record for record in caplog.records if record.name == "chat.network.dispatcher"]
+    assert failures and failures[0].exc_info[0] is ZeroDivisionError
+    dispatcher.shutdown()
+
+
+def test_dispatcher_invalid_workers():
+    """
+    Test that a dispatcher needs at least one worker.
+    """
+    with pytest.raises(ValueError):
+        Dispatcher(workers=0)
@@ -0,0 +1,117 @@
+import socket
+import time
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+import pytest
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.endpoints import EndpointList, staggered_connect
+
+SLOW = ("slow", 1)
+FAST = ("fast", 2)
+DOWN = ("down", 3)
+
+# Test racing and failing over between endpoints
+
+
+def fake_create_connection(delays, connections):
+    """
+    :param delays: Endpoint -> seconds the connection takes
+    :param connections: List collecting the sockets that were "connected"
+    :return: Replacement for socket.create_connection (endpoints without a delay are refused)
+    """
+    def create_connection(endpoint, timeout=None):
+        if endpoint not in delays:
+            raise ConnectionRefusedError(f"{endpoint} refused")
+        time.sleep(delays[endpoint])
+        connection = MagicMock(name=str(endpoint))
+        connections.append(connection)
+        return connection
+    return create_connection
+
+
+def test_staggered_connect_races_slow_endpoint():
+    """
+    Test that a slow endpoint is raced after the stagger delay and the loser is closed.
+    """
+    connections = []
+    create = fake_create_connection({SLOW: 0.3, FAST: 0}, connections)
+    with patch("client.network.endpoints.socket.create_connection", side_effect=create):
+        started = time.perf_counter()
+        connection, endpoint = staggered_connect([SLOW, FAST], stagger=0.05)
+        elapsed = time.perf_counter() - started
+
+    assert endpoint == FAST
+    assert elapsed < 0.25, "Should not wait for the slow endpoint"
+    # The slow attempt still finishes and its connection is closed
+    deadline = time.time() + 2
+    while len(connections) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    connections[1].close.assert_called_once()
+    connection.close.assert_not_called()
+
+
+def test_staggered_connect_fails_over_immediately():
+    """
+    Test that a refused endpoint starts the next attempt without waiting for the stagger delay.
+    """
+    create = fake_create_connection({FAST: 0}, [])
+    with patch("client.network.endpoints.socket.create_connection", side_effect=create):
+        started = time.perf_counter()
+        _, endpoint = staggered_connect([DOWN, FAST], stagger=1.0)
+    assert endpoint == FAST
+    assert time.perf_counter() - started < 0.5
+
+
+def test_staggered_connect_all_fail():
+    """
+    Test that the last error is raised when every endpoint refuses.
+    """
+    create = fake_create_connection({}, [])
+    with patch("client.network.endpoints.socket.create_connection", side_effect=create):
+        with pytest.raises(ConnectionRefusedError):
+            staggered_connect([DOWN, ("down", 4)], stagger=0.01)
+
+
+def test_endpoint_list_fails_over():
+    """
+    Test that a failed endpoint moves to the back and the next one is preferred.
+    """
+    endpoints = EndpointList([SLOW, FAST, DOWN], quarantine=60)
+    assert endpoints.order() == [SLOW, FAST, DOWN]
+
+    endpoints.mark_failed(SLOW)
+    assert endpoints.order() == [FAST, DOWN, SLOW]
+
+    endpoints.mark_failed(FAST)
+    assert endpoints.order() == [DOWN, SLOW, FAST]
+
+    endpoints.mark_connected(SLOW)
+    assert endpoints.order() == [DOWN, SLOW, FAST]
+    assert str(endpoints) == "slow:1, fast:2, down:3"
+
+
+def test_endpoint_list_connects_to_real_server():
+    """
+    Test connecting to a listening server when the first endpoint is down.
+    """
+    closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed.bind(("127.0.0.1", 0))
+    down = closed.getsockname()
+    closed.close()
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+
+    endpoints = EndpointList([down, server.getsockname()])
+    try:
+        connection, endpoint = endpoints.connect(timeout=1)
+        assert endpoint == server.getsockname()
+        connection.close()
+    finally:
+        server.close()
@@ -0,0 +1,58 @@
+import asyncio
+import os
+import sys
+import bcrypt
+import pytest
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.hashing import PasswordHasher
+
+SALT = bcrypt.gensalt(rounds=4)  # Cheap cost factor to keep the tests fast
+
+# Test the PasswordHasher executor
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_hash_modes(mode):
+    """
+    Test that every mode produces the same hash bcrypt would.
+    """
+    hasher = PasswordHasher(mode=mode, workers=2)
+    try:
+        assert hasher.hash("password", SALT) == bcrypt.hashpw(b"password", SALT)
+        futures = [hasher.submit(f"password{i}", SALT) for i in range(4)]
+        assert [future.result(timeout=30) for future in futures] == \
+            [bcrypt.hashpw(f"password{i}".encode("utf-8"), SALT) for i in range(4)]
+    finally:
+        hasher.shutdown()
+
+
+def test_hash_async():
+    """
+    Test hashing from an event loop.
+    """
+    hasher = PasswordHasher(mode="thread", workers=2)
+
+    async def hash_many():
+        return await asyncio.gather(*(hasher.hash_async(f"user{i}", SALT) for i in range(3)))
+
+    try:
+        assert asyncio.run(hash_many()) == [
+            bcrypt.hashpw(f"user{i}".encode("utf-8"), SALT) for i in range(3)]
+    finally:
+        hasher.shutdown()
+
+
+def test_hash_errors():
+    """
+    Test that invalid modes are rejected and hashing errors reach the future.
+    """
+    with pytest.raises(ValueError):
+        PasswordHasher(mode="gpu")
+
+    future = PasswordHasher(mode="inline").submit("password", b"not a salt")
+    with pytest.raises(ValueError):
+        future.result()
@@ -0,0 +1,107 @@
+from concurrent.futures import Future
+from unittest.mock import patch
+import os
+import sys
+
+from helpers.clients import make_client
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.network_json import JSONChatClient
+from client.network.heartbeat import Heartbeat, RttEstimator
+from client.network.events import LookupResult
+from client.network.wire_protocol import LookupUserFrame
+
+# Test the Heartbeat and the RttEstimator
+
+
+def test_rtt_estimator():
+    """
+    Test the SRTT/RTTVAR updates and the clamped timeout.
+    """
+    rtt = RttEstimator(initial_rto=1.0, min_rto=0.2, max_rto=10.0)
+    assert rtt.rto == 1.0
+
+    rtt.observe(0.1)
+    assert (rtt.srtt, rtt.rttvar) == (0.1, 0.05)
+    assert abs(rtt.rto - 0.3) < 1e-9  # 0.1 + 4 * 0.05
+
+    rtt.observe(0.3)
+    assert abs(rtt.rttvar - (0.75 * 0.05 + 0.25 * 0.2)) < 1e-9
+    assert abs(rtt.srtt - (0.875 * 0.1 + 0.125 * 0.3)) < 1e-9
+
+    for _ in range(100):
+        rtt.observe(0.001)
+    assert rtt.rto == 0.2  # Clamped to min_rto
+    rtt.observe(100)
+    assert rtt.rto == 10.0  # Clamped to max_rto
+    assert rtt.snapshot()["samples"] == 103
+
+
+def test_heartbeat_response_is_not_a_lookup():
+    """
+    Test that a heartbeat response resolves the beat without acting like a lookup.
+    """
+    client = make_client(username="alice")
+    client.bcrypt_prefix = b"$2b$12$saltsaltsaltsaltsaltsa"
+    events = []
+    client.subscribe(LookupResult, events.append)
+
+    future = client.send_heartbeat()
+    client.handle_frame(LookupUserFrame(0, None))
+
+    assert future.result(timeout=1) is True
+    assert events == []
+    assert client.bcrypt_prefix == b"$2b$12$saltsaltsaltsaltsaltsa"
+
+
+def test_json_heartbeat_response_is_not_a_lookup():
+    """
+    Test that the JSON client also skips the lookup handler for heartbeats.
+    """
+    client = make_client(JSONChatClient, username="alice")
+    events = []
+    client.subscribe(LookupResult, events.append)
+
+    future = client.send_heartbeat()
+    client.handle_json_response(
+        '{"operation": "LOOKUP_USER", "success": true, "payload": {"exists": false, "bcrypt_prefix": ""}}')
+
+    assert future.result(timeout=1) is True
+    assert events == []
+
+
+def test_heartbeat_samples_rtt():
+    """
+    Test that an answered beat is an RTT sample and resets the missed count.
+    """
+    client = make_client(username="alice")
+    heartbeat = Heartbeat(client, interval=60)
+    heartbeat.missed = 1
+    answered = Future()
+    answered.set_result(True)
+
+    with patch.object(client, 'send_heartbeat', return_value=answered):
+        assert heartbeat.beat() is True
+    assert heartbeat.missed == 0
+    assert client.rtt.samples == 1
+
+
+def test_heartbeat_declares_dead_connection():
+    """
+    Test that the connection is closed after max_missed unanswered beats.
+    """
+    client = make_client(username="alice")
+    client.rtt = RttEstimator(initial_rto=0.01, min_rto=0.01)
+    heartbeat = Heartbeat(client, interval=60, max_missed=2)
+
+    assert heartbeat.beat() is False
+    assert client.running
+    assert heartbeat.beat() is False
+    assert not client.running, "Connection should be closed after 2 missed beats"
+    assert heartbeat.beat() is None  # Not connected: no beat
+
+    client.close()
+    assert heartbeat.stopped.is_set()
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.abspath(
 from client import config
 from client.network.network_json import JSONChatClient
 from client.network.network_wire import WireChatClient
+from client.network.metrics import MetricsRegistry
 
 # -----------------------------------------------------------------------------
 # Helper Functions
@@ -78,12 +79,13 @@ def test_lookup_nonexistent_user():
         assert sender_client.bcrypt_prefix is None, "Lookup should fail for nonexistent user"
         bytes_sent = sender_client.bytes_sent
         bytes_received = sender_client.bytes_received
+        metrics = sender_client.metrics
         protocol_type = "json" if isinstance(
             sender_client, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_lookup_nonexistent_user", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_create_account():
@@ -106,12 +108,13 @@ def test_create_account():
         assert sender_client.bcrypt_prefix is not None, "Lookup should succeed for created user"
         bytes_sent = sender_client.bytes_sent
         bytes_received = sender_client.bytes_received
+        metrics = sender_client.metrics
         protocol_type = "json" if isinstance(
             sender_client, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_create_account", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_login():
@@ -138,12 +141,13 @@ def test_login():
         assert sender_client.username == username, "Login failed: Username not set correctly"
         bytes_sent = sender_client.bytes_sent
         bytes_received = sender_client.bytes_received
+        metrics = sender_client.metrics
         protocol_type = "json" if isinstance(
             sender_client, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_login", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_list_accounts(test_context):
@@ -155,7 +159,7 @@ def test_list_accounts(test_context):
     start_time = time.time()
     with client_connection() as sender:
         # Attach the callback to capture received messages
-        sender.start_listener(test_context.message_callback)
+        test_context.attach(sender)
 
         sender.max_users = 2
 
@@ -204,12 +208,13 @@ def test_list_accounts(test_context):
 
         bytes_sent = sender.bytes_sent
         bytes_received = sender.bytes_received
+        metrics = sender.metrics
         protocol_type = "json" if isinstance(
             sender, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_list_accounts", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_send_receive_message(test_context):
@@ -221,8 +226,8 @@ def test_send_receive_message(test_context):
     start_time = time.time()
     with client_connection() as sender, client_connection() as receiver:
         # Set up the receiver
-        receiver.start_listener(test_context.message_callback)
-        sender.start_listener(test_context.message_callback)
+        test_context.attach(receiver)
+        test_context.attach(sender)
 
         # Create sender account
         sender.send_create_account("test_sender", "test_password")
@@ -273,7 +278,7 @@ def test_send_receive_message(test_context):
         # Restart the receiver
         receiver.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         receiver.connect()
-        receiver.start_listener(test_context.message_callback)
+        test_context.attach(receiver)
 
         # Log in receiver
         receiver.send_login("test_receiver", "test_password")
@@ -299,12 +304,15 @@ def test_send_receive_message(test_context):
             check_last_message), "Last message not received in time"
         bytes_sent = sender.bytes_sent + receiver.bytes_sent
         bytes_received = sender.bytes_received + receiver.bytes_received
+        metrics = MetricsRegistry(sender.metrics.labels)
+        metrics.merge(sender.metrics)
+        metrics.merge(receiver.metrics)
         protocol_type = "json" if isinstance(
             sender, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_send_receive_message", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_delete_message(test_context):
@@ -316,7 +324,7 @@ def test_delete_message(test_context):
     start_time = time.time()
     with client_connection() as sender, client_connection() as receiver:
         # Set up the receiver
-        receiver.start_listener(test_context.message_callback)
+        test_context.attach(receiver)
 
         # Create sender account
         sender.send_create_account("test_sender1", "test_password")
@@ -353,12 +361,15 @@ def test_delete_message(test_context):
             check_deleted_message), "Message not deleted in time"
         bytes_sent = sender.bytes_sent + receiver.bytes_sent
         bytes_received = sender.bytes_received + receiver.bytes_received
+        metrics = MetricsRegistry(sender.metrics.labels)
+        metrics.merge(sender.metrics)
+        metrics.merge(receiver.metrics)
         protocol_type = "json" if isinstance(
             sender, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_delete_message", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
 
 
 def test_delete_account():
@@ -383,9 +394,10 @@ def test_delete_account():
             check_deleted_account), "Account not deleted in time"
         bytes_sent = sender.bytes_sent
         bytes_received = sender.bytes_received
+        metrics = sender.metrics
         protocol_type = "json" if isinstance(
             sender, JSONChatClient) else "wire"
 
     time_elapsed = time.time() - start_time
     write_to_log("test_delete_account", protocol_type,
-                 bytes_received, bytes_sent, time_elapsed)
+                 bytes_received, bytes_sent, time_elapsed, metrics)
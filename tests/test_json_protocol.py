@@ -0,0 +1,91 @@
+import json
+import os
+import sys
+import pytest
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.json_protocol import LineFramer, JSONProtocolError, decode_response
+from client.network.wire_protocol import LookupUserFrame, LoginFrame, RequestMessagesFrame, FailureFrame
+
+# Test the JSON protocol helpers (no socket involved)
+
+
+def test_framer_split_chunks():
+    """
+    Test that messages split across chunks (and several per chunk) are framed correctly.
+    """
+    messages = [json.dumps({"n": i, "text": "é" * i}) for i in range(50)]
+    data = ("\n".join(messages) + "\n").encode("utf-8")
+    framer = LineFramer()
+
+    lines = []
+    for i in range(0, len(data), 7):  # Splits multi-byte characters too
+        lines += framer.feed(data[i:i + 7])
+
+    assert lines == messages
+    assert framer.pending_bytes() == 0
+
+
+def test_framer_keeps_partial_message():
+    """
+    Test that an incomplete trailing message is kept until its newline arrives.
+    """
+    framer = LineFramer()
+
+    assert framer.feed(b'{"a": 1}\n{"b"') == ['{"a": 1}']
+    assert framer.pending_bytes() == 4
+    assert framer.feed(b': 2}\n\n') == ['{"b": 2}']
+    assert framer.pending_bytes() == 0
+
+
+def test_framer_large_burst():
+    """
+    Test a ~1 MB burst of small messages delivered in one chunk.
+    """
+    message = json.dumps({"operation": "REQUEST_MESSAGES", "success": True})
+    framer = LineFramer()
+
+    lines = framer.feed((message + "\n").encode("utf-8") * 20000)
+
+    assert len(lines) == 20000
+    assert lines[-1] == message
+
+
+def test_framer_max_line_length():
+    """
+    Test that a message longer than the limit is rejected, complete or not.
+    """
+    with pytest.raises(JSONProtocolError):
+        LineFramer(max_line_length=10).feed(b"x" * 11 + b"\n")
+
+    framer = LineFramer(max_line_length=10)
+    framer.feed(b"x" * 10)
+    with pytest.raises(JSONProtocolError):
+        framer.feed(b"x")
+
+
+def test_decode_response():
+    """
+    Test that JSON responses decode into the shared frame types.
+    """
+    assert decode_response(json.dumps({"operation": "LOOKUP_USER", "success": True, "payload": {
+        "exists": True, "bcrypt_prefix": "$2b$12$abc"}})) == LookupUserFrame(1, b"$2b$12$abc")
+    assert decode_response(json.dumps({"operation": "LOGIN", "success": False, "payload": {
+        "unread_messages": 0}})) == LoginFrame(0, 0)
+    assert decode_response(json.dumps({"operation": "REQUEST_MESSAGES", "success": True, "payload": {
+        "messages": [{"id": 1, "sender": "a", "message": "hi"}]}})) == RequestMessagesFrame([(1, "a", "hi")])
+    assert decode_response(json.dumps({"operation": "SEND_MESSAGE", "success": False, "unexpected_failure": True,
+                                       "message": "Not logged in"})) == FailureFrame(5, "Not logged in")
+
+
+def test_decode_response_invalid():
+    """
+    Test that malformed responses raise JSONProtocolError.
+    """
+    with pytest.raises(JSONProtocolError):
+        decode_response("not json")
+    with pytest.raises(JSONProtocolError):
+        decode_response(json.dumps({"operation": "LIST_ACCOUNTS", "success": True, "payload": {}}))
@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.message_store import MessageStore
+
+ACCOUNT = MessageStore.account_key("host", 1, "alice")
+
+# Test the local MessageStore
+
+
+def test_store_pages_in_received_order():
+    """
+    Test that messages are paged in the order received and duplicates are ignored.
+    """
+    store = MessageStore()
+    assert store.add_messages(ACCOUNT, [(5, "bob", "first"), (3, "carol", "second")]) == 2
+    assert store.add_messages(ACCOUNT, [(3, "carol", "second"), (9, "bob", "third")]) == 1
+
+    assert store.count(ACCOUNT) == 3
+    assert store.page(ACCOUNT, 0, 2) == [(5, "bob", "first"), (3, "carol", "second")]
+    assert store.page(ACCOUNT, 2, 2) == [(9, "bob", "third")]
+    assert store.count(MessageStore.account_key("host", 1, "bob")) == 0
+
+
+def test_store_persists(tmp_path):
+    """
+    Test that stored messages survive reopening the database.
+    """
+    path = str(tmp_path / "messages.db")
+    store = MessageStore(path)
+    store.add_messages(ACCOUNT, [(1, "bob", "hello"), (2, "bob", "bye")])
+    store.delete(ACCOUNT, [2])
+    store.close()
+
+    reopened = MessageStore(path)
+    assert reopened.page(ACCOUNT, 0, 10) == [(1, "bob", "hello")]
+    reopened.delete_account(ACCOUNT)
+    assert reopened.count(ACCOUNT) == 0
+    reopened.close()
+
+
+def test_store_concurrent_writers(tmp_path):
+    """
+    Test that the network and UI threads can use the store at the same time.
+    """
+    store = MessageStore(str(tmp_path / "messages.db"))
+
+    def add_batch(start):
+        for i in range(start, start + 100):
+            store.add_messages(ACCOUNT, [(i, "bob", f"message {i}")])
+
+    threads = [threading.Thread(target=add_batch, args=(i * 100,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.count(ACCOUNT) == 400
+    store.close()
@@ -0,0 +1,159 @@
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.message_view import MessageView, wrap_bucket
+
+# Test the MessageView row pool with fake rows (no display is needed)
+
+
+class FakeRow:
+    """
+    Records what a MessageRow would show, without creating widgets.
+    """
+
+    created = 0
+
+    def __init__(self, parent, on_toggle, on_open):
+        FakeRow.created += 1
+        self.on_toggle = on_toggle
+        self.on_open = on_open
+        self.message = None
+        self.selected = False
+        self.wraplength = None
+        self.visible = False
+        self.configured = 0  # Number of times the text was set
+
+    def bind(self, message, selected, wraplength):
+        changed = message != self.message
+        if changed:
+            self.message = message
+            self.configured += 1
+        self.selected = selected
+        self.set_wraplength(wraplength)
+        self.visible = True
+        return changed
+
+    def set_wraplength(self, wraplength):
+        self.wraplength = wraplength
+
+    def hide(self):
+        self.visible = False
+        self.message = None
+
+    def click(self):
+        self.on_toggle(self, not self.selected)
+
+
+def make_view(size=3, **kwargs):
+    """
+    :param size: Number of rows
+    :return: MessageView with fake rows
+    """
+    return MessageView(None, size, 400, row_factory=FakeRow, **kwargs)
+
+
+def page(*ids):
+    """
+    :return: Page of messages with the given IDs
+    """
+    return [(msg_id, "bob", f"message {msg_id}") for msg_id in ids]
+
+
+def test_rows_are_pooled():
+    """
+    Test that the rows are created once and reused for every page.
+    """
+    FakeRow.created = 0
+    view = make_view()
+    for start in range(0, 30, 3):
+        view.show(page(start, start + 1, start + 2))
+    assert FakeRow.created == 3
+    assert [row.message[0] for row in view.rows] == [27, 28, 29]
+
+
+def test_only_changed_rows_are_rebound():
+    """
+    Test that a refresh only reconfigures the rows whose message changed.
+    """
+    view = make_view()
+    view.show(page(1, 2, 3))
+    assert view.rebound == 3
+
+    view.show(page(1, 2, 3))
+    assert view.rebound == 3, "An unchanged page should not rebind rows"
+
+    view.show(page(1, 2, 4))
+    assert view.rebound == 4
+    assert [row.configured for row in view.rows] == [1, 1, 2]
+
+
+def test_short_page_hides_trailing_rows():
+    """
+    Test that unused rows are hidden and always follow the shown ones.
+    """
+    view = make_view()
+    view.show(page(1, 2, 3))
+    view.show(page(4))
+    assert [row.visible for row in view.rows] == [True, False, False]
+
+    view.show(page(5, 6, 7, 8))  # Extra messages are ignored
+    assert [row.message[0] for row in view.rows] == [5, 6, 7]
+
+
+def test_selection_is_reported_and_shown():
+    """
+    Test that checkbox clicks report message IDs and that the given selection is shown.
+    """
+    changes = []
+    view = make_view(on_select=lambda *change: changes.append(change))
+    view.show(page(1, 2, 3))
+    view.rows[0].click()
+    view.rows[2].click()
+    view.rows[0].click()
+    assert changes == [(1, True), (3, True), (1, False)]
+
+    view.show(page(3, 4), selected={3})
+    assert view.rows[0].selected, "Message 3 should be selected in its new row"
+    assert not view.rows[1].selected
+
+    view.show(page(5))
+    assert not view.rows[0].selected
+
+
+def test_open_and_wraplength():
+    """
+    Test double-click handling and that wrap length changes reach the shown rows.
+    """
+    opened = []
+    view = make_view(on_open=opened.append)
+    view.show(page(1, 2))
+    view.rows[1].on_open(view.rows[1])
+    view.rows[2].on_open(view.rows[2])  # Hidden row: ignored
+    assert opened == ["bob"]
+
+    view.set_wraplength(250)
+    assert [row.wraplength for row in view.rows] == [240, 240, None]
+    view.show(page(1, 2, 3))
+    assert view.rows[2].wraplength == 240
+
+
+def test_rewrap_only_across_buckets():
+    """
+    Test that resizing within a width bucket does not rewrap any row.
+    """
+    assert wrap_bucket(439) == 400
+    assert wrap_bucket(440) == 440
+    assert wrap_bucket(50) == 200  # Minimum width
+
+    view = make_view()
+    view.show(page(1, 2))
+    assert [row.wraplength for row in view.rows[:2]] == [400, 400]
+    for width in range(400, 440):
+        assert view.set_wraplength(width) == 0
+    assert view.set_wraplength(445) == 2, "Only the shown rows should be rewrapped"
+    assert view.rows[2].wraplength is None
+    assert view.rewrapped == 2
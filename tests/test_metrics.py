@@ -0,0 +1,109 @@
+import json
+import os
+import struct
+import sys
+import pytest
+
+from helpers.clients import make_client
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.metrics import Histogram, MetricsRegistry, LATENCY_BUCKETS
+from client.network.wire_protocol import WireDecoder, LOGIN, SEND_MESSAGE
+
+# Test the metrics registry and how the client records into it
+
+
+def test_histogram_quantiles():
+    """
+    Test that quantile estimates land in the right bucket and inside the observed range.
+    """
+    histogram = Histogram((1, 2, 4, 8, 16))
+    for value in range(1, 101):
+        histogram.observe(value / 10)  # 0.1 .. 10.0
+
+    assert histogram.count == 100
+    assert 4 <= histogram.quantile(0.5) <= 8
+    assert 8 <= histogram.quantile(0.99) <= 10
+    assert histogram.quantile(1) == 10
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+def test_registry_snapshot_and_merge():
+    """
+    Test the JSON snapshot and merging the metrics of two clients.
+    """
+    first = MetricsRegistry({"protocol": "wire"})
+    second = MetricsRegistry({"protocol": "wire"})
+    first.record_request(LOGIN, 40)
+    first.record_response(LOGIN, 4, latency=0.01)
+    second.record_request(LOGIN, 40)
+    second.record_response(LOGIN, 2, latency=0.02, failed=True)
+    second.record_response(SEND_MESSAGE, 6)  # Push
+    first.record_reconnect(3, 1.5, True)
+    second.record_reconnect(5, 10.0, False)
+
+    first.merge(second)
+    snapshot = json.loads(first.to_json())
+
+    login = snapshot["operations"]["LOGIN"]
+    assert (login["requests"], login["responses"], login["errors"]) == (2, 2, 1)
+    assert login["request_bytes"]["sum"] == 80
+    assert 0.01 <= login["latency_seconds"]["p99"] <= 0.02
+    assert snapshot["operations"]["SEND_MESSAGE"]["pushes"] == 1
+    assert snapshot["labels"] == {"protocol": "wire"}
+    reconnect = snapshot["reconnect"]
+    assert (reconnect["reconnects"], reconnect["failures"], reconnect["attempts"]) == (1, 1, 8)
+    assert reconnect["latency_seconds"]["max"] == 1.5
+
+
+def test_registry_prometheus():
+    """
+    Test the Prometheus text exposition format.
+    """
+    registry = MetricsRegistry({"protocol": "json"})
+    registry.record_request(LOGIN, 40)
+    registry.record_response(LOGIN, 60, latency=0.5)
+    registry.record_reconnect(2, 0.3, True)
+
+    text = registry.to_prometheus()
+
+    assert 'chat_client_requests_total{protocol="json",operation="LOGIN"} 1' in text
+    assert 'chat_client_latency_seconds_bucket{protocol="json",operation="LOGIN",le="+Inf"} 1' in text
+    assert 'chat_client_response_bytes_sum{protocol="json",operation="LOGIN"} 60' in text
+    assert 'chat_client_reconnect_attempts_total{protocol="json"} 2' in text
+    assert 'chat_client_reconnect_seconds_bucket{protocol="json",le="+Inf"} 1' in text
+    assert text.count("# TYPE") == 11
+    buckets = [line for line in text.splitlines()
+               if line.startswith("chat_client_latency_seconds_bucket")]
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+
+
+@pytest.fixture(scope="function")
+def mock_client():
+    return make_client()
+
+
+def test_client_records_metrics(mock_client):
+    """
+    Test that the client records request sizes, response sizes, latency, pushes and send errors.
+    """
+    mock_client.send_message("bob", "hi")
+    decoder = WireDecoder()
+    frames = decoder.feed(struct.pack("!B B I", 5, 1, 42) * 2)  # Reply, then push
+    for frame, size in zip(frames, decoder.frame_sizes):
+        mock_client.handle_frame(frame, size)
+
+    mock_client.socket.sendmsg.side_effect = OSError("broken pipe")
+    mock_client.send_message("bob", "again")
+
+    send_message = mock_client.metrics.snapshot()["SEND_MESSAGE"]
+    assert send_message["requests"] == 2
+    assert send_message["responses"] == 1
+    assert send_message["pushes"] == 1
+    assert send_message["errors"] == 1
+    assert send_message["request_bytes"]["min"] == 1 + 1 + 3 + 2 + 2
+    assert send_message["response_bytes"]["sum"] == 12
+    assert send_message["latency_seconds"]["count"] == 1
@@ -0,0 +1,215 @@
+import json
+import threading
+import struct
+import os
+import sys
+
+from helpers.clients import make_client, attach_socket
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.outbox import Outbox, PENDING, SENT, FAILED
+from client.network.network_wire import WireChatClient
+from client.network.network_json import JSONChatClient
+from client.network.wire_protocol import LoginFrame, SendMessageFrame, FailureFrame, SEND_MESSAGE
+
+ACCOUNT = Outbox.account_key("host", 1, "alice")
+
+# Test the offline Outbox and how the clients flush it
+
+
+def test_outbox_entries():
+    """
+    Test that entries are returned oldest first per account and leave the queue once answered.
+    """
+    outbox = Outbox()
+    first = outbox.add(ACCOUNT, "bob", "hello")
+    second = outbox.add(ACCOUNT, "carol", "hi")
+    outbox.add(Outbox.account_key("host", 1, "bob"), "alice", "other account")
+
+    assert outbox.pending(ACCOUNT) == [(first, "bob", "hello"), (second, "carol", "hi")]
+
+    outbox.mark_sent(first, 42)
+    outbox.mark_failed(second)
+    assert outbox.pending(ACCOUNT) == []
+    assert outbox.get(first)["status"] == SENT
+    assert outbox.get(first)["message_id"] == 42
+    assert outbox.get(second)["status"] == FAILED
+    assert outbox.get(12345) is None
+
+
+def test_outbox_persists(tmp_path):
+    """
+    Test that queued messages survive reopening the database.
+    """
+    path = str(tmp_path / "outbox.db")
+    outbox = Outbox(path)
+    entry_id = outbox.add(ACCOUNT, "bob", "hello")
+    outbox.close()
+
+    reopened = Outbox(path)
+    assert reopened.pending(ACCOUNT) == [(entry_id, "bob", "hello")]
+    assert reopened.get(entry_id)["status"] == PENDING
+    reopened.close()
+
+
+def test_send_message_without_outbox_is_dropped():
+    """
+    Test that a disconnected client without an outbox still drops the message.
+    """
+    client = make_client(WireChatClient, connected=False, username="alice")
+    assert client.send_message("bob", "hello") is None
+
+
+def test_wire_flush_on_login():
+    """
+    Test that messages queued while disconnected are sent in one write after the next login
+    and get the message IDs from the responses.
+    """
+    outbox = Outbox()
+    client = make_client(WireChatClient, connected=False, username="alice", outbox=outbox)
+
+    queued = [client.send_message("bob", "hello"), client.send_message("carol", "hi")]
+    assert all(future is not None and not future.done() for future in queued)
+    assert len(outbox.pending(client.outbox_account())) == 2
+
+    attach_socket(client)  # Reconnected
+    client.handle_frame(LoginFrame(1, 0))
+    client.actions.join()  # The flush runs on the action thread
+
+    # Both requests went out in a single scatter-gather write
+    client.socket.sendmsg.assert_called_once()
+    sent = b"".join(client.socket.sendmsg.call_args[0][0])
+    expected = b""
+    for recipient, message in (("bob", "hello"), ("carol", "hi")):
+        expected += struct.pack("!B B", SEND_MESSAGE, len(recipient)) + recipient.encode("utf-8")
+        expected += struct.pack("!H", len(message)) + message.encode("utf-8")
+    assert sent == expected
+
+    # Logging in again while the responses are outstanding must not send duplicates
+    client.handle_frame(LoginFrame(1, 0))
+    client.actions.join()  # The flush runs on the action thread
+    client.socket.sendmsg.assert_called_once()
+
+    client.handle_frame(SendMessageFrame(1, 7))
+    client.handle_frame(FailureFrame(SEND_MESSAGE, "Recipient does not exist"))
+
+    assert queued[0].result(timeout=1) == (True, 7)
+    assert queued[1].result(timeout=1) is False
+    entries = [outbox.get(entry_id) for entry_id in (1, 2)]
+    assert (entries[0]["status"], entries[0]["message_id"]) == (SENT, 7)
+    assert entries[1]["status"] == FAILED
+    assert outbox.pending(client.outbox_account()) == []
+
+
+def test_wire_flush_kept_after_disconnect():
+    """
+    Test that a batch whose responses never arrive stays queued for the next login.
+    """
+    outbox = Outbox()
+    client = make_client(WireChatClient, connected=False, username="alice", outbox=outbox)
+    client.send_message("bob", "hello")
+
+    attach_socket(client)  # Reconnected
+    assert client.flush_outbox() == 1
+    client.close()  # Fails the outstanding request
+
+    assert outbox.pending(client.outbox_account())[0][1:] == ("bob", "hello")
+    attach_socket(client)  # Reconnected
+    assert client.flush_outbox() == 1
+
+
+def test_json_flush_on_login():
+    """
+    Test that the JSON client flushes the outbox with a single sendall after logging in.
+    """
+    outbox = Outbox()
+    client = make_client(JSONChatClient, connected=False, username="alice", outbox=outbox)
+    queued = client.send_message("bob", "hello")
+    client.send_message("carol", "hi")
+
+    attach_socket(client)  # Reconnected
+    client.handle_json_response(json.dumps(
+        {"operation": "LOGIN", "success": True, "payload": {"unread_messages": 0}}))
+    client.actions.join()  # The flush runs on the action thread
+
+    client.socket.sendall.assert_called_once()
+    lines = client.socket.sendall.call_args[0][0].splitlines()
+    assert [json.loads(line)["payload"]["recipient"] for line in lines] == ["bob", "carol"]
+
+    for message_id in (3, 4):
+        client.handle_json_response(json.dumps(
+            {"operation": "SEND_MESSAGE", "success": True, "payload": {"message_id": message_id}}))
+    assert queued.result(timeout=1) == (True, 3)
+    assert outbox.get(2)["message_id"] == 4
+
+
+def test_failed_write_is_queued():
+    """
+    Test that a message whose write fails before the client noticed the connection was gone
+    is kept in the outbox.
+    """
+    for client_class in (WireChatClient, JSONChatClient):
+        outbox = Outbox()
+        client = make_client(client_class, connected=False, username="alice", outbox=outbox)
+        attach_socket(client)  # Reconnected
+        client.socket.sendmsg.side_effect = BrokenPipeError("broken pipe")
+        client.socket.sendall.side_effect = BrokenPipeError("broken pipe")
+
+        queued = client.send_message("bob", "hello")
+        assert queued is not False and not queued.done()
+        assert outbox.pending(client.outbox_account())[0][1:] == ("bob", "hello")
+
+
+def test_unanswered_message_is_queued():
+    """
+    Test that a message whose connection closed before the response is kept in the outbox
+    and its future resolves once the flushed copy is answered.
+    """
+    outbox = Outbox()
+    client = make_client(WireChatClient, connected=False, username="alice", outbox=outbox)
+    attach_socket(client)  # Reconnected
+    future = client.send_message("bob", "hello")
+    assert outbox.pending(client.outbox_account()) == []
+
+    client.fail_pending_requests()  # The connection closed
+    assert not future.done()
+    assert outbox.pending(client.outbox_account())[0][1:] == ("bob", "hello")
+
+    assert client.flush_outbox() == 1
+    client.handle_frame(SendMessageFrame(1, 9))
+    assert future.result(timeout=1) == (True, 9)
+
+
+def test_answered_message_is_not_queued():
+    """
+    Test that a message the server answered is not kept in the outbox.
+    """
+    outbox = Outbox()
+    client = make_client(WireChatClient, connected=False, username="alice", outbox=outbox)
+    attach_socket(client)  # Reconnected
+    future = client.send_message("bob", "hello")
+    client.handle_frame(SendMessageFrame(1, 5))
+
+    assert future.result(timeout=1) == (True, 5)
+    assert outbox.pending(client.outbox_account()) == []
+
+
+def test_flush_runs_off_the_listener():
+    """
+    Test that the outbox flush after a login is not written by the thread handling the response.
+    """
+    outbox = Outbox()
+    client = make_client(WireChatClient, connected=False, username="alice", outbox=outbox)
+    client.send_message("bob", "hello")
+    attach_socket(client)  # Reconnected
+    writers = []
+    client.socket.sendmsg.side_effect = lambda buffers: (
+        writers.append(threading.current_thread()), sum(map(len, buffers)))[1]
+
+    client.handle_frame(LoginFrame(1, 0))
+    client.actions.join()
+    assert len(writers) == 1
+    assert writers[0] is not threading.current_thread()
@@ -0,0 +1,90 @@
+import os
+import struct
+import sys
+from unittest.mock import patch
+import pytest
+
+from helpers.clients import make_client, feed_frames
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.prefix_cache import PrefixCache
+
+PREFIX = b"$2b$12$abcdefghijklmnopqrstuv"
+
+# Test the bcrypt PrefixCache and how the client uses it
+
+
+def test_prefix_cache_lru():
+    """
+    Test that the least recently used prefix is evicted first.
+    """
+    cache = PrefixCache(capacity=2)
+    cache.put("host", 1, "a", PREFIX)
+    cache.put("host", 1, "b", PREFIX)
+    assert cache.get("host", 1, "a") == PREFIX  # "b" is now the oldest
+    cache.put("host", 1, "c", PREFIX)
+
+    assert cache.get("host", 1, "b") is None
+    assert cache.get("host", 1, "a") == PREFIX
+    assert cache.get("host", 2, "a") is None, "Entries are per server"
+    assert len(cache) == 2
+
+
+def test_prefix_cache_persistence(tmp_path):
+    """
+    Test that prefixes survive a restart and invalidation is saved too.
+    """
+    path = str(tmp_path / "prefixes.json")
+    cache = PrefixCache(path)
+    cache.put("host", 1, "a", PREFIX)
+    cache.put("host", 1, "b", PREFIX)
+    cache.invalidate("host", 1, "b")
+
+    reloaded = PrefixCache(path)
+    assert reloaded.get("host", 1, "a") == PREFIX
+    assert reloaded.get("host", 1, "b") is None
+
+
+def test_prefix_cache_corrupt_file(tmp_path):
+    """
+    Test that an unreadable cache file is ignored.
+    """
+    path = tmp_path / "prefixes.json"
+    path.write_text("{not json")
+
+    assert len(PrefixCache(str(path))) == 0
+
+
+@pytest.fixture(scope="function")
+def cached_client():
+    return make_client(prefix_cache=PrefixCache())
+
+
+def test_login_skips_lookup_for_cached_prefix(cached_client):
+    """
+    Test that a looked-up prefix is reused for a later login without another LOOKUP_USER.
+    """
+    cached_client.send_lookup_account("alice")
+    feed_frames(cached_client, struct.pack("!B B", 1, 1) + PREFIX.ljust(29, b"x"))
+    cached_client.bcrypt_prefix = None
+    cached_client.lookup_username = None  # e.g. a new session sharing the cache
+
+    with patch.object(cached_client.hasher, 'hash', return_value=b"hash") as mock_hash:
+        cached_client.send_login("alice", "password")
+
+    mock_hash.assert_called_with("password", PREFIX.ljust(29, b"x"))
+
+
+def test_failed_login_invalidates_prefix(cached_client):
+    """
+    Test that a failed login drops the cached prefix.
+    """
+    cached_client.remember_prefix("alice", PREFIX)
+    with patch.object(cached_client.hasher, 'hash', return_value=b"hash"):
+        cached_client.send_login("alice", "wrong")
+    feed_frames(cached_client, struct.pack("!B B", 2, 0))
+
+    assert cached_client.cached_prefix("alice") is None
@@ -0,0 +1,220 @@
+import json
+import random
+import socket
+import struct
+import threading
+from unittest.mock import MagicMock, patch
+import os
+import sys
+
+from helpers.utils import wait_for_condition
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.network_wire import WireChatClient
+from client.network.reconnect import Backoff, ReconnectSupervisor
+from client.network.events import Connected, ConnectionLost, LoginResult, Reconnected
+from client.network.wire_protocol import LOGIN, encode_login
+
+HASHED_PASSWORD = b"$2b$12$" + b"a" * 53
+
+# Test background connecting and the ReconnectSupervisor against a local socket server
+
+
+def receive_exactly(connection, size):
+    """
+    :param connection: Server side of a connection
+    :param size: Number of bytes to read
+    :return: The bytes read
+    """
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        assert chunk, "Connection closed early"
+        data += chunk
+    return data
+
+
+def test_backoff_bounds():
+    """
+    Test that backoff delays grow exponentially, are jittered and never exceed the cap.
+    """
+    backoff = Backoff(base_delay=1.0, max_delay=8.0, rng=random.Random(1))
+    for attempt in range(10):
+        delays = [backoff.delay(attempt) for _ in range(50)]
+        ceiling = min(8.0, 2.0 ** attempt)
+        assert all(0 <= delay <= ceiling for delay in delays)
+        assert len(set(delays)) > 1, "Delays should be jittered"
+
+
+def test_reconnect_resumes_session():
+    """
+    Test that a dropped connection is re-established and the login replayed with the stored hash,
+    without publishing a new LoginResult to the UI.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    server.settimeout(5)
+    port = server.getsockname()[1]
+
+    client = WireChatClient("127.0.0.1", port, 10, 10)
+    supervisor = ReconnectSupervisor(
+        client, Backoff(base_delay=0.01, max_delay=0.05))
+    client.username = "alice"
+    client.session = ("alice", HASHED_PASSWORD)
+    events = []
+    reconnected = threading.Event()
+    client.subscribe(ConnectionLost, events.append)
+    client.subscribe(LoginResult, events.append)
+    client.subscribe(Reconnected, lambda event: (
+        events.append(event), reconnected.set()))
+    client.start_listener()
+
+    try:
+        first, _ = server.accept()
+        first.close()  # Simulate a server restart
+
+        second, _ = server.accept()
+        expected = b"".join(encode_login("alice", HASHED_PASSWORD))
+        assert receive_exactly(second, len(expected)) == expected
+        second.sendall(struct.pack("!B B H", LOGIN, 1, 0))
+
+        assert reconnected.wait(5), "Client should reconnect"
+        assert events == [ConnectionLost(), Reconnected(1, True)]
+        snapshot = json.loads(client.metrics.to_json())["reconnect"]
+        assert snapshot["reconnects"] == 1
+        assert snapshot["attempts"] == 1
+        assert snapshot["latency_seconds"]["count"] == 1
+
+        client.close()
+        assert supervisor.stopped.is_set()
+        second.close()
+    finally:
+        client.close()
+        server.close()
+
+
+def test_reconnect_gives_up():
+    """
+    Test that the supervisor stops after max_attempts when the server stays down.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    server.close()  # Nothing listens on the port
+
+    client = WireChatClient("127.0.0.1", port, 10, 10)
+    ReconnectSupervisor(client, Backoff(
+        base_delay=0.01, max_delay=0.02), max_attempts=3)
+    client.start_listener()  # Stops at once since the client is not connected
+
+    try:
+        assert wait_for_condition(
+            lambda: client.metrics.reconnect.failures == 1, timeout=5)
+        assert client.metrics.reconnect.attempts == 3
+        assert client.metrics.reconnect.reconnects == 0
+    finally:
+        client.close()
+
+
+def test_deferred_connect():
+    """
+    Test that a deferred client connects on a background thread and then starts its listener.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    server.settimeout(5)
+    port = server.getsockname()[1]
+
+    client = WireChatClient("127.0.0.1", port, 10, 10,
+                            connect_timeout=1, defer_connect=True)
+    assert not client.running, "Client should not connect in __init__"
+    connected = threading.Event()
+    client.subscribe(Connected, lambda event: connected.set())
+    client.start()
+
+    try:
+        accepted, _ = server.accept()
+        assert connected.wait(5), "Client should publish Connected"
+        assert client.running and client.thread.is_alive()
+        assert client.socket.gettimeout() is None, "Listener socket should block"
+        accepted.close()
+    finally:
+        client.close()
+        server.close()
+
+
+def test_deferred_connect_failure():
+    """
+    Test that a failed background connect is published when there is no supervisor.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    port = server.getsockname()[1]
+    server.close()  # Nothing listens on the port
+
+    client = WireChatClient("127.0.0.1", port, 10, 10, defer_connect=True)
+    lost = threading.Event()
+    client.subscribe(ConnectionLost, lambda event: lost.set())
+    client.start()
+
+    assert lost.wait(5), "Client should publish ConnectionLost"
+    assert not client.running
+
+
+def test_connect_timeout():
+    """
+    Test that the connect timeout only applies while connecting.
+    """
+    client = WireChatClient("host", 1, 10, 10,
+                            connect_timeout=0.5, defer_connect=True)
+    connection = MagicMock()
+
+    with patch("client.network.endpoints.socket.create_connection", return_value=connection) as create:
+        assert client.connect()
+    create.assert_called_once_with(("host", 1), 0.5)
+    connection.settimeout.assert_called_once_with(None)
+    assert client.socket is connection
+    assert client.endpoint == ("host", 1)
+
+
+def test_delete_account_does_not_reconnect():
+    """
+    Test that the server closing the connection after DELETE_ACCOUNT is not treated as a lost connection.
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    server.settimeout(5)
+    port = server.getsockname()[1]
+
+    client = WireChatClient("127.0.0.1", port, 10, 10)
+    ReconnectSupervisor(client, Backoff(base_delay=0.01, max_delay=0.05))
+    client.username = "alice"
+    client.session = ("alice", HASHED_PASSWORD)
+    events = []
+    client.subscribe(ConnectionLost, events.append)
+    client.subscribe(Reconnected, events.append)
+    client.start_listener()
+
+    try:
+        connection, _ = server.accept()
+        client.send_delete_account()
+        assert receive_exactly(connection, 1)
+        connection.close()  # The server drops the deleted account's connection
+
+        assert wait_for_condition(lambda: not client.running, timeout=5)
+        server.settimeout(0.3)
+        try:
+            server.accept()
+            assert False, "The client should not reconnect"
+        except socket.timeout:
+            pass
+        assert events == []
+    finally:
+        client.close()
+        server.close()
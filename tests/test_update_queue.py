@@ -0,0 +1,163 @@
+import threading
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.update_queue import UpdateQueue
+from client.network.events import MessagesReceived, AccountsPage, MessagesDeleted, Connected, ConnectionLost
+
+# Test the UpdateQueue with a fake scheduler standing in for Tk's after()
+
+
+class FakeScheduler:
+    """
+    Collects scheduled calls so the test decides when the tick runs.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, delay, function):
+        self.calls.append((delay, function))
+
+    def run(self):
+        """
+        Run the scheduled calls (and the ones they schedule).
+        """
+        while self.calls:
+            _, function = self.calls.pop(0)
+            function()
+
+
+def make_queue(handled, render=None):
+    """
+    :param handled: List the handlers append the events to
+    :param render: Render function
+    :return: Tuple of the scheduler and the UpdateQueue
+    """
+    scheduler = FakeScheduler()
+    handlers = {event_type: handled.append for event_type in (
+        MessagesReceived, AccountsPage, MessagesDeleted, Connected, ConnectionLost)}
+    queue = UpdateQueue(scheduler, handlers, render=render,
+                        mergers={
+                            MessagesReceived: lambda pending, event: MessagesReceived(pending.messages + event.messages),
+                            AccountsPage: lambda pending, event: AccountsPage(pending.accounts + event.accounts),
+                        },
+                        collapse=(Connected, ConnectionLost))
+    return scheduler, queue
+
+
+def test_burst_is_one_tick_and_one_render():
+    """
+    Test that a burst of pushed messages is handled as one batch with a single render.
+    """
+    renders = []
+    handled = []
+    scheduler, queue = make_queue(handled, render=lambda: renders.append(True))
+    queue.handlers[MessagesReceived] = lambda event: (
+        handled.append(event), queue.invalidate())
+
+    for i in range(200):
+        queue.post(MessagesReceived([(i, "bob", "hi")]))
+    assert len(scheduler.calls) == 1, "Only the first post should schedule a tick"
+    assert scheduler.calls[0][0] == 16
+
+    scheduler.run()
+    assert len(handled) == 1
+    assert [message[0] for message in handled[0].messages] == list(range(200))
+    assert len(renders) == 1
+    snapshot = queue.snapshot()
+    assert snapshot["posted"] == 200
+    assert snapshot["merged"] == 199
+    assert snapshot["ticks"] == 1 and snapshot["renders"] == 1
+
+
+def test_only_consecutive_events_are_merged():
+    """
+    Test that events keep their order: merging and dropping only happen between neighbours.
+    """
+    handled = []
+    scheduler, queue = make_queue(handled)
+    queue.post(AccountsPage([(1, "a")]))
+    queue.post(AccountsPage([(2, "b")]))
+    queue.post(MessagesDeleted(True))
+    queue.post(MessagesDeleted(True))  # No merger and not collapsed: kept
+    queue.post(ConnectionLost())
+    queue.post(ConnectionLost())  # Repeated status change: dropped
+    queue.post(Connected())
+    queue.post(AccountsPage([(3, "c")]))
+    scheduler.run()
+
+    assert handled == [AccountsPage([(1, "a"), (2, "b")]), MessagesDeleted(True), MessagesDeleted(True),
+                       ConnectionLost(), Connected(), AccountsPage([(3, "c")])]
+    assert queue.merged == 1
+    assert queue.dropped == 1
+
+
+def test_updates_during_drain():
+    """
+    Test that invalidate() inside a handler renders in the same tick and posts from
+    a handler go to the next tick.
+    """
+    renders = []
+    handled = []
+    scheduler, queue = make_queue(handled, render=lambda: renders.append(True))
+
+    def handle(event):
+        handled.append(event)
+        queue.invalidate()
+        if len(handled) == 1:
+            queue.post(MessagesDeleted(False))
+
+    queue.handlers[MessagesDeleted] = handle
+    queue.post(MessagesDeleted(True))
+    _, drain = scheduler.calls.pop(0)
+    assert drain() == 1
+    assert renders == [True]
+    assert len(scheduler.calls) == 1, "The event posted during the drain needs a new tick"
+
+    scheduler.run()
+    assert handled == [MessagesDeleted(True), MessagesDeleted(False)]
+    assert queue.ticks == 2 and queue.renders == 2
+
+
+def test_stop_drops_updates():
+    """
+    Test that pending and later events are dropped once the queue is stopped.
+    """
+    handled = []
+    scheduler, queue = make_queue(handled)
+    queue.post(Connected())
+    queue.stop()
+    queue.post(MessagesDeleted(True))
+    scheduler.run()
+
+    assert handled == []
+    assert queue.dropped == 2
+
+
+def test_post_from_threads():
+    """
+    Test that posts from several threads are all handled.
+    """
+    handled = []
+    scheduler, queue = make_queue(handled)
+
+    def post_many(sender):
+        for i in range(100):
+            queue.post(MessagesReceived([(i, sender, "hi")]))
+
+    threads = [threading.Thread(target=post_many, args=(f"user{n}",))
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scheduler.run()
+
+    assert sum(len(event.messages) for event in handled) == 400
+    assert queue.posted == 400
+    assert queue.merged == 400 - len(handled)
@@ -0,0 +1,153 @@
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.message_store import MessageStore
+from client.view_model import UserListModel, MessageListModel, FETCH, SHOW
+
+ACCOUNT = MessageStore.account_key("host", 1, "alice")
+
+# Test the headless models of the chat screen
+
+
+def accounts(*ids):
+    """
+    :return: (account ID, username) tuples with the given IDs
+    """
+    return [(account_id, f"user{account_id}") for account_id in ids]
+
+
+def messages(*ids):
+    """
+    :return: (message ID, sender, message) tuples with the given IDs
+    """
+    return [(msg_id, "bob", f"message {msg_id}") for msg_id in ids]
+
+
+def test_user_pages_and_duplicates():
+    """
+    Test that user pages are appended without duplicates and the model moves to the new page.
+    """
+    users = UserListModel(2)
+    assert users.set_search("user")
+    assert users.last_id() == 0
+    assert users.add_page(accounts(1, 2)) == 2
+    assert users.page == 0
+    assert users.visible() == accounts(1, 2)
+
+    assert users.add_page(accounts(2, 3, 4)) == 2
+    assert users.page == 1
+    assert users.visible() == accounts(3, 4)
+    assert users.last_id() == 4
+    assert users.add_page(accounts(3, 4)) == 0
+    assert users.page == 1, "A page without new users should not move"
+
+
+def test_user_search_and_paging():
+    """
+    Test that a new search text starts over and page changes ask for more users at the end.
+    """
+    users = UserListModel(2)
+    users.set_search("a")
+    users.add_page(accounts(1, 2))
+    users.add_page(accounts(3))
+    assert not users.set_search("a")
+    assert users.needs_prefetch()
+
+    assert users.change_page(-1) == SHOW
+    assert users.page == 0
+    assert users.change_page(-1) is None
+    assert users.change_page(1) == SHOW
+    assert users.change_page(1) == FETCH
+    assert users.page == 1
+
+    query = users.query
+    assert users.set_search("ab")
+    assert users.query == query + 1
+    assert (users.users, users.page, users.last_id()) == ([], 0, 0)
+    assert not users.needs_prefetch()
+
+
+def test_message_pages_and_unread():
+    """
+    Test paging through stored messages and fetching unread ones from the server.
+    """
+    model = MessageListModel(MessageStore(), 2)
+    model.set_unread(5)
+    model.start(ACCOUNT)
+    assert model.add_messages(messages(1, 2)) == 2
+    model.batch_received(2)
+    assert model.remaining_unread() == 3
+    assert model.visible() == messages(1, 2)
+    assert not model.has_older() and model.has_newer()
+    assert model.needs_prefetch()
+
+    assert model.change_page(1) == FETCH
+    assert model.page == 1
+    model.add_messages(messages(3, 4))
+    model.batch_received(2)
+    assert model.change_page(-1) == SHOW
+    assert model.change_page(-1) is None
+    assert model.change_page(1) == SHOW, "The next page is stored"
+
+    model.add_messages(messages(5))
+    model.batch_received(1)
+    assert model.remaining_unread() == 0, "Every unread message was fetched"
+    assert not model.needs_prefetch()
+    assert model.change_page(1) == SHOW
+    assert model.visible() == messages(5)
+    assert not model.has_newer()
+    assert model.change_page(1) is None
+
+
+def test_pushes_do_not_drain_unread():
+    """
+    Test that pushed messages and short batches (possibly pushes taken as a fetch's reply)
+    do not end fetching; only an empty batch does.
+    """
+    model = MessageListModel(MessageStore(), 3)
+    model.set_unread(10)
+    model.start(ACCOUNT)
+    model.add_messages(messages(1))  # Pushed while no fetch was pending
+    assert model.remaining_unread() == 10
+
+    model.add_messages(messages(2))  # Pushed while a fetch was pending: matched as its reply
+    model.batch_received(1)
+    assert model.remaining_unread() == 9
+    assert model.has_newer() and model.needs_prefetch()
+
+    model.batch_received(0)
+    assert model.remaining_unread() == 0
+    assert not model.has_newer()
+
+    model.set_unread(4)  # Logging in again
+    assert model.remaining_unread() == 3
+
+
+def test_message_selection():
+    """
+    Test that the selection is kept by message ID, pruned to the shown page and cleared by deletion.
+    """
+    store = MessageStore()
+    model = MessageListModel(store, 2)
+    model.start(ACCOUNT)
+    model.add_messages(messages(1, 2, 3))
+    model.visible()
+    model.select(2, True)
+    model.select(1, True)
+    model.select(1, False)
+    assert model.selected_ids() == [2]
+
+    model.change_page(1)
+    assert model.visible() == messages(3)
+    assert model.selected_ids() == [], "Selection should not survive leaving the page"
+
+    model.select(3, True)
+    model.delete(model.selected_ids())
+    assert model.page == 0
+    assert model.selected_ids() == []
+    assert store.page(ACCOUNT, 0, 10) == messages(1, 2)
+    assert model.stored() == 2
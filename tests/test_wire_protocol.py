@@ -0,0 +1,137 @@
+import struct
+import pytest
+import os
+import sys
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.wire_protocol import (WireDecoder, WireProtocolError, LookupUserFrame, LoginFrame,
+                                          ListAccountsFrame, SendMessageFrame, RequestMessagesFrame,
+                                          DeleteMessagesFrame, FailureFrame, encode_login,
+                                          encode_list_accounts, encode_delete_messages)
+
+# Test the sans-I/O WireDecoder (no socket involved)
+
+SALT = b"$2b$12$abcdefghijklmnopqrstuv"
+
+
+def request_messages_frame(messages):
+    """
+    Build a REQUEST_MESSAGES response the way the server does.
+
+    :param messages: List of (message ID, sender, message) tuples
+    :return: Encoded frame
+    """
+    frame = struct.pack("!B B", 6, len(messages))
+    for message_id, sender, message in messages:
+        frame += struct.pack("!I B", message_id, len(sender)) + sender.encode("utf-8")
+        frame += struct.pack("!H", len(message)) + message.encode("utf-8")
+    return frame
+
+
+def test_decode_single_frames():
+    """
+    Test that each response type decodes to its typed frame.
+    """
+    decoder = WireDecoder()
+    data = struct.pack("!B B", 1, 1) + SALT
+    data += struct.pack("!B B", 1, 0)
+    data += struct.pack("!B B H", 2, 1, 10)
+    data += struct.pack("!B B", 2, 0)
+    data += struct.pack("!B B I B", 4, 1, 7, 5) + b"alice"
+    data += struct.pack("!B B I", 5, 1, 123)
+    data += struct.pack("!B B", 7, 1)
+    data += struct.pack("!B B H", 255, 4, 5) + b"oops!"
+
+    assert decoder.feed(data) == [
+        LookupUserFrame(1, SALT),
+        LookupUserFrame(0, None),
+        LoginFrame(1, 10),
+        LoginFrame(0, 0),
+        ListAccountsFrame([(7, "alice")]),
+        SendMessageFrame(1, 123),
+        DeleteMessagesFrame(1),
+        FailureFrame(4, "oops!"),
+    ]
+    assert decoder.pending_bytes() == 0
+
+
+def test_decode_byte_by_byte():
+    """
+    Test that a frame split at every possible point is still decoded exactly once.
+    """
+    messages = [(1, "test_user", "test_msg"), (2, "test_user2", "")]
+    data = request_messages_frame(messages)
+
+    decoder = WireDecoder()
+    frames = []
+    for i in range(len(data)):
+        frames += decoder.feed(data[i:i + 1])
+        if i < len(data) - 1:
+            assert frames == [], "Frame should not be complete yet"
+
+    assert frames == [RequestMessagesFrame(messages)]
+    assert decoder.pending_bytes() == 0
+
+
+@pytest.mark.parametrize("split", [1, 2, 7, 30, 45])
+def test_decode_split_across_frames(split):
+    """
+    Test that chunk boundaries falling inside and between frames are handled.
+
+    :param split: Offset of the chunk boundary
+    """
+    data = struct.pack("!B B", 1, 1) + SALT + struct.pack("!B B H", 2, 1, 3)
+    decoder = WireDecoder()
+
+    frames = decoder.feed(data[:split]) + decoder.feed(data[split:])
+
+    assert frames == [LookupUserFrame(1, SALT), LoginFrame(1, 3)]
+
+
+def test_decode_large_push():
+    """
+    Test a full 255 message push delivered in a single chunk.
+    """
+    messages = [(i, f"user{i}", "x" * i) for i in range(255)]
+    decoder = WireDecoder()
+
+    frames = decoder.feed(request_messages_frame(messages))
+
+    assert frames == [RequestMessagesFrame(messages)]
+
+
+def test_decode_memoryview_chunks():
+    """
+    Test that the decoder accepts memoryview slices of a reused receive buffer.
+    """
+    buffer = bytearray(64)
+    data = struct.pack("!B B I", 5, 1, 99)
+    buffer[:len(data)] = data
+    decoder = WireDecoder()
+
+    frames = decoder.feed(memoryview(buffer)[:len(data)])
+    buffer[:] = bytes(64)  # Reusing the buffer must not affect decoded frames
+
+    assert frames == [SendMessageFrame(1, 99)]
+
+
+def test_decode_invalid_operation():
+    """
+    Test that an unknown operation ID raises a WireProtocolError.
+    """
+    decoder = WireDecoder()
+    with pytest.raises(WireProtocolError):
+        decoder.feed(bytes([42]))
+
+
+def test_encode_requests():
+    """
+    Test that the request encoders produce the documented byte layouts.
+    """
+    assert b"".join(encode_delete_messages([1, 70000, 2**32 - 1])) == \
+        struct.pack("!B B I I I", 7, 3, 1, 70000, 2**32 - 1)
+    assert b"".join(encode_login("ab", b"hash")) == struct.pack("!B B", 2, 2) + b"ab" + struct.pack("!B", 4) + b"hash"
+    assert b"".join(encode_list_accounts(10, 5, "x")) == struct.pack("!B B I B", 4, 10, 5, 1) + b"x"
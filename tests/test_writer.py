@@ -0,0 +1,227 @@
+import struct
+import threading
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+from helpers.clients import attach_socket
+
+# Add project root to sys.path
+sys.path.insert(0, os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..')))
+
+from client.network.writer import FrameWriter
+from client.network.network_wire import WireChatClient
+from client.network.wire_protocol import LIST_ACCOUNTS
+
+# Test the FrameWriter and how the clients send through it
+
+
+def test_idle_writer_writes_inline():
+    """
+    Test that a frame submitted to an idle writer is written before submit returns.
+    """
+    writes = []
+    writer = FrameWriter(writes.append)
+
+    assert writer.submit([b"a", b"b"], prepare=lambda: "registered") == "registered"
+    assert writes == [[b"a", b"b"]]
+    assert writer.stats() == {"frames": 1, "writes": 1, "coalesced": 0, "queued": 0}
+
+
+def test_frames_queued_during_a_write_are_coalesced():
+    """
+    Test that frames submitted while another thread writes go out together in its next write.
+    """
+    writes = []
+    writing = threading.Event()
+    release = threading.Event()
+
+    def write(buffers):
+        writes.append(b"".join(buffers))
+        if len(writes) == 1:
+            writing.set()
+            release.wait(5)
+
+    writer = FrameWriter(write)
+    first = threading.Thread(target=writer.submit, args=([b"1"],))
+    first.start()
+    assert writing.wait(5)
+
+    order = []
+    for frame in (b"2", b"3", b"4"):
+        writer.submit([frame], prepare=lambda frame=frame: order.append(frame))
+    assert writes == [b"1"], "Other threads should not write while one is writing"
+
+    release.set()
+    first.join(5)
+    assert writes == [b"1", b"234"]
+    assert order == [b"2", b"3", b"4"]
+    assert writer.coalesced == 3 and writer.writes == 2
+
+
+def test_failed_write_fails_every_frame():
+    """
+    Test that a failed write reports the error for each frame and raises in the writing thread.
+    """
+    errors = []
+
+    def write(buffers):
+        raise OSError("broken pipe")
+
+    writer = FrameWriter(write)
+    try:
+        writer.submit([b"x"], on_error=errors.append)
+        assert False, "submit should raise"
+    except OSError:
+        pass
+    assert [str(error) for error in errors] == ["broken pipe"]
+    assert not writer.writing, "The writer should be usable again"
+
+
+def test_failed_coalesced_write_spares_the_writing_thread():
+    """
+    Test that when a write of frames coalesced from other threads fails, only their senders
+    see the error and the writing thread, whose own frame went out earlier, does not raise.
+    """
+    writes = []
+    errors = []
+    writing = threading.Event()
+    release = threading.Event()
+
+    def write(buffers):
+        writes.append(b"".join(buffers))
+        if len(writes) == 1:
+            writing.set()
+            release.wait(5)
+            return
+        raise BrokenPipeError("broken pipe")
+
+    writer = FrameWriter(write)
+    raised = []
+
+    def submit_first():
+        try:
+            writer.submit([b"A"], on_error=lambda e: errors.append(("A", e)))
+        except OSError as e:
+            raised.append(e)
+
+    first = threading.Thread(target=submit_first)
+    first.start()
+    assert writing.wait(5)
+    writer.submit([b"B"], on_error=lambda e: errors.append(("B", e)))  # Coalesced
+    release.set()
+    first.join(5)
+
+    assert writes == [b"A", b"B"]
+    assert raised == [], "A's frame was written, so A must not see B's failure"
+    assert [name for name, _ in errors] == ["B"]
+    assert not writer.writing
+    assert writer.stats()["writes"] == 1
+
+
+def test_unexpected_error_releases_writer():
+    """
+    Test that an error other than OSError still fails the frames and leaves the writer usable.
+    """
+    errors = []
+    writes = []
+
+    def write(buffers):
+        if not writes:
+            writes.append(None)
+            raise AttributeError("'NoneType' object has no attribute 'sendmsg'")
+        writes.append(b"".join(buffers))
+
+    writer = FrameWriter(write)
+    try:
+        writer.submit([b"x"], on_error=errors.append)
+        assert False, "submit should raise"
+    except AttributeError:
+        pass
+    assert len(errors) == 1
+    assert not writer.writing
+
+    writer.submit([b"y"])
+    assert writes[-1] == b"y"
+    assert writer.stats()["queued"] == 0
+
+
+def test_send_after_disconnect_race():
+    """
+    Test that a frame sent after another thread dropped the socket fails its future and
+    does not block the frames sent after reconnecting.
+    """
+    with patch.object(WireChatClient, 'connect', return_value=True):
+        client = WireChatClient("host", 1, 10, 10)
+    client.running = True
+    client.socket = None  # Closed by the listener after the connection check
+    try:
+        client.send_frame([b"\x04"], [(LIST_ACCOUNTS, False)])
+        assert False, "send_frame should raise"
+    except ConnectionError:
+        pass
+    assert len(client.pending) == 0
+    assert not client.writer.writing
+
+    attach_socket(client)
+    futures = client.send_frame([b"\x04"], [(LIST_ACCOUNTS, False)])
+    assert len(futures) == 1 and not futures[0].done()
+    assert client.writer.stats() == {"frames": 2, "writes": 1, "coalesced": 0, "queued": 0}
+
+
+def test_concurrent_requests_keep_frames_whole():
+    """
+    Test that requests sent from many threads reach the socket whole and in registration order.
+    """
+    with patch.object(WireChatClient, 'connect', return_value=True):
+        client = WireChatClient("host", 1, 10, 10)
+    written = []
+    client.socket = MagicMock()
+    client.socket.sendmsg.side_effect = lambda buffers: (
+        written.append(b"".join(buffers)), sum(map(len, buffers)))[1]
+    client.running = True
+
+    def send(index):
+        for _ in range(20):
+            client.send_list_accounts(f"user{index}")
+
+    threads = [threading.Thread(target=send, args=(index,))
+               for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    data = b"".join(written)
+    filters = []
+    offset = 0
+    while offset < len(data):
+        op_id, _, _, length = struct.unpack_from("!B B I B", data, offset)
+        assert op_id == LIST_ACCOUNTS
+        offset += 7
+        filters.append(data[offset:offset + length].decode())
+        offset += length
+    assert len(filters) == 160
+    assert sorted(set(filters)) == [f"user{index}" for index in range(8)]
+    assert len(client.pending) == 160
+
+
+def test_submit_runs_actions_in_order():
+    """
+    Test that submitted actions run one at a time on the client's action thread.
+    """
+    with patch.object(WireChatClient, 'connect', return_value=True):
+        client = WireChatClient("host", 1, 10, 10)
+    ran = []
+    done = threading.Event()
+    for index in range(5):
+        client.submit(lambda index: ran.append(
+            (index, threading.current_thread())), index)
+    client.submit(done.set)
+
+    assert done.wait(5)
+    assert [index for index, _ in ran] == list(range(5))
+    assert len({thread for _, thread in ran}) == 1
+    assert ran[0][1] is not threading.current_thread()
+    client.close()